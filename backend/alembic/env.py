@@ -11,7 +11,7 @@ from alembic import context
 from app.config import get_settings
 from app.database import Base
 # Import models to ensure they are registered
-from app.models import usuario, projeto, execucao
+from app.models import usuario, projeto, execucao, arquivo_indexado, resultado_blob, alteracao
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,32 @@
+"""Add Core execution checkpoint to execucoes
+
+Revision ID: 1a6f3e8c0d52
+Revises: e7a2b05c9f13
+Create Date: 2026-10-19 17:41:09.562318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a6f3e8c0d52'
+down_revision: Union[str, None] = 'e7a2b05c9f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(sa.Column('core_execution_id', sa.String(length=100), nullable=True))
+        batch_op.add_column(
+            sa.Column('core_log_cursor', sa.Integer(), nullable=False, server_default='0')
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_column('core_log_cursor')
+        batch_op.drop_column('core_execution_id')
@@ -0,0 +1,44 @@
+"""Add repository path to projetos and the arquivos_indexados manifest
+
+Revision ID: 3d8b7f1e6a94
+Revises: 1a6f3e8c0d52
+Create Date: 2026-10-19 18:52:37.104826
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8b7f1e6a94'
+down_revision: Union[str, None] = '1a6f3e8c0d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('projetos') as batch_op:
+        batch_op.add_column(sa.Column('caminho_repositorio', sa.String(length=500), nullable=True))
+
+    op.create_table(
+        'arquivos_indexados',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('projeto_id', sa.Integer(), nullable=False),
+        sa.Column('caminho', sa.String(length=1000), nullable=False),
+        sa.Column('tamanho', sa.BigInteger(), nullable=False),
+        sa.Column('modificado_ns', sa.BigInteger(), nullable=False),
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(['projeto_id'], ['projetos.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('projeto_id', 'caminho', name='uq_arquivos_indexados_projeto_caminho')
+    )
+    op.create_index(op.f('ix_arquivos_indexados_projeto_id'), 'arquivos_indexados', ['projeto_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_arquivos_indexados_projeto_id'), table_name='arquivos_indexados')
+    op.drop_table('arquivos_indexados')
+    with op.batch_alter_table('projetos') as batch_op:
+        batch_op.drop_column('caminho_repositorio')
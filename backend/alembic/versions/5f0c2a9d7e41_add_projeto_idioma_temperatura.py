@@ -0,0 +1,32 @@
+"""Add idioma and temperatura to projetos
+
+Revision ID: 5f0c2a9d7e41
+Revises: 12d5269112e8
+Create Date: 2026-10-19 10:12:44.512093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0c2a9d7e41'
+down_revision: Union[str, None] = '12d5269112e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The models gained these columns after the initial migration; the
+    # startup schema check trusts the Alembic head, so they must exist here.
+    with op.batch_alter_table('projetos') as batch_op:
+        batch_op.add_column(sa.Column('idioma', sa.String(length=10), nullable=False, server_default='en'))
+        batch_op.add_column(sa.Column('temperatura', sa.Float(), nullable=False, server_default='0.7'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projetos') as batch_op:
+        batch_op.drop_column('temperatura')
+        batch_op.drop_column('idioma')
@@ -0,0 +1,39 @@
+"""Add timing breakdown to execucoes
+
+Revision ID: 8b3e61c4d2a7
+Revises: 5f0c2a9d7e41
+Create Date: 2026-10-19 11:02:17.408511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e61c4d2a7'
+down_revision: Union[str, None] = '5f0c2a9d7e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMING_COLUMNS = (
+    'espera_fila_segundos',
+    'latencia_submissao_segundos',
+    'tempo_primeiro_log_segundos',
+    'tempo_core_segundos',
+    'tempo_persistencia_logs_segundos',
+    'tempo_finalizacao_segundos',
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        for column in TIMING_COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        for column in reversed(TIMING_COLUMNS):
+            batch_op.drop_column(column)
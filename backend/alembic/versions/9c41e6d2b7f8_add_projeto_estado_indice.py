@@ -0,0 +1,32 @@
+"""Add index warm-up state to projetos
+
+Revision ID: 9c41e6d2b7f8
+Revises: 3d8b7f1e6a94
+Create Date: 2026-10-19 19:27:14.583091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41e6d2b7f8'
+down_revision: Union[str, None] = '3d8b7f1e6a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('projetos') as batch_op:
+        batch_op.add_column(
+            sa.Column('estado_indice', sa.String(length=20), nullable=False, server_default='cold')
+        )
+        batch_op.add_column(sa.Column('indice_atualizado_em', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projetos') as batch_op:
+        batch_op.drop_column('indice_atualizado_em')
+        batch_op.drop_column('estado_indice')
@@ -0,0 +1,38 @@
+"""Add the change sequence for delta sync
+
+Revision ID: a9e1c7d4f382
+Revises: f3b8d0c6a215
+Create Date: 2026-10-19 22:37:40.815562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e1c7d4f382'
+down_revision: Union[str, None] = 'f3b8d0c6a215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alteracoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('entidade', sa.String(length=20), nullable=False),
+        sa.Column('entidade_id', sa.Integer(), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+    op.create_index('ix_alteracoes_usuario_id_id', 'alteracoes', ['usuario_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alteracoes_usuario_id_id', table_name='alteracoes')
+    op.drop_table('alteracoes')
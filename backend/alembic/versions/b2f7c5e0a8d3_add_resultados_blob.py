@@ -0,0 +1,50 @@
+"""Add content-addressed result blobs and execution archiving
+
+Revision ID: b2f7c5e0a8d3
+Revises: 9c41e6d2b7f8
+Create Date: 2026-10-19 20:04:51.218337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f7c5e0a8d3'
+down_revision: Union[str, None] = '9c41e6d2b7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resultados_blob',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('conteudo', sa.LargeBinary(), nullable=False),
+        sa.Column('tamanho', sa.Integer(), nullable=False),
+        sa.Column('referencias', sa.Integer(), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('hash')
+    )
+
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(sa.Column('resultado_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('resultado_tamanho', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('arquivado_em', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_execucoes_resultado_hash'), ['resultado_hash'], unique=False)
+        batch_op.create_foreign_key(
+            'fk_execucoes_resultado_hash', 'resultados_blob', ['resultado_hash'], ['hash']
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_constraint('fk_execucoes_resultado_hash', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_execucoes_resultado_hash'))
+        batch_op.drop_column('arquivado_em')
+        batch_op.drop_column('resultado_tamanho')
+        batch_op.drop_column('resultado_hash')
+
+    op.drop_table('resultados_blob')
@@ -0,0 +1,30 @@
+"""Add prioridade to execucoes
+
+Revision ID: c4d9a17e5b20
+Revises: 8b3e61c4d2a7
+Create Date: 2026-10-19 14:26:51.930214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d9a17e5b20'
+down_revision: Union[str, None] = '8b3e61c4d2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(
+            sa.Column('prioridade', sa.String(length=20), nullable=False, server_default='interactive')
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_column('prioridade')
@@ -0,0 +1,26 @@
+"""Index executions by project and start time
+
+Revision ID: c8f2a5e9d174
+Revises: a9e1c7d4f382
+Create Date: 2026-10-19 23:12:27.604418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a5e9d174'
+down_revision: Union[str, None] = 'a9e1c7d4f382'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_execucoes_projeto_iniciado', 'execucoes', ['projeto_id', 'iniciado_em'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_execucoes_projeto_iniciado', table_name='execucoes')
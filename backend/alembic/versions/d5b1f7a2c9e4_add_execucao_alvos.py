@@ -0,0 +1,28 @@
+"""Store the targets an execution runs, globs expanded at creation
+
+Revision ID: d5b1f7a2c9e4
+Revises: c8f2a5e9d174
+Create Date: 2026-10-19 18:04:51.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b1f7a2c9e4'
+down_revision: Union[str, None] = 'c8f2a5e9d174'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(sa.Column('alvos', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_column('alvos')
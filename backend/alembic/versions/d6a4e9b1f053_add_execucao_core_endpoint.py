@@ -0,0 +1,28 @@
+"""Add the Core adapter endpoint to execucoes
+
+Revision ID: d6a4e9b1f053
+Revises: b2f7c5e0a8d3
+Create Date: 2026-10-19 20:41:06.572910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a4e9b1f053'
+down_revision: Union[str, None] = 'b2f7c5e0a8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(sa.Column('core_endpoint', sa.String(length=200), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_column('core_endpoint')
@@ -0,0 +1,32 @@
+"""Add worker lease to execucoes
+
+Revision ID: e7a2b05c9f13
+Revises: c4d9a17e5b20
+Create Date: 2026-10-19 16:08:33.114027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2b05c9f13'
+down_revision: Union[str, None] = 'c4d9a17e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(sa.Column('lease_owner', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('lease_expira_em', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_execucoes_status_lease', ['status', 'lease_expira_em'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_index('ix_execucoes_status_lease')
+        batch_op.drop_column('lease_expira_em')
+        batch_op.drop_column('lease_owner')
@@ -0,0 +1,28 @@
+"""Add the target size to execucoes
+
+Revision ID: f3b8d0c6a215
+Revises: d6a4e9b1f053
+Create Date: 2026-10-19 21:58:14.306127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d0c6a215'
+down_revision: Union[str, None] = 'd6a4e9b1f053'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.add_column(sa.Column('tamanho_alvo', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('execucoes') as batch_op:
+        batch_op.drop_column('tamanho_alvo')
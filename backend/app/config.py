@@ -3,6 +3,7 @@ DevFlow Backend Configuration
 """
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 
 class Settings(BaseSettings):
@@ -15,15 +16,154 @@ class Settings(BaseSettings):
     # Database
     # Using SQLite for local development (no server required)
     database_url: str = "sqlite+aiosqlite:///./devflow.db"
+    # Startup schema handling: "check" (Alembic head / cached fingerprint,
+    # else reflect the live schema: create missing tables, fail on missing
+    # columns), "create_all" (always) or "skip"
+    startup_schema_mode: str = "check"
     
     # JWT
     secret_key: str = "change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Admin token for operational endpoints (profiling, diagnostics)
+    admin_token: str | None = None
+    
     # CORS
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
     
+    # API processes serving requests (uvicorn/gunicorn WEB_CONCURRENCY)
+    web_concurrency: int = 1
+    
+    # Response cache (conditional GET on projects/executions). The cache is
+    # per process, so with web_concurrency > 1 bodies are never stored and
+    # only conditional GET (validators computed from the database) applies
+    response_cache_ttl_seconds: float = 30.0
+    response_cache_max_entries: int = 1024
+    
+    # Serialization / compression
+    fast_json_enabled: bool = False
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Metrics
+    metrics_enabled: bool = True
+    event_loop_monitor_interval: float = 0.5
+    event_loop_slow_threshold: float = 0.1
+    
+    # Profiling (X-Profile header; continuous sampling disabled when 0)
+    profile_dir: str = "./profiles"
+    profile_sample_interval: float = 0.005
+    profile_background_interval: float = 0.0
+    profile_background_flush_seconds: float = 60.0
+    
+    # AkitaLLM Core adapter replicas (least-loaded routing, health-checked)
+    core_adapter_urls: list[str] = ["http://127.0.0.1:8765"]
+    core_health_path: str = "/health"
+    core_health_check_interval: float = 10.0
+    core_health_check_timeout: float = 2.0
+    core_failure_threshold: int = 2
+    
+    # Execution scheduler (per-user/per-project caps; 0 disables a cap)
+    scheduler_max_concurrent: int = 4
+    scheduler_max_per_user: int = 2
+    scheduler_max_per_project: int = 2
+    scheduler_interactive_weight: float = 4.0
+    scheduler_batch_weight: float = 1.0
+    # Within a priority class, start the job expected to finish first
+    # (enqueue time + estimated duration) instead of FIFO
+    scheduler_shortest_job_first: bool = False
+    
+    # Execution duration model (ETA / queue-wait estimates)
+    eta_ewma_alpha: float = 0.2
+    eta_min_samples: int = 3
+    eta_default_seconds: float = 120.0
+    eta_history_size: int = 500
+    # API processes rebuild the model from that history this often (0: only
+    # at startup); in worker mode it is how they see runs finish
+    eta_refresh_seconds: float = 60.0
+    
+    # Where executions run: "inline" (scheduler inside the API process) or
+    # "worker" (API only records them; `python -m app.worker` claims them)
+    execution_mode: str = "inline"
+    worker_concurrency: int = 4
+    # Leases: claimed by workers, and in inline mode held by the API process
+    # that queued the execution (others only recover it once it expires)
+    worker_lease_seconds: float = 30.0
+    worker_heartbeat_seconds: float = 10.0
+    worker_poll_interval: float = 1.0
+    # On shutdown, running executions get this long to finish before they are
+    # checkpointed and left for the next process to reattach
+    shutdown_grace_seconds: float = 10.0
+    
+    # Core log delivery: bounded queue per subscriber, overflow policy
+    # "block" (backpressure onto the Core reader), "coalesce" or "drop_oldest".
+    # The DB writer must not lose lines, so it takes no "drop_oldest"
+    log_queue_size: int = 256
+    log_overflow_policy: Literal["block", "coalesce"] = "block"
+    log_viewer_queue_size: int = 256
+    log_viewer_overflow_policy: str = "drop_oldest"
+    # Live log stream (SSE) polling interval when the run is in another process
+    log_stream_poll_interval: float = 1.0
+    
+    # Project checkouts must resolve inside this directory (relative
+    # caminho_repositorio values are taken relative to it)
+    repository_root: str = "./repositorios"
+    
+    # Incremental indexing (manifest of indexed files per project)
+    index_workers: int = 8
+    index_batch_size: int = 500
+    index_ignore_dirs: list[str] = [
+        ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", "dist", "build"
+    ]
+    # Background warm-up on project create/reconfigure (global rate limit)
+    index_warmup_max_concurrent: int = 1
+    index_warmup_interval_seconds: float = 5.0
+    
+    # Plugin template generation: cache of Core templates and async jobs.
+    # Jobs live in the process that started them: with web_concurrency > 1
+    # their status URL needs sticky routing
+    plugin_cache_max_entries: int = 256
+    plugin_cache_ttl_seconds: float = 3600.0
+    plugin_job_ttl_seconds: float = 600.0
+    plugin_max_jobs_per_user: int = 10
+
+    # Diff application: local dry-run pool, parallel Core applies, upload cap
+    diff_workers: int = 4
+    diff_apply_concurrency: int = 4
+    diff_max_upload_bytes: int = 50 * 1024 * 1024
+
+    # Execution results above this size (canonical JSON bytes) are stored as
+    # compressed, deduplicated blobs instead of inline on the row
+    result_inline_max_bytes: int = 16 * 1024
+    result_compression_level: int = 6
+    # Parsed result documents kept in memory for partial reads and paging
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+    result_page_size: int = 50
+    
+    # Delta sync (GET /sync): changes are kept sync_retention_days; tokens stop
+    # short of changes younger than sync_settle_seconds, which are sent again
+    # on the next call so a slow concurrent commit is never skipped
+    sync_retention_days: int = 30
+    sync_settle_seconds: float = 5.0
+    sync_page_size: int = 500
+    sync_snapshot_limit: int = 100
+    
+    # Dashboard (GET /dashboard)
+    dashboard_latest_per_project: int = 5
+    dashboard_failure_window_hours: int = 24
+    dashboard_failures_limit: int = 10
+    
+    # Execution history export (GET /execucoes/exportar): rows fetched per
+    # server-side cursor batch and written per chunk
+    export_batch_size: int = 500
+    export_gzip_level: int = 6
+    
+    # Multi-target executions: Core sub-jobs per execution, and how many at once
+    fanout_max_targets: int = 64
+    fanout_max_concurrency: int = 4
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
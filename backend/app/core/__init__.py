@@ -1,11 +1,15 @@
 """Core Package"""
-from app.core.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    get_current_user
-)
-from app.core.akita_wrapper import PipelineOrchestrator
+from importlib import import_module
+
+# Resolved lazily (PEP 562) so importing a light submodule such as
+# app.core.http_cache does not pull in jose, passlib and httpx.
+_EXPORTS = {
+    "verify_password": "app.core.security",
+    "get_password_hash": "app.core.security",
+    "create_access_token": "app.core.security",
+    "get_current_user": "app.core.security",
+    "PipelineOrchestrator": "app.core.akita_wrapper",
+}
 
 __all__ = [
     "verify_password",
@@ -14,3 +18,9 @@ __all__ = [
     "get_current_user",
     "PipelineOrchestrator"
 ]
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,111 +2,288 @@
 AkitaLLM Wrapper - API Integration (Refactored)
 """
 import asyncio
-import httpx
-from typing import Any, Callable, Optional, List, Dict
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, List, Dict, TYPE_CHECKING
 from datetime import datetime
 
+from app.config import get_settings
+from app.core.core_pool import CoreEndpoint, CorePool
+from app.core.fanout import TargetSink, aggregate
+from app.core.log_sink import LogEvent, LogSink
+from app.core.metrics import core_request_duration, core_request_errors
+
+if TYPE_CHECKING:
+    import httpx
+
 class PipelineOrchestrator:
     """
     Client for the AkitaLLM Core HTTP Adapter.
     Delegates all execution and orchestration to the Core.
+
+    Calls go through a ``CorePool`` (app.core.core_pool): each one goes to the
+    least-loaded healthy adapter replica, except reattach and cancel, which
+    return to the replica that accepted the execution.
     """
     
-    def __init__(self, base_url: str = "http://127.0.0.1:8765"):
-        self.base_url = base_url
+    def __init__(self, base_url: str | None = None, pool: CorePool | None = None):
+        self.pool = pool or CorePool([base_url or "http://127.0.0.1:8765"], health_interval=0)
+
+    @property
+    def base_url(self) -> str:
+        return self.pool.default_url
+
+    async def _get_client(self, base_url: str | None = None) -> "httpx.AsyncClient":
+        import httpx
+
+        return httpx.AsyncClient(base_url=base_url or self.base_url, timeout=30.0)
+
+    @asynccontextmanager
+    async def _session(self, url: str | None = None) -> AsyncIterator[tuple[CoreEndpoint, "httpx.AsyncClient"]]:
+        """A client on a leased endpoint; connection errors count against its health."""
+        import httpx
+
+        async with self.pool.lease(url) as endpoint:
+            async with await self._get_client(endpoint.url) as client:
+                try:
+                    yield endpoint, client
+                except httpx.TransportError:
+                    self.pool.mark_failure(endpoint)
+                    raise
+            self.pool.mark_success(endpoint)
 
-    async def _get_client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(base_url=self.base_url, timeout=30.0)
+    @staticmethod
+    async def _timed(endpoint: str, call: Awaitable["httpx.Response"]) -> "httpx.Response":
+        """Await a Core call recording latency and errors under ``endpoint``."""
+        start = time.perf_counter()
+        try:
+            resp = await call
+        except Exception:
+            core_request_errors.labels(endpoint).inc()
+            raise
+        finally:
+            core_request_duration.labels(endpoint).observe(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            core_request_errors.labels(endpoint).inc()
+        return resp
 
     async def execute(
         self,
         config: dict[str, Any],
-        on_log: Callable[[str], None] | None = None
+        on_log: Callable[[str], None] | None = None,
+        resume: dict[str, Any] | None = None,
+        on_checkpoint: Callable[[str, int], None] | None = None,
+        sink: LogSink | None = None
     ) -> dict[str, Any]:
         """
         Execute an AkitaLLM command by calling the Core Adapter API.
+
+        Logs and Core status changes are published to ``sink`` (see
+        app.core.log_sink), one event per batch of Core logs; a sink that
+        applies backpressure simply delays the next poll. The synchronous
+        ``on_log`` / ``on_checkpoint`` callbacks are kept for simple callers.
+
+        A checkpoint (execution id, log cursor) is reported once the Core
+        accepts the job and after every batch of logs, so callers can persist
+        it; sink events also carry the endpoint of the Core running the job.
+        Passing those back as ``resume`` (``{"execution_id": ...,
+        "log_cursor": ..., "endpoint": ...}``) reattaches to the running Core
+        job instead of submitting a new one; if the Core no longer knows it,
+        it is resubmitted. A new job goes to the least-loaded Core.
+
+        The result carries a ``timings`` dict (seconds): ``submit`` (POST
+        /v1/execute round trip), ``first_log`` (submit accepted -> first Core
+        log received) and ``core_run`` (submit accepted -> terminal status).
         """
         start_time = datetime.utcnow()
         mode = config.get("mode", "review")
         target = config.get("target", ".")
+        timings: dict[str, float | None] = {"submit": None, "first_log": None, "core_run": None}
+        accepted_at: float | None = None
+
+        async def emit(lines: list[str], execution_id: str | None = None, log_cursor: int | None = None):
+            if sink is not None and (lines or log_cursor is not None):
+                checkpoint_endpoint = endpoint.url if log_cursor is not None else None
+                await sink.publish(LogEvent.log(lines, execution_id, log_cursor, checkpoint_endpoint))
+            if on_log:
+                for line in lines:
+                    on_log(line)
+            if on_checkpoint and log_cursor is not None:
+                on_checkpoint(execution_id, log_cursor)
         
-        async with await self._get_client() as client:
+        import httpx
+
+        sticky = None
+        if resume and resume.get("execution_id"):
+            # Checkpoints from before the pool carry no endpoint: they ran on the default one
+            sticky = resume.get("endpoint") or self.pool.default_url
+        async with self.pool.lease(sticky) as endpoint, \
+                await self._get_client(endpoint.url) as client:
             try:
-                # 1. Trigger Execution
-                if on_log:
-                    on_log(f"🔗 Connecting to AkitaLLM Core Adapter at {self.base_url}...")
-                
-                resp = await client.post("/v1/execute", json={
-                    "mode": mode,
-                    "target": target,
-                    "options": config.get("options")
-                })
-                resp.raise_for_status()
-                execution_info = resp.json()
-                execution_id = execution_info["execution_id"]
-                
-                if on_log:
-                    on_log(f"🆔 Execution started: {execution_id}")
+                execution_id = None
+                last_log_index = 0
+                if resume and resume.get("execution_id"):
+                    check = await self._timed(
+                        "/v1/status", client.get(f"/v1/status/{resume['execution_id']}")
+                    )
+                    if check.status_code == 404:
+                        await emit([f"⚠️ Execution {resume['execution_id']} no longer exists in the Core; resubmitting"])
+                    else:
+                        check.raise_for_status()
+                        execution_id = resume["execution_id"]
+                        last_log_index = resume.get("log_cursor") or 0
+                        accepted_at = time.perf_counter()
+                        await emit([f"🔁 Reattached to execution {execution_id} at log {last_log_index}"])
+
+                if execution_id is None:
+                    # 1. Trigger Execution
+                    await emit([f"🔗 Connecting to AkitaLLM Core Adapter at {endpoint.url}..."])
+                    
+                    submit_start = time.perf_counter()
+                    resp = await self._timed("/v1/execute", client.post("/v1/execute", json={
+                        "mode": mode,
+                        "target": target,
+                        "options": config.get("options")
+                    }))
+                    accepted_at = time.perf_counter()
+                    timings["submit"] = accepted_at - submit_start
+                    resp.raise_for_status()
+                    execution_info = resp.json()
+                    execution_id = execution_info["execution_id"]
+                    
+                    await emit([f"🆔 Execution started: {execution_id}"], execution_id, last_log_index)
 
                 # 2. Poll for Status and Logs
-                last_log_index = 0
+                last_status = None
                 while True:
                     # Fetch logs
-                    logs_resp = await client.get(f"/v1/logs/{execution_id}", params={"last_index": last_log_index})
+                    logs_resp = await self._timed("/v1/logs", client.get(
+                        f"/v1/logs/{execution_id}", params={"last_index": last_log_index}
+                    ))
                     if logs_resp.status_code == 200:
                         new_logs = logs_resp.json().get("logs", [])
-                        for log in new_logs:
-                            if on_log:
-                                on_log(log)
-                        last_log_index += len(new_logs)
+                        if new_logs and timings["first_log"] is None:
+                            timings["first_log"] = time.perf_counter() - accepted_at
+                        if new_logs:
+                            last_log_index += len(new_logs)
+                            await emit(new_logs, execution_id, last_log_index)
 
-                    status_resp = await client.get(f"/v1/status/{execution_id}")
+                    status_resp = await self._timed("/v1/status", client.get(f"/v1/status/{execution_id}"))
                     status_resp.raise_for_status()
                     data = status_resp.json()
                     
                     status = data["status"]
+                    if status != last_status and sink is not None:
+                        await sink.publish(LogEvent.state(status))
+                    last_status = status
                     if status in ["succeeded", "failed"]:
+                        self.pool.mark_success(endpoint)
                         success = status == "succeeded"
                         elapsed = (datetime.utcnow() - start_time).total_seconds()
+                        timings["core_run"] = time.perf_counter() - accepted_at
                         
                         return {
                             "success": success,
                             "data": {"result": data.get("result")},
                             "error": data.get("error") if not success else None,
-                            "elapsed_seconds": elapsed
+                            "elapsed_seconds": elapsed,
+                            "timings": timings
                         }
                     
                     await asyncio.sleep(1.0) # Poll every second
 
             except Exception as e:
+                if isinstance(e, httpx.TransportError):
+                    self.pool.mark_failure(endpoint)
                 elapsed = (datetime.utcnow() - start_time).total_seconds()
+                if accepted_at is not None:
+                    timings["core_run"] = time.perf_counter() - accepted_at
                 error_msg = f"Adapter Communication Error: {str(e)}"
-                if on_log:
-                    on_log(f"❌ {error_msg}")
+                await emit([f"❌ {error_msg}"])
                 return {
                     "success": False,
                     "error": error_msg,
-                    "elapsed_seconds": elapsed
+                    "elapsed_seconds": elapsed,
+                    "timings": timings
                 }
 
+    async def execute_many(
+        self,
+        config: dict[str, Any],
+        targets: list[str],
+        sink: LogSink | None = None,
+        max_concurrency: int = 4
+    ) -> dict[str, Any]:
+        """
+        Run ``config`` once per target, at most ``max_concurrency`` Core jobs
+        at a time, and merge the results (see app.core.fanout). If cancelled,
+        the sub-jobs already in the Core are aborted.
+        """
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        sinks = {target: TargetSink(sink, target) for target in targets}
+        results: dict[str, dict[str, Any]] = {}
+
+        async def run(target: str) -> None:
+            async with semaphore:
+                results[target] = await self.execute({**config, "target": target}, sink=sinks[target])
+
+        if sink is not None:
+            await sink.publish(LogEvent.log([f"🔀 {len(targets)} targets, up to {max_concurrency} at a time"]))
+        tasks = [asyncio.create_task(run(target)) for target in targets]
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            started = [s for t, s in sinks.items() if s.execution_id and t not in results]
+            await asyncio.shield(asyncio.gather(
+                *(self.cancel(s.execution_id, s.endpoint) for s in started), return_exceptions=True
+            ))
+            raise
+        return aggregate({target: results[target] for target in targets})
+
+    async def cancel(self, execution_id: str, endpoint: str | None = None) -> bool:
+        """Ask the Core that runs the execution (``endpoint``, default: the first one) to abort it."""
+        async with self._session(endpoint or self.base_url) as (_, client):
+            resp = await self._timed("/v1/cancel", client.post(f"/v1/cancel/{execution_id}"))
+            return resp.status_code in (200, 202, 404)  # 404: already gone
+
     async def index_project(self, path: str) -> bool:
         """Delegate indexing to the Core."""
-        async with await self._get_client() as client:
-            resp = await client.post("/v1/index", params={"path": path})
+        async with self._session() as (_, client):
+            resp = await self._timed("/v1/index", client.post("/v1/index", params={"path": path}))
+            return resp.status_code == 200
+
+    async def index_delta(self, path: str, changed: List[Dict[str, Any]], deleted: List[str]) -> Optional[bool]:
+        """
+        Send an incremental index update: added/changed files and deleted paths.
+        None when the Core has no delta endpoint (404).
+        """
+        async with self._session() as (_, client):
+            resp = await self._timed("/v1/index/delta", client.post(
+                "/v1/index/delta", json={"path": path, "changed": changed, "deleted": deleted}
+            ))
+            if resp.status_code == 404:
+                return None
             return resp.status_code == 200
 
     async def generate_plugin_template(self, name: str, description: str, tools: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
         """Fetch plugin template from the Core."""
-        async with await self._get_client() as client:
-            resp = await client.post("/v1/plugins/generate", json=tools, params={"name": name, "description": description})
+        async with self._session() as (_, client):
+            resp = await self._timed("/v1/plugins/generate", client.post(
+                "/v1/plugins/generate", json=tools, params={"name": name, "description": description}
+            ))
             if resp.status_code == 200:
                 return resp.json().get("template")
             return None
 
     async def apply_diff(self, diff: str, base_path: str = ".") -> bool:
         """Delegate diff application to the Core."""
-        async with await self._get_client() as client:
-            resp = await client.post("/v1/diff/apply", json={"diff": diff, "base_path": base_path})
+        async with self._session() as (_, client):
+            resp = await self._timed("/v1/diff/apply", client.post(
+                "/v1/diff/apply", json={"diff": diff, "base_path": base_path}
+            ))
             if resp.status_code == 200:
                 return resp.json().get("success", False)
             return False
@@ -117,5 +294,12 @@ _orchestrator: PipelineOrchestrator | None = None
 def get_orchestrator() -> PipelineOrchestrator:
     global _orchestrator
     if _orchestrator is None:
-        _orchestrator = PipelineOrchestrator()
+        settings = get_settings()
+        _orchestrator = PipelineOrchestrator(pool=CorePool(
+            settings.core_adapter_urls,
+            health_path=settings.core_health_path,
+            health_interval=settings.core_health_check_interval,
+            health_timeout=settings.core_health_check_timeout,
+            failure_threshold=settings.core_failure_threshold
+        ))
     return _orchestrator
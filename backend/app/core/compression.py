@@ -0,0 +1,134 @@
+"""
+Compression Middleware - gzip/brotli negotiated by Accept-Encoding
+
+Only complete responses are compressed: if the first body message announces
+``more_body`` (StreamingResponse, SSE...) the response is passed through as-is,
+so streaming endpoints are never buffered.
+"""
+import gzip
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson", "application/javascript")
+
+# Bodies above this size are compressed off the event loop
+THREADPOOL_THRESHOLD = 256 * 1024
+
+
+def negotiate_encoding(accept_encoding: str, brotli_available: bool | None = None) -> str | None:
+    """Pick the best supported encoding ("br" or "gzip") honouring q-values."""
+    if brotli_available is None:
+        brotli_available = brotli is not None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """Compress complete responses above ``minimum_size`` bytes."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if start_message is None:  # pragma: no cover - protocol violation
+                await send(message)
+                return
+
+            headers = Headers(raw=start_message["headers"])
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            content_type = headers.get("content-type", "")
+
+            if (
+                more_body
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or content_type.startswith("text/event-stream")
+            ):
+                # Streaming or not worth it: forward untouched
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREADPOOL_THRESHOLD:
+                compressed = await run_in_threadpool(
+                    compress, body, encoding, self.gzip_level, self.brotli_quality
+                )
+            else:
+                compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            mutable = MutableHeaders(raw=start_message["headers"])
+            mutable["Content-Encoding"] = encoding
+            mutable["Content-Length"] = str(len(compressed))
+            mutable.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
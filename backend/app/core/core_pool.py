@@ -0,0 +1,145 @@
+"""
+Core Pool - Health-checked set of AkitaLLM Core adapter endpoints
+
+New work goes to the least-loaded healthy endpoint (fewest calls and
+executions in flight, ties broken round-robin). An execution stays on the
+Core that accepted it: its checkpoint records the endpoint, and reattach and
+cancel go back there.
+
+Health is tracked two ways:
+
+- passively: ``core_failure_threshold`` consecutive connection errors take an
+  endpoint out of rotation
+- actively: a background loop probes every endpoint's ``core_health_path``
+  every ``core_health_check_interval`` seconds, removing endpoints that fail
+  and adding back the ones that answer again
+
+If every endpoint is down, calls still go to the least-loaded one rather than
+failing outright, so a recovered Core is used as soon as it answers.
+"""
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from app.core.metrics import core_adapter_active, core_adapter_healthy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CoreEndpoint:
+    url: str
+    healthy: bool = True
+    active: int = 0
+    failures: int = 0
+
+
+class CorePool:
+    def __init__(
+        self,
+        urls: list[str],
+        health_path: str = "/health",
+        health_interval: float = 10.0,
+        health_timeout: float = 2.0,
+        failure_threshold: int = 2
+    ):
+        if not urls:
+            raise ValueError("CorePool needs at least one endpoint")
+        self.endpoints = {url.rstrip("/"): CoreEndpoint(url.rstrip("/")) for url in urls}
+        self.health_path = health_path
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.failure_threshold = max(failure_threshold, 1)
+        self._order = itertools.count()
+        self._task: asyncio.Task | None = None
+        for endpoint in self.endpoints.values():
+            self._report(endpoint)
+
+    @property
+    def default_url(self) -> str:
+        """First configured endpoint (where pre-pool executions ran)."""
+        return next(iter(self.endpoints))
+
+    def choose(self) -> CoreEndpoint:
+        """Least-loaded healthy endpoint (see module docs)."""
+        candidates = [e for e in self.endpoints.values() if e.healthy] or list(self.endpoints.values())
+        least = min(e.active for e in candidates)
+        tied = [e for e in candidates if e.active == least]
+        return tied[next(self._order) % len(tied)]
+
+    def get(self, url: str) -> CoreEndpoint:
+        """The endpoint for ``url``; one no longer configured is tracked on the side."""
+        url = url.rstrip("/")
+        endpoint = self.endpoints.get(url)
+        return endpoint if endpoint is not None else CoreEndpoint(url)
+
+    @asynccontextmanager
+    async def lease(self, url: str | None = None) -> AsyncIterator[CoreEndpoint]:
+        """Hold an endpoint (``url`` for sticky work, else the least loaded) while in use."""
+        endpoint = self.get(url) if url else self.choose()
+        endpoint.active += 1
+        self._report(endpoint)
+        try:
+            yield endpoint
+        finally:
+            endpoint.active -= 1
+            self._report(endpoint)
+
+    def mark_success(self, endpoint: CoreEndpoint) -> None:
+        endpoint.failures = 0
+        if not endpoint.healthy:
+            logger.info("Core adapter %s is back in rotation", endpoint.url)
+            endpoint.healthy = True
+            self._report(endpoint)
+
+    def mark_failure(self, endpoint: CoreEndpoint, conclusive: bool = False) -> None:
+        """Count a failed call; ``conclusive`` (a failed probe) removes the endpoint at once."""
+        endpoint.failures += 1
+        if endpoint.healthy and (conclusive or endpoint.failures >= self.failure_threshold):
+            logger.warning("Core adapter %s removed from rotation after %d failures", endpoint.url, endpoint.failures)
+            endpoint.healthy = False
+            self._report(endpoint)
+
+    async def check(self, endpoint: CoreEndpoint) -> bool:
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(base_url=endpoint.url, timeout=self.health_timeout) as client:
+                resp = await client.get(self.health_path)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            self.mark_success(endpoint)
+        else:
+            self.mark_failure(endpoint, conclusive=True)
+        return ok
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(e) for e in self.endpoints.values()))
+
+    def start(self) -> None:
+        if self._task is None and self.health_interval > 0:
+            self._task = asyncio.create_task(self._run(), name="core-health-checks")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check_all()
+            except Exception:
+                logger.exception("Core health check failed")
+            await asyncio.sleep(self.health_interval)
+
+    def _report(self, endpoint: CoreEndpoint) -> None:
+        if endpoint.url in self.endpoints:
+            core_adapter_healthy.labels(endpoint.url).set(1 if endpoint.healthy else 0)
+            core_adapter_active.labels(endpoint.url).set(endpoint.active)
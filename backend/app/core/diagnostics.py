@@ -0,0 +1,164 @@
+"""
+Diagnostics - Memory and resource leak inspection for long-running processes
+
+Everything here is read-only and meant to be called from the admin-only
+``/diagnostics`` router, so production workers can be inspected without a
+restart. Snapshots, snapshot diffs and the GC heap walks are CPU-bound: the
+router runs them in the thread pool so the process being diagnosed keeps
+serving requests and polling the Core meanwhile.
+"""
+import asyncio
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+MAX_SNAPSHOTS = 5
+
+
+class MemoryTracker:
+    """Keeps the last few tracemalloc snapshots so they can be diffed."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: OrderedDict[int, tuple[datetime, tracemalloc.Snapshot]] = OrderedDict()
+        self._next_id = 1
+        # Snapshots and diffs run in worker threads
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def take_snapshot(self) -> dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc não está ativo")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (datetime.utcnow(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        current, peak = tracemalloc.get_traced_memory()
+        return {"id": snapshot_id, "memoria_rastreada": current, "pico": peak}
+
+    def list_snapshots(self) -> list[dict]:
+        with self._lock:
+            return [
+                {"id": snapshot_id, "criado_em": taken_at}
+                for snapshot_id, (taken_at, _) in self._snapshots.items()
+            ]
+
+    def diff(self, snapshot_id: int, base_id: int, group_by: str = "lineno", limit: int = 25) -> list[dict]:
+        """Top allocation differences between two snapshots (largest growth first)."""
+        try:
+            with self._lock:
+                _, snapshot = self._snapshots[snapshot_id]
+                _, base = self._snapshots[base_id]
+        except KeyError as e:
+            raise KeyError(f"Snapshot {e.args[0]} não encontrado") from None
+        stats = snapshot.compare_to(base, group_by)
+        return [
+            {
+                "local": "\n".join(stat.traceback.format()),
+                "tamanho": stat.size,
+                "diferenca_tamanho": stat.size_diff,
+                "blocos": stat.count,
+                "diferenca_blocos": stat.count_diff,
+            }
+            for stat in stats[:limit]
+        ]
+
+
+memory_tracker = MemoryTracker()
+
+
+def _coroutine_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+def task_counts() -> dict:
+    """Live asyncio tasks grouped by coroutine name."""
+    tasks = asyncio.all_tasks()
+    counts = Counter(_coroutine_name(task) for task in tasks)
+    return {"total": len(tasks), "por_corrotina": dict(counts.most_common())}
+
+
+def database_stats(engine: AsyncEngine) -> dict:
+    """Connection pool status and live sessions created by the session factory."""
+    pool = engine.pool
+    pool_stats = {"status": pool.status()}
+    for attribute in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, attribute, None)
+        if callable(method):
+            pool_stats[attribute] = method()
+
+    sessions = [obj for obj in gc.get_objects() if isinstance(obj, AsyncSession)]
+    return {
+        "pool": pool_stats,
+        "sessoes_vivas": len(sessions),
+        "sessoes_em_transacao": sum(1 for s in sessions if s.in_transaction()),
+    }
+
+
+def http_client_stats() -> dict:
+    """Live httpx clients and the connections held by their pools."""
+    httpx = sys.modules.get("httpx")
+    if httpx is None:
+        return {"clientes_vivos": 0, "clientes_abertos": 0, "conexoes": 0}
+
+    clients = [obj for obj in gc.get_objects() if isinstance(obj, httpx.AsyncClient)]
+    connections = 0
+    for client in clients:
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections += len(getattr(pool, "connections", []) or [])
+    return {
+        "clientes_vivos": len(clients),
+        "clientes_abertos": sum(1 for c in clients if not c.is_closed),
+        "conexoes": connections,
+    }
+
+
+def process_stats() -> dict:
+    """Resident memory and garbage collector counters."""
+    rss = None
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    max_rss = None
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            max_rss *= 1024  # Linux reports KiB
+    return {
+        "rss": rss,
+        "rss_maximo": max_rss,
+        "gc_contagens": gc.get_count(),
+        "objetos_rastreados_gc": len(gc.get_objects()),
+    }
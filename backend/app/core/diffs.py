@@ -0,0 +1,264 @@
+"""
+Diffs - Incremental unified-diff parsing and local dry-run
+
+``DiffStreamParser`` is fed a (possibly huge, possibly concatenated)
+unified diff line by line and emits one ``FilePatch`` per file section as
+soon as it is complete, so an upload never has to be held as one string.
+Git sections without ``---``/``+++`` (pure renames, mode changes, binary
+files) are emitted too, flagged ``unsupported``, so callers can report them.
+
+``dry_run`` applies a file's patches, in order, to the file's current
+content in memory and reports the first hunk whose context does not match.
+Hunks may have drifted by some lines (the nearest match is used), but there
+is no fuzz: every context and removed line must match exactly, ignoring
+line endings.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+
+DEV_NULL = "/dev/null"
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+GIT_HEADER = re.compile(r"^diff --git a/(.+) b/(.+)$")
+
+
+class DiffParseError(ValueError):
+    pass
+
+
+class PatchConflict(Exception):
+    pass
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_len: int
+    new_start: int
+    new_len: int
+    lines: list[str] = field(default_factory=list)  # with their " ", "-", "+" prefix
+
+    @property
+    def before(self) -> list[str]:
+        return [line[1:] for line in self.lines if line[:1] in (" ", "-")]
+
+    @property
+    def after(self) -> list[str]:
+        return [line[1:] for line in self.lines if line[:1] in (" ", "+")]
+
+
+@dataclass
+class FilePatch:
+    old_path: str
+    new_path: str
+    text: str
+    hunks: list[Hunk] = field(default_factory=list)
+    unsupported: bool = False  # a section with nothing to patch (rename, mode, binary)
+
+    @property
+    def path(self) -> str:
+        """Path the patch is about (the old one for deletions)."""
+        return self.old_path if self.new_path == DEV_NULL else self.new_path
+
+    @property
+    def creates(self) -> bool:
+        return self.old_path == DEV_NULL
+
+    @property
+    def deletes(self) -> bool:
+        return self.new_path == DEV_NULL
+
+
+def _strip_prefix(path: str) -> str:
+    path = path.split("\t", 1)[0].strip()
+    if path != DEV_NULL and path[:2] in ("a/", "b/"):
+        return path[2:]
+    return path
+
+
+class DiffStreamParser:
+    """Line-by-line unified diff parser (see module docs)."""
+
+    def __init__(self):
+        self._header: list[str] = []
+        self._current: FilePatch | None = None
+        self._lines: list[str] = []
+        self._hunk: Hunk | None = None
+        self._old_left = 0
+        self._new_left = 0
+        self._pending_old: str | None = None
+
+    def feed(self, line: str) -> list[FilePatch]:
+        """Consume one line (with or without its newline); return completed file patches."""
+        text = line.rstrip("\r\n")
+        if self._hunk is not None and (self._old_left > 0 or self._new_left > 0):
+            self._hunk_line(line, text)
+            return []
+        if self._hunk is not None and text.startswith("\\"):
+            self._lines.append(line)  # "\ No newline at end of file"
+            return []
+
+        if text.startswith("@@"):
+            if self._current is None:
+                raise DiffParseError(f"Hunk sem cabeçalho de arquivo: {text}")
+            self._start_hunk(line, text)
+            return []
+
+        if text.startswith("--- ") and self._pending_old is None:
+            done = self._finish()
+            self._pending_old = _strip_prefix(text[4:])
+            self._header.append(line)
+            return done
+        if text.startswith("+++ ") and self._pending_old is not None:
+            self._header.append(line)
+            self._current = FilePatch(self._pending_old, _strip_prefix(text[4:]), text="")
+            self._lines = self._header
+            self._header = []
+            self._pending_old = None
+            return []
+
+        if text.startswith("diff ") or self._current is not None and self._hunk is not None:
+            # A new file section (or trailing noise after the last hunk)
+            done = self._finish() or self._headerless()
+            self._header = [line]
+            return done
+        self._header.append(line)
+        return []
+
+    def close(self) -> list[FilePatch]:
+        if self._hunk is not None and (self._old_left > 0 or self._new_left > 0):
+            raise DiffParseError(f"Diff truncado em {self._current.path}")
+        if self._pending_old is not None:
+            raise DiffParseError("Cabeçalho '---' sem '+++'")
+        return self._finish() or self._headerless()
+
+    def _start_hunk(self, line: str, text: str) -> None:
+        match = HUNK_HEADER.match(text)
+        if match is None:
+            raise DiffParseError(f"Cabeçalho de hunk inválido: {text}")
+        old_start, old_len, new_start, new_len = match.groups()
+        self._hunk = Hunk(
+            int(old_start), 1 if old_len is None else int(old_len),
+            int(new_start), 1 if new_len is None else int(new_len)
+        )
+        self._old_left, self._new_left = self._hunk.old_len, self._hunk.new_len
+        self._current.hunks.append(self._hunk)
+        self._lines.append(line)
+
+    def _hunk_line(self, line: str, text: str) -> None:
+        self._lines.append(line)
+        if text.startswith("\\"):
+            return
+        kind = text[:1] or " "  # some tools drop the space of empty context lines
+        if kind == " ":
+            self._old_left -= 1
+            self._new_left -= 1
+        elif kind == "-":
+            self._old_left -= 1
+        elif kind == "+":
+            self._new_left -= 1
+        else:
+            raise DiffParseError(f"Linha inesperada no hunk de {self._current.path}: {text}")
+        self._hunk.lines.append(kind + text[1:])
+
+    def _finish(self) -> list[FilePatch]:
+        if self._current is None:
+            return []
+        patch = self._current
+        lines = self._lines
+        patch.text = "".join(line if line.endswith("\n") else line + "\n" for line in lines)
+        self._current = None
+        self._hunk = None
+        self._lines = []
+        return [patch]
+
+
+    def _headerless(self) -> list[FilePatch]:
+        """The pending ``diff`` section if it ended without a ``---`` header."""
+        header, self._header = self._header, []
+        if not header or not header[0].startswith("diff "):
+            return []
+        paths = {}
+        for line in header[1:]:
+            key, _, value = line.rstrip("\r\n").partition(" ")
+            if key in ("rename", "copy"):
+                direction, _, path = value.partition(" ")
+                paths[direction] = path
+        match = GIT_HEADER.match(header[0].rstrip("\r\n"))
+        old_path, new_path = match.groups() if match else (header[0][5:].strip(),) * 2
+        text = "".join(line if line.endswith("\n") else line + "\n" for line in header)
+        return [FilePatch(paths.get("from", old_path), paths.get("to", new_path), text, unsupported=True)]
+
+
+def _find(lines: list[str], expected: list[str], start: int, floor: int) -> int | None:
+    """Index where ``expected`` occurs, nearest to ``start`` and not before ``floor``."""
+    if not expected:
+        return max(min(start, len(lines)), floor)
+    last = len(lines) - len(expected)
+    for distance in range(0, max(last + 1, 0) + abs(start) + 1):
+        for candidate in (start - distance, start + distance) if distance else (start,):
+            if floor <= candidate <= last and lines[candidate:candidate + len(expected)] == expected:
+                return candidate
+        if start - distance < floor and start + distance > last:
+            break
+    return None
+
+
+def apply_hunks(lines: list[str], hunks: list[Hunk], path: str) -> list[str]:
+    result: list[str] = []
+    position = 0
+    for hunk in hunks:
+        start = hunk.old_start - 1 if hunk.old_len else hunk.old_start
+        before = hunk.before
+        index = _find(lines, before, start, position)
+        if index is None:
+            raise PatchConflict(f"Hunk @@ -{hunk.old_start},{hunk.old_len} não confere com {path}")
+        result.extend(lines[position:index])
+        result.extend(hunk.after)
+        position = index + len(before)
+    result.extend(lines[position:])
+    return result
+
+
+def resolve(base_path: str, path: str) -> str:
+    """Absolute path of ``path`` inside ``base_path``; rejects escapes."""
+    base = os.path.realpath(base_path)
+    target = os.path.realpath(os.path.join(base, path))
+    if target != base and not target.startswith(base + os.sep):
+        raise PatchConflict(f"Caminho fora do repositório: {path}")
+    return target
+
+
+def dry_run(base_path: str, patches: list[FilePatch]) -> int:
+    """
+    Apply one file's patches in memory against its current content.
+    Returns the number of hunks; raises ``PatchConflict``.
+    """
+    first = patches[0]
+    source = resolve(base_path, first.old_path if not first.creates else first.new_path)
+    exists = os.path.isfile(source)
+    if first.creates:
+        if exists:
+            raise PatchConflict(f"Arquivo já existe: {first.path}")
+        lines: list[str] | None = []
+    else:
+        if not exists:
+            raise PatchConflict(f"Arquivo não encontrado: {first.path}")
+        with open(source, encoding="utf-8", errors="surrogateescape") as handle:
+            lines = [line.rstrip("\r") for line in handle.read().split("\n")]
+        if lines[-1] == "":
+            lines.pop()  # trailing newline
+
+    hunks = 0
+    for patch in patches:
+        if lines is None:
+            raise PatchConflict(f"Patch para arquivo já removido: {patch.path}")
+        if patch.creates and patch is not first:
+            raise PatchConflict(f"Arquivo criado mais de uma vez: {patch.path}")
+        lines = apply_hunks(lines, patch.hunks, patch.path)
+        hunks += len(patch.hunks)
+        if patch.deletes:
+            if lines:
+                raise PatchConflict(f"Remoção não confere com o conteúdo de {patch.path}")
+            lines = None
+    return hunks
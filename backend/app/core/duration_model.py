@@ -0,0 +1,148 @@
+"""
+Duration Model - Online estimates of pipeline execution durations
+
+Each finished execution updates running statistics (EWMA mean plus
+stochastic-approximation p50/p90) under progressively coarser keys:
+
+    (project, mode, target size bucket) -> (project, mode) -> (mode) -> all
+
+An estimate comes from the most specific key with at least ``min_samples``
+observations, falling back to ``default_seconds`` before anything has run.
+Target size is the project's indexed file count, bucketed in powers of 4.
+
+The model lives in memory: it is warmed from recent history on startup,
+updated as executions finish in this process and, every
+``eta_refresh_seconds``, rebuilt from that history again (in worker mode
+executions finish in other processes, so the API sees them no other way).
+A rebuild replaces the statistics rather than adding to them, so runs seen
+live are not counted twice.
+"""
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class DurationStats:
+    count: int = 0
+    mean: float = 0.0
+    p50: float = 0.0
+    p90: float = 0.0
+
+    def update(self, value: float, alpha: float) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.mean = self.p50 = self.p90 = value
+            return
+        # Plain averaging for the first samples, exponential afterwards
+        weight = max(alpha, 1.0 / self.count)
+        self.mean += weight * (value - self.mean)
+        step = weight * max(self.mean, 1e-3)
+        self.p50 = _quantile_step(self.p50, 0.5, value, step)
+        self.p90 = max(_quantile_step(self.p90, 0.9, value, step), self.p50)
+
+
+def _quantile_step(estimate: float, quantile: float, value: float, step: float) -> float:
+    """Stochastic-approximation update; a sample equal to the estimate leaves it."""
+    if value == estimate:
+        return estimate
+    return max(estimate + step * (quantile - (value < estimate)), 0.0)
+
+
+@dataclass(frozen=True)
+class Estimate:
+    p50: float
+    p90: float
+    amostras: int
+
+
+def size_bucket(tamanho_alvo: int | None) -> int | None:
+    if not tamanho_alvo:
+        return None
+    return int(math.log(tamanho_alvo, 4))
+
+
+class DurationModel:
+    def __init__(self, alpha: float = 0.2, min_samples: int = 3, default_seconds: float = 120.0):
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.default_seconds = default_seconds
+        self._stats: dict[tuple, DurationStats] = {}
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _keys(projeto_id: int, mode: str, tamanho_alvo: int | None) -> list[tuple]:
+        return [
+            ("projeto", projeto_id, mode, size_bucket(tamanho_alvo)),
+            ("projeto", projeto_id, mode),
+            ("mode", mode),
+            ("all",),
+        ]
+
+    def observe(self, projeto_id: int, mode: str, tamanho_alvo: int | None, seconds: float) -> None:
+        if seconds < 0:
+            return
+        for key in self._keys(projeto_id, mode, tamanho_alvo):
+            self._stats.setdefault(key, DurationStats()).update(seconds, self.alpha)
+
+    def estimate(self, projeto_id: int, mode: str, tamanho_alvo: int | None) -> Estimate:
+        fallback = None
+        for key in self._keys(projeto_id, mode, tamanho_alvo):
+            stats = self._stats.get(key)
+            if stats is None or not stats.count:
+                continue
+            if stats.count >= self.min_samples:
+                return Estimate(stats.p50, stats.p90, stats.count)
+            fallback = fallback or stats
+        if fallback is not None:
+            return Estimate(fallback.p50, fallback.p90, fallback.count)
+        return Estimate(self.default_seconds, self.default_seconds, 0)
+
+    def estimate_for(self, execucao) -> Estimate:
+        """Estimate for an execution (row or response): its project, mode and target size."""
+        return self.estimate(
+            execucao.projeto_id, (execucao.parametros_entrada or {}).get("mode", "review"), execucao.tamanho_alvo
+        )
+
+    def load(self, observations: Iterable[tuple[int, str, int | None, float]]) -> None:
+        """Replace the statistics with ones built from ``observations`` (oldest first)."""
+        fresh = DurationModel(self.alpha, self.min_samples, self.default_seconds)
+        for observation in observations:
+            fresh.observe(*observation)
+        self._stats = fresh._stats
+
+    def clear(self) -> None:
+        self._stats.clear()
+
+    def start(self, refresh: Callable[[], Awaitable[object]], interval: float) -> None:
+        """Call ``refresh`` (which reloads the history) every ``interval`` seconds."""
+        if self._task is None and interval > 0:
+            self._task = asyncio.create_task(self._run(refresh, interval), name="duration-model-refresh")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, refresh: Callable[[], Awaitable[object]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await refresh()
+            except Exception:
+                logger.exception("Failed to refresh the duration model")
+
+
+duration_model = DurationModel(
+    alpha=settings.eta_ewma_alpha,
+    min_samples=settings.eta_min_samples,
+    default_seconds=settings.eta_default_seconds
+)
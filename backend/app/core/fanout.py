@@ -0,0 +1,122 @@
+"""
+Fan-out - Sharding one execution over several targets
+
+An execution whose ``parametros_entrada`` lists several ``targets`` (paths
+or globs relative to the project's repository) runs one Core job per target,
+at most ``fanout_max_concurrency`` at a time, so a monorepo uses the Core's
+parallelism instead of one long sequential job. Globs are expanded once,
+when the execution is created, and the expanded list stored on the row
+(``alvos``) is what runs, at most ``fanout_max_targets`` of them.
+
+- logs of each sub-job are prefixed with its target (``[services/api] ...``)
+- results are merged into one document keyed by target, plus a summary
+- the run succeeds if every target does, fails if none does, and is
+  ``partial`` otherwise
+
+Sub-jobs are not checkpointed individually: an interrupted fan-out is
+cancelled in the Core and restarted from scratch rather than reattached.
+"""
+import glob
+import os
+from typing import Any
+
+from app.core.log_sink import LOG, LogEvent, LogSink
+
+GLOB_CHARS = frozenset("*?[")
+
+
+class TargetError(ValueError):
+    pass
+
+
+def parse_targets(params: dict) -> list[str]:
+    """The targets requested in ``parametros_entrada`` (``targets`` or a list ``target``)."""
+    targets = params.get("targets")
+    if targets is None:
+        target = params.get("target", ".")
+        targets = target if isinstance(target, list) else [target]
+    if not isinstance(targets, list) or not targets or not all(isinstance(t, str) and t for t in targets):
+        raise TargetError("targets deve ser uma lista não vazia de caminhos")
+    for target in targets:
+        if os.path.isabs(target) or ".." in target.replace("\\", "/").split("/"):
+            raise TargetError(f"Alvo fora do repositório: {target}")
+    return targets
+
+
+def expand_targets(targets: list[str], base_path: str | None) -> list[str]:
+    """
+    Globs expanded against ``base_path`` (sorted, deduplicated). Without a
+    checkout, or when a glob matches nothing, the pattern is passed through
+    as is and the Core decides.
+    """
+    expanded: list[str] = []
+    for target in targets:
+        matches = []
+        if base_path and os.path.isdir(base_path) and GLOB_CHARS & set(target):
+            matches = sorted(
+                os.path.relpath(match, base_path)
+                for match in glob.glob(os.path.join(base_path, target), recursive=True)
+            )
+        for match in matches or [target]:
+            if match not in expanded:
+                expanded.append(match)
+    return expanded
+
+
+def check_target_count(targets: list[str], limit: int) -> None:
+    if len(targets) > limit:
+        raise TargetError(f"{len(targets)} alvos excedem o limite de {limit} por execução")
+
+
+class TargetSink:
+    """
+    Sink of one sub-job: prefixes its lines with the target and turns Core
+    status changes into log lines. The sub-job's checkpoint is kept here
+    (for cancellation) instead of being passed on as the run's checkpoint.
+    """
+
+    def __init__(self, sink: LogSink | None, target: str):
+        self.sink = sink
+        self.target = target
+        self.execution_id: str | None = None
+        self.endpoint: str | None = None
+
+    async def publish(self, event: LogEvent) -> None:
+        if event.kind == LOG:
+            if event.execution_id is not None:
+                self.execution_id, self.endpoint = event.execution_id, event.endpoint
+            lines = event.lines
+        else:
+            lines = [f"status: {event.status}"]
+        if self.sink is not None and lines:
+            await self.sink.publish(LogEvent.log([f"[{self.target}] {line}" for line in lines]))
+
+
+def aggregate(results: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """One pipeline result from the per-target results (see module docs)."""
+    failed = [target for target, result in results.items() if not result.get("success")]
+    timings = [result.get("timings") or {} for result in results.values()]
+
+    def combine(key: str, pick, items=timings) -> float | None:
+        values = [item[key] for item in items if item.get(key) is not None]
+        return pick(values) if values else None
+
+    return {
+        "success": not failed,
+        "partial": bool(failed) and len(failed) < len(results),
+        "data": {
+            "alvos": {
+                target: {"result": (result.get("data") or {}).get("result")} if result.get("success")
+                else {"error": result.get("error")}
+                for target, result in results.items()
+            },
+            "resumo": {"total": len(results), "sucesso": len(results) - len(failed), "falha": len(failed)},
+        },
+        "error": f"{len(failed)} de {len(results)} alvos falharam: {', '.join(failed)}" if failed else None,
+        "elapsed_seconds": combine("elapsed_seconds", max, list(results.values())),
+        "timings": {
+            "submit": combine("submit", max),
+            "first_log": combine("first_log", min),
+            "core_run": combine("core_run", max),
+        },
+    }
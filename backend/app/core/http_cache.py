@@ -0,0 +1,185 @@
+"""
+HTTP Cache - Conditional GET (ETag/Last-Modified) and in-process response cache
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response, status
+
+from app.config import get_settings
+from app.core.responses import dumps
+
+settings = get_settings()
+
+
+@dataclass
+class CachedResponse:
+    """Serialized response body with its validators."""
+    body: bytes
+    etag: str
+    last_modified: datetime | None
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Small LRU cache of serialized responses with a TTL.
+
+    Keys are namespaced strings (e.g. ``projetos:{user_id}:...``) so writers can
+    invalidate everything under a prefix. The TTL bounds staleness when another
+    process changes the database behind our back (index warm-ups, workers).
+
+    Invalidation only reaches this process: when several API processes serve
+    requests the cache is disabled (``enabled=False``) and responses are always
+    built from the database, still answering 304 when the validators match.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, body: bytes, etag: str, last_modified: datetime | None = None) -> CachedResponse:
+        entry = CachedResponse(
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=time.monotonic() + self.ttl_seconds
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *prefixes: str) -> None:
+        """Drop every entry whose key starts with one of the prefixes."""
+        for key in [k for k in self._entries if k.startswith(prefixes)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    enabled=settings.web_concurrency <= 1
+)
+
+
+def projeto_cache_prefix(user_id: int) -> str:
+    return f"projetos:{user_id}:"
+
+
+def execucao_cache_key(user_id: int, execucao_id: int) -> str:
+    return f"execucoes:{user_id}:{execucao_id}"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Build a weak ETag from version columns (ids, timestamps, status...)."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+    If-None-Match takes precedence when both are present (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: W/"x" matches "x"
+        bare = etag.removeprefix("W/")
+        return "*" in candidates or etag in candidates or bare in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        current = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return current <= since
+    return False
+
+
+def _validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def build_response(request: Request, entry: CachedResponse) -> Response:
+    """Return 304 when the client copy is current, otherwise the cached body."""
+    headers = _validator_headers(entry.etag, entry.last_modified)
+    if is_not_modified(request, entry.etag, entry.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    load: Callable[[], Awaitable[Any]],
+    validators: Callable[[Any], tuple[str, datetime | None]],
+    render: Callable[[Any], Any],
+    store: bool = True,
+    storable: Callable[[Any], bool] | None = None
+) -> Response:
+    """
+    Serve a JSON GET through the response cache with conditional GET support.
+
+    ``load`` fetches the data from the database on a miss, ``validators`` derives
+    the ETag and Last-Modified from version columns and ``render`` converts the
+    data into the response schema. A 304 on a miss skips serialization entirely.
+    With ``store=False`` (or the cache disabled) the data is always loaded
+    (conditional GET still applies); ``storable`` can refuse to store
+    individual loaded values.
+    """
+    store = store and response_cache.enabled
+    entry = response_cache.get(key) if store else None
+    if entry is not None:
+        return build_response(request, entry)
+
+    data = await load()
+    etag, last_modified = validators(data)
+    if is_not_modified(request, etag, last_modified):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=_validator_headers(etag, last_modified)
+        )
+
+    body = dumps(render(data))
+    if store and (storable is None or storable(data)):
+        entry = response_cache.set(key, body, etag, last_modified)
+    else:
+        entry = CachedResponse(body=body, etag=etag, last_modified=last_modified, expires_at=0.0)
+    return build_response(request, entry)
@@ -0,0 +1,62 @@
+"""
+JSON Pointer - RFC 6901 lookups and opaque page cursors for result documents
+"""
+import base64
+from typing import Any
+
+
+class PointerError(ValueError):
+    """Malformed pointer or cursor."""
+
+
+class PointerNotFound(LookupError):
+    pass
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """``"/a/b~1c/0"`` -> ``["a", "b/c", "0"]``; ``""`` is the whole document."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PointerError("Ponteiro JSON deve começar com '/'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def resolve(document: Any, pointer: str) -> Any:
+    value = document
+    for token in parse_pointer(pointer):
+        if isinstance(value, dict):
+            if token not in value:
+                raise PointerNotFound(pointer)
+            value = value[token]
+        elif isinstance(value, list):
+            if not token.isdigit() or (len(token) > 1 and token[0] == "0") or int(token) >= len(value):
+                raise PointerNotFound(pointer)
+            value = value[int(token)]
+        else:
+            raise PointerNotFound(pointer)
+    return value
+
+
+def select_fields(value: Any, fields: list[str]) -> Any:
+    """Keep only ``fields`` of an object, or of each object in a list."""
+    if isinstance(value, dict):
+        return {key: value[key] for key in fields if key in value}
+    if isinstance(value, list):
+        return [select_fields(item, fields) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, offset = raw.split(":", 1)
+        if prefix != "o" or not offset.isdigit():
+            raise ValueError(raw)
+        return int(offset)
+    except ValueError:
+        raise PointerError("Cursor inválido")
@@ -0,0 +1,201 @@
+"""
+Log Sink - Bounded delivery of Core logs and status events to consumers
+
+The orchestrator's Core reader publishes ``LogEvent``s to a ``LogSink``.
+``LogStream`` is the sink used for pipeline executions: it fans every event
+out to its subscribers (the DB writer, live viewers), each reading from its
+own bounded queue with an overflow policy:
+
+- ``block``: the publisher waits for room. This pushes back on the Core
+  reader, which simply polls the Core later; the Core keeps the logs.
+- ``coalesce``: the event is merged into the newest queued one (log lines are
+  concatenated, a status replaces the previous status). If the kinds differ
+  the publisher waits for room as with ``block``: nothing is lost.
+- ``drop_oldest``: the oldest queued event is discarded and counted. Only for
+  live viewers; the DB writer must see every line.
+
+A whole batch of Core log lines is a single event, and publishing never
+spawns tasks, so a burst of 10k lines costs a few queue operations.
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Protocol
+
+from app.core.metrics import log_events_dropped
+
+LOG = "log"
+STATUS = "status"
+
+BLOCK = "block"
+COALESCE = "coalesce"
+DROP_OLDEST = "drop_oldest"
+OVERFLOW_POLICIES = (BLOCK, COALESCE, DROP_OLDEST)
+
+
+@dataclass
+class LogEvent:
+    """
+    A batch of log lines or a status change.
+
+    Log events may carry a checkpoint (``execution_id``/``log_cursor``, and
+    the ``endpoint`` of the Core running the job): the Core job and how many
+    of its logs have been read once these lines are.
+    """
+    kind: str
+    lines: list[str] = field(default_factory=list)
+    status: str | None = None
+    execution_id: str | None = None
+    log_cursor: int | None = None
+    endpoint: str | None = None
+
+    @classmethod
+    def log(
+        cls,
+        lines: list[str],
+        execution_id: str | None = None,
+        log_cursor: int | None = None,
+        endpoint: str | None = None
+    ) -> "LogEvent":
+        return cls(LOG, lines=list(lines), execution_id=execution_id, log_cursor=log_cursor, endpoint=endpoint)
+
+    @classmethod
+    def state(cls, status: str) -> "LogEvent":
+        return cls(STATUS, status=status)
+
+    def merged(self, newer: "LogEvent") -> "LogEvent | None":
+        """
+        This event followed by ``newer`` as a single event, or None if the
+        kinds differ. Returns a new object: events are shared by subscribers.
+        """
+        if newer.kind != self.kind:
+            return None
+        if self.kind == STATUS:
+            return newer
+        checkpoint = newer if newer.log_cursor is not None else self
+        return LogEvent.log(
+            self.lines + newer.lines, checkpoint.execution_id, checkpoint.log_cursor, checkpoint.endpoint
+        )
+
+
+class LogSink(Protocol):
+    """Anything the orchestrator can publish log and status events to."""
+
+    async def publish(self, event: LogEvent) -> None: ...
+
+
+class Subscription:
+    """One consumer's bounded queue (see module docs for the policies)."""
+
+    def __init__(self, maxsize: int = 256, policy: str = BLOCK, name: str = "viewer"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}; expected one of {OVERFLOW_POLICIES}")
+        self.maxsize = max(maxsize, 1)
+        self.policy = policy
+        self.name = name
+        self.dropped = 0
+        self.closed = False
+        self._events: deque[LogEvent] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    async def put(self, event: LogEvent) -> None:
+        if self.closed:
+            return
+        if len(self._events) >= self.maxsize:
+            if self.policy == COALESCE and (merged := self._events[-1].merged(event)):
+                self._events[-1] = merged
+                return
+            if self.policy == DROP_OLDEST:
+                self._events.popleft()
+                self.dropped += 1
+                log_events_dropped.labels(self.name).inc()
+            else:
+                # block, or coalesce with nothing to merge into
+                while len(self._events) >= self.maxsize and not self.closed:
+                    self._writable.clear()
+                    await self._writable.wait()
+                if self.closed:
+                    return
+        self._events.append(event)
+        self._readable.set()
+
+    async def get(self) -> LogEvent | None:
+        """Next event, or None once closed and drained."""
+        while not self._events:
+            if self.closed:
+                return None
+            self._readable.clear()
+            await self._readable.wait()
+        event = self._events.popleft()
+        self._writable.set()
+        return event
+
+    async def get_batch(self) -> list[LogEvent]:
+        """Wait for at least one event and take everything queued; [] once closed and drained."""
+        first = await self.get()
+        if first is None:
+            return []
+        batch = [first, *self._events]
+        self._events.clear()
+        self._writable.set()
+        return batch
+
+    def close(self, discard: bool = False) -> None:
+        """Stop accepting events; readers drain what is queued unless ``discard``."""
+        self.closed = True
+        if discard:
+            self._events.clear()
+        self._readable.set()
+        self._writable.set()
+
+    async def __aiter__(self) -> AsyncIterator[LogEvent]:
+        while (event := await self.get()) is not None:
+            yield event
+
+
+class LogStream:
+    """Fan-out ``LogSink``: every subscriber sees every event, in order."""
+
+    def __init__(self):
+        self._subscribers: list[Subscription] = []
+        self.closed = False
+        # Last published event carrying a checkpoint, persisted or not
+        self.checkpoint: LogEvent | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, maxsize: int = 256, policy: str = BLOCK, name: str = "viewer") -> Subscription:
+        subscription = Subscription(maxsize, policy, name)
+        if self.closed:
+            subscription.close()
+        else:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close(discard=True)
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    async def publish(self, event: LogEvent) -> None:
+        if event.log_cursor is not None:
+            self.checkpoint = event
+        for subscription in list(self._subscribers):
+            await subscription.put(event)
+
+    def close(self) -> None:
+        self.closed = True
+        for subscription in self._subscribers:
+            subscription.close()
+        self._subscribers.clear()
+
+
+# Streams of the executions running in this process, for live viewers
+active_streams: dict[int, LogStream] = {}
@@ -0,0 +1,152 @@
+"""
+File Manifest - Change detection for incremental project indexing
+
+``scan_tree`` stats every file under a root (top-level directories in
+parallel threads) and ``diff_manifest`` compares the result with the manifest
+of what was last indexed:
+
+- same size and mtime: unchanged, never read
+- new path: added; missing path: deleted
+- size or mtime differs: the file is hashed (in a thread pool); only a
+  different content hash makes it changed, a mere touch just refreshes the
+  manifest entry
+
+After a one-line edit in a large repository only the edited file is read.
+"""
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileState:
+    tamanho: int
+    modificado_ns: int
+    hash: str | None = None
+
+
+@dataclass
+class ManifestDiff:
+    """Result of comparing a scan with the manifest; paths are relative, POSIX style."""
+    added: dict[str, FileState] = field(default_factory=dict)
+    changed: dict[str, FileState] = field(default_factory=dict)
+    deleted: list[str] = field(default_factory=list)
+    touched: dict[str, FileState] = field(default_factory=dict)
+    unchanged: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.deleted)
+
+
+def _walk(root: str, start: str, ignore: frozenset[str]) -> dict[str, tuple[int, int]]:
+    found: dict[str, tuple[int, int]] = {}
+    stack = [start]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignore:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                        found[relative] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue  # vanished while scanning
+    return found
+
+
+def scan_tree(root: str, ignore: frozenset[str] = frozenset(), workers: int = 8) -> dict[str, tuple[int, int]]:
+    """``{relative_path: (size, mtime_ns)}`` for every regular file under ``root``."""
+    files: dict[str, tuple[int, int]] = {}
+    subdirs: list[str] = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignore:
+                    subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for found in executor.map(lambda start: _walk(root, start, ignore), subdirs):
+            files.update(found)
+    return files
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def diff_manifest(
+    root: str,
+    scanned: dict[str, tuple[int, int]],
+    manifest: dict[str, FileState],
+    workers: int = 8,
+    on_hashed: Callable[[int, int], None] | None = None
+) -> ManifestDiff:
+    """
+    Compare a scan with the manifest, hashing only files whose size or mtime
+    moved. ``on_hashed(done, total)`` reports hashing progress.
+    """
+    diff = ManifestDiff(deleted=[path for path in manifest if path not in scanned])
+    to_hash: list[str] = []
+    for path, (size, mtime_ns) in scanned.items():
+        known = manifest.get(path)
+        if known is not None and known.tamanho == size and known.modificado_ns == mtime_ns:
+            diff.unchanged += 1
+        else:
+            to_hash.append(path)
+
+    loop = asyncio.get_running_loop()
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        # Bounded chunks keep the number of in-flight futures small
+        chunk_size = max(workers, 1) * 16
+        for start in range(0, len(to_hash), chunk_size):
+            chunk = to_hash[start:start + chunk_size]
+            hashes = await asyncio.gather(*(
+                loop.run_in_executor(executor, _hash_or_none, os.path.join(root, path)) for path in chunk
+            ))
+            for path, content_hash in zip(chunk, hashes):
+                if content_hash is None:
+                    # Vanished or unreadable since the scan: treat as not there
+                    if path in manifest:
+                        diff.deleted.append(path)
+                    continue
+                size, mtime_ns = scanned[path]
+                state = FileState(size, mtime_ns, content_hash)
+                known = manifest.get(path)
+                if known is None:
+                    diff.added[path] = state
+                elif known.hash != content_hash:
+                    diff.changed[path] = state
+                else:
+                    diff.touched[path] = state
+            done += len(chunk)
+            if on_hashed:
+                on_hashed(done, len(to_hash))
+    return diff
+
+
+def _hash_or_none(path: str) -> str | None:
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
@@ -0,0 +1,403 @@
+"""
+Metrics - Prometheus-compatible instrumentation
+
+A small in-process registry (counters, gauges, histograms with labels) rendered
+in the Prometheus text exposition format at ``GET /metrics``. Fed by:
+
+- ``MetricsMiddleware``: per-route latency and DB query count/time per request
+- SQLAlchemy engine events: per-query duration
+- ``PipelineOrchestrator``: Core call latency and errors per endpoint
+- ``CorePool``: health and load of each Core adapter replica
+- execution gauges (running/queued) and dropped log events
+- plugin template cache hits/misses
+- ``EventLoopMonitor``: event-loop lag and slow callbacks
+"""
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+
+
+class _CounterChild(_Value):
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_Value):
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    @property
+    def value(self) -> float:
+        return self._default().value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _render_child(self, key, child) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_request_duration = registry.histogram(
+    "devflow_http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status")
+)
+http_requests_in_progress = registry.gauge(
+    "devflow_http_requests_in_progress", "HTTP requests currently being served"
+)
+
+# Database
+db_query_duration = registry.histogram(
+    "devflow_db_query_duration_seconds", "SQL statement duration by operation", ("operation",)
+)
+db_queries_per_request = registry.histogram(
+    "devflow_db_queries_per_request", "SQL statements issued per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+db_time_per_request = registry.histogram(
+    "devflow_db_time_per_request_seconds", "Time spent in SQL per HTTP request", ("route",)
+)
+
+# AkitaLLM Core
+core_request_duration = registry.histogram(
+    "devflow_core_request_duration_seconds", "AkitaLLM Core adapter call latency", ("endpoint",)
+)
+core_request_errors = registry.counter(
+    "devflow_core_request_errors_total", "AkitaLLM Core adapter call errors", ("endpoint",)
+)
+core_adapter_healthy = registry.gauge(
+    "devflow_core_adapter_healthy", "Whether a Core adapter endpoint is in rotation (1) or not (0)", ("url",)
+)
+core_adapter_active = registry.gauge(
+    "devflow_core_adapter_active", "Calls and executions in flight per Core adapter endpoint", ("url",)
+)
+
+# Executions
+executions_running = registry.gauge(
+    "devflow_executions_running", "Pipeline executions currently running"
+)
+executions_queued = registry.gauge(
+    "devflow_executions_queued", "Pipeline executions waiting to start"
+)
+plugin_template_cache = registry.counter(
+    "devflow_plugin_template_cache_total",
+    "Plugin template lookups by result (hit, miss, shared in-flight generation)", ("result",)
+)
+log_events_dropped = registry.counter(
+    "devflow_log_events_dropped_total", "Log/status events dropped by a full subscriber queue",
+    ("subscriber",)
+)
+
+# Event loop
+event_loop_lag = registry.histogram(
+    "devflow_event_loop_lag_seconds", "Delay between scheduled and actual loop wake-ups",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+event_loop_slow_callbacks = registry.counter(
+    "devflow_event_loop_slow_callbacks_total", "Loop stalls above the slow-callback threshold"
+)
+
+
+@dataclass
+class _RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[_RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach query timing listeners to an async engine."""
+    sync_engine = engine.sync_engine
+    if getattr(sync_engine, "_devflow_instrumented", False):
+        return
+    sync_engine._devflow_instrumented = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        db_query_duration.labels(operation).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+_PARAM_RE = re.compile(r"{([^}:]+)(:[^}]+)?}")
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Templated path of the matched route (e.g. ``/projetos/{projeto_id}``).
+
+    Depending on the FastAPI version, ``scope["route"]`` may belong to an
+    included router and carry only the path relative to its prefix, so the
+    prefix is recovered from the concrete request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    params = scope.get("path_params", {})
+    concrete = _PARAM_RE.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    path = scope.get("path", "")
+    if path.endswith(concrete):
+        return path[: len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Records latency and DB usage for every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress.dec()
+            _request_stats.reset(token)
+            # Templated path keeps label cardinality bounded
+            route_label = route_template(scope)
+            http_request_duration.labels(
+                scope["method"], route_label, str(status_code)
+            ).observe(time.perf_counter() - start)
+            db_queries_per_request.labels(route_label).observe(stats.queries)
+            db_time_per_request.labels(route_label).observe(stats.db_seconds)
+
+
+class EventLoopMonitor:
+    """
+    Periodically measures how late the loop wakes up a sleeping task.
+    Lag above ``slow_threshold`` means some callback blocked the loop.
+    """
+
+    def __init__(self, interval: float = 0.5, slow_threshold: float = 0.1):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-loop-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled - self.interval)
+            event_loop_lag.observe(lag)
+            if lag > self.slow_threshold:
+                event_loop_slow_callbacks.inc()
+                logger.warning("Event loop blocked for %.3fs", lag)
@@ -0,0 +1,289 @@
+"""
+Profiling - On-demand request profiling and background task sampling
+
+Two modes, selected by the ``X-Profile`` request header:
+
+- ``sample`` (default): a thread samples the request task's coroutine stack
+  every ``profile_sample_interval`` seconds. Because the stack is read from the
+  coroutine await chain, time spent *awaiting* the database or the Core is
+  captured too. Output is in the folded-stack format understood by
+  flamegraph.pl, speedscope and inferno.
+- ``cprofile``: deterministic cProfile of the thread while the request runs
+  (includes other concurrent requests; awaits are not attributed). Output is a
+  pstats ``.prof`` file (snakeviz, flameprof...).
+
+Profiles are written to ``settings.profile_dir`` and the file name is returned
+in the ``X-Profile-File`` response header. Only allowed when the request
+carries a valid ``X-Admin-Token``.
+
+cProfile hooks the whole thread, so only one cProfile request runs at a
+time; an overlapping one gets 409.
+"""
+import asyncio
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.core.security import verify_admin_token
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+def task_stack(task: asyncio.Task, loop_frame=None) -> list[str]:
+    """
+    Root-to-leaf stack of a task, following the coroutine await chain.
+    When the task is currently running on the loop thread, the synchronous
+    frames above its innermost coroutine are appended as well.
+    """
+    stack: list[str] = []
+    innermost = None
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+        )
+        if frame is None:
+            break
+        stack.append(_frame_label(frame))
+        innermost = frame
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+
+    if awaitable is not None:
+        stack.append(f"<await {type(awaitable).__name__}>")
+    elif loop_frame is not None and innermost is not None:
+        running: list[str] = []
+        frame = loop_frame
+        while frame is not None and frame is not innermost:
+            running.append(_frame_label(frame))
+            frame = frame.f_back
+        if frame is innermost:
+            stack.extend(reversed(running))
+    return stack
+
+
+class StackSampler:
+    """Samples the stacks of registered asyncio tasks from a helper thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._loop_thread_id: int | None = None
+
+    def add_task(self, task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks.add(task)
+
+    def start(self) -> None:
+        """Start sampling; must be called from the event loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        loop_frame = sys._current_frames().get(self._loop_thread_id)
+        with self._lock:
+            tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            try:
+                stack = task_stack(task, loop_frame)
+            except (AttributeError, ValueError, RuntimeError):
+                continue  # stack changed under us; skip this sample
+            if stack:
+                with self._lock:
+                    self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def drain(self) -> Counter[str]:
+        """Return and reset the collected stacks."""
+        with self._lock:
+            stacks, self.stacks = self.stacks, Counter()
+        return stacks
+
+
+def render_folded(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile_path(name: str) -> Path:
+    directory = Path(settings.profile_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / name
+
+
+def write_profile(name: str, content: str | bytes) -> Path:
+    path = profile_path(name)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content, encoding="utf-8")
+    return path
+
+
+def _profile_name(scope: Scope, extension: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", scope.get("path", "")).strip("-") or "root"
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    return f"{stamp}-{scope.get('method', 'GET').lower()}-{slug}.{extension}"
+
+
+def profiling_allowed(headers: Headers) -> bool:
+    return verify_admin_token(headers.get("x-admin-token"))
+
+
+# Held while a cProfile request runs (the profiler is per thread, not per task)
+_cprofile_lock = threading.Lock()
+
+
+class ProfilingMiddleware:
+    """Profiles requests carrying an ``X-Profile`` header (see module docs)."""
+
+    def __init__(self, app: ASGIApp, sample_interval: float = 0.005):
+        self.app = app
+        self.sample_interval = sample_interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        mode = headers.get("x-profile")
+        if not mode or not profiling_allowed(headers):
+            await self.app(scope, receive, send)
+            return
+
+        mode = mode.strip().lower()
+        name = _profile_name(scope, "prof" if mode == "cprofile" else "folded")
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])["X-Profile-File"] = name
+            await send(message)
+
+        if mode == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                response = JSONResponse(
+                    {"detail": "Outro perfil cProfile em andamento"}, status_code=409
+                )
+                await response(scope, receive, send)
+                return
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profiler.disable()
+                    profiler.dump_stats(str(profile_path(name)))
+            finally:
+                _cprofile_lock.release()
+            return
+
+        sampler = StackSampler(self.sample_interval)
+        sampler.add_task(asyncio.current_task())
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - start
+            write_profile(name, render_folded(sampler.drain()))
+            logger.info("Profiled %s %s in %.3fs -> %s", scope["method"], scope["path"], elapsed, name)
+
+
+class BackgroundProfiler:
+    """
+    Continuous low-rate sampling of pipeline tasks (``run_pipeline_task``).
+    Every ``flush_seconds`` the collected stacks are written to a
+    ``background-<timestamp>.folded`` file in the profile directory.
+    """
+
+    def __init__(self, interval: float, flush_seconds: float = 60.0):
+        self.sampler = StackSampler(interval)
+        self.flush_seconds = flush_seconds
+        self._task: asyncio.Task | None = None
+
+    def track(self, task: asyncio.Task | None) -> None:
+        if task is not None:
+            self.sampler.add_task(task)
+
+    def start(self) -> None:
+        self.sampler.start()
+        self._task = asyncio.create_task(self._flush_loop(), name="background-profiler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.sampler.stop()
+        self.flush()
+
+    def flush(self) -> Path | None:
+        stacks = self.sampler.drain()
+        if not stacks:
+            return None
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        return write_profile(f"background-{stamp}.folded", render_folded(stacks))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            self.flush()
+
+
+background_profiler = BackgroundProfiler(
+    interval=settings.profile_background_interval or 1.0,
+    flush_seconds=settings.profile_background_flush_seconds
+)
+
+
+def track_pipeline_task() -> None:
+    """Register the current task for background sampling (no-op when disabled)."""
+    if settings.profile_background_interval > 0:
+        background_profiler.track(asyncio.current_task())
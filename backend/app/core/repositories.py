@@ -0,0 +1,46 @@
+"""
+Repositories - Where project checkouts may live
+
+A project's ``caminho_repositorio`` is walked and hashed by indexing, globbed
+by fan-out and patched by diff application, so it must resolve (symlinks
+included) inside ``repository_root``. Relative paths are taken relative to
+the root. Paths are confined when a project is saved and again before each
+use, which also covers rows saved before the root existed.
+"""
+import os
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+
+
+class RepositoryPathError(ValueError):
+    pass
+
+
+def resolve_repository(path: str) -> str:
+    """Real path of ``path`` under the repository root; raises outside it."""
+    root = os.path.realpath(get_settings().repository_root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise RepositoryPathError(f"Caminho fora da raiz de repositórios: {path}")
+    return resolved
+
+
+def checkout_path(caminho: str | None) -> str:
+    """The existing checkout a project points at, or 400."""
+    if not caminho:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Projeto sem caminho de repositório configurado"
+        )
+    try:
+        resolved = resolve_repository(caminho)
+    except RepositoryPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not os.path.isdir(resolved):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Caminho do repositório não encontrado"
+        )
+    return resolved
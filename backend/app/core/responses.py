@@ -0,0 +1,64 @@
+"""
+Responses - Fast JSON serialization for large payloads
+
+orjson is an optional dependency. When it is missing (or ``fast_json_enabled``
+is off) we fall back to Pydantic's own JSON serializer / the standard library.
+"""
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+settings = get_settings()
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_default(content: Any) -> bytes:
+    """Serialize the way FastAPI's default JSONResponse path does."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_fast(content: Any) -> bytes:
+    """Serialize with orjson, or Pydantic's Rust serializer when orjson is absent."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if isinstance(content, list) and all(isinstance(item, BaseModel) for item in content):
+        return b"[" + b",".join(item.model_dump_json().encode("utf-8") for item in content) + b"]"
+    return dumps_default(content)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a response payload using the configured encoder."""
+    if settings.fast_json_enabled:
+        return dumps_fast(content)
+    return dumps_default(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through :func:`dumps_fast`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_fast(content)
+
+
+def json_response_class() -> type[JSONResponse]:
+    """Response class for routers serving large execution/project payloads."""
+    return FastJSONResponse if settings.fast_json_enabled else JSONResponse
@@ -1,13 +1,13 @@
 """
 Security Module - JWT and password handling
 """
+import hmac
 from datetime import datetime, timedelta
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, TYPE_CHECKING
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,10 +16,19 @@ from app.database import get_db
 from app.models.usuario import Usuario
 from app.schemas.auth import TokenData
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
 settings = get_settings()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+
+# Password hashing (passlib/argon2 and jose are imported on first use to keep
+# application startup cheap)
+@lru_cache
+def get_pwd_context() -> "CryptContext":
+    """Get the cached password hashing context."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -27,16 +36,18 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
+    from jose import jwt
+
     to_encode = data.copy()
     
     if expires_delta:
@@ -58,6 +69,8 @@ async def get_current_user(
     Dependency that extracts and validates current user from JWT token.
     Raises 401 if token is invalid or user not found.
     """
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciais inválidas",
@@ -96,3 +109,25 @@ async def get_current_user(
         raise credentials_exception
     
     return user
+
+
+def verify_admin_token(token: str | None) -> bool:
+    """Check a token against ``settings.admin_token`` (disabled when unset)."""
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+async def require_admin(
+    x_admin_token: Annotated[str | None, Header()] = None
+) -> None:
+    """
+    Dependency for operational endpoints (profiling, diagnostics, metrics).
+    Requires a valid X-Admin-Token header; closed when no admin token is set.
+    """
+    if verify_admin_token(x_admin_token):
+        return
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Acesso restrito a administradores"
+    )
@@ -0,0 +1,76 @@
+"""
+Startup Report - Breakdown of import and initialization cost
+
+The lifespan logs a report of the phases recorded here. For a per-package
+import breakdown run:
+
+    python -m app.core.startup
+"""
+import logging
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Reuse uvicorn's configured handler so the report shows up in server logs
+logger = logging.getLogger("uvicorn.error")
+
+_PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    """Records named startup phases and their durations."""
+
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+
+    def record(self, name: str, start: float) -> None:
+        """Record a phase that started at ``start`` (perf_counter) and ends now."""
+        self.phases.append((name, time.perf_counter() - start))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def as_dict(self) -> dict[str, float]:
+        report = {name: round(seconds * 1000, 2) for name, seconds in self.phases}
+        report["total_since_import"] = round((time.perf_counter() - _PROCESS_START) * 1000, 2)
+        return report
+
+    def render(self) -> str:
+        lines = [f"  {name:<32}{ms:>10.1f} ms" for name, ms in self.as_dict().items()]
+        return "Startup report:\n" + "\n".join(lines)
+
+    def log(self) -> None:
+        logger.info(self.render())
+
+
+startup_report = StartupReport()
+
+
+def import_breakdown(module: str = "app.main", top: int = 15) -> list[tuple[str, float]]:
+    """
+    Cumulative import time per top-level package, measured in a fresh
+    interpreter with ``-X importtime``.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    totals: dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, _cumulative, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        totals[name.split(".")[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    for package, ms in import_breakdown(*sys.argv[1:2]):
+        print(f"{package:<32}{ms:>10.1f} ms")
@@ -1,11 +1,20 @@
 """
 Database connection and session management
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # Create async engine
@@ -45,7 +54,146 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+_AFTER_COMMIT = "after_commit"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Run ``callback`` once the session's current transaction commits (it is
+    dropped on rollback). For side effects that must not be seen before the
+    data is: cache invalidation, handing a row to the scheduler.
+    """
+    session.sync_session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("after_commit callback failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+ALEMBIC_VERSIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+_REVISION_RE = re.compile(r"^(down_)?revision[^=]*=\s*['\"]?([\w]+)?['\"]?", re.MULTILINE)
+
+
+def alembic_heads(versions_dir: Path = ALEMBIC_VERSIONS_DIR) -> set[str]:
+    """
+    Head revisions of the migration scripts.
+    Parsed from the files directly so startup does not need to import Alembic.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for script in versions_dir.glob("*.py"):
+        for is_down, value in _REVISION_RE.findall(script.read_text(encoding="utf-8")):
+            if not value or value == "None":
+                continue
+            (parents if is_down else revisions).add(value)
+    return revisions - parents
+
+
+def schema_fingerprint() -> str:
+    """Stable hash of the ORM metadata (tables, columns, types, indexes)."""
+    import app.models  # noqa: F401 - register every table on Base.metadata
+
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        for column in table.columns:
+            parts.append(f"{column.name}:{column.type}:{column.nullable}:{column.primary_key}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"ix:{index.name}:{','.join(c.name for c in index.columns)}:{index.unique}")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+class SchemaError(RuntimeError):
+    """The live database does not match the models; startup must not go on."""
+
+
+async def _scalar_or_none(conn, sql: str):
+    try:
+        return (await conn.execute(text(sql))).scalar_one_or_none()
+    except SQLAlchemyError:
+        return None
+
+
+def _reflect_differences(sync_conn) -> tuple[list, list[str]]:
+    """Model tables missing from the live database, and missing columns of the others."""
+    inspector = inspect(sync_conn)
+    existing = set(inspector.get_table_names())
+    missing_tables = []
+    missing_columns = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            missing_tables.append(table)
+            continue
+        live = {column["name"] for column in inspector.get_columns(table.name)}
+        missing_columns.extend(f"{table.name}.{c.name}" for c in table.columns if c.name not in live)
+    return missing_tables, missing_columns
+
+
+async def check_schema(bind: AsyncEngine | None = None) -> str:
+    """
+    Verify the live schema against the models without reflecting every table
+    on each boot.
+
+    1. A database managed by Alembic must be at the migration head; any other
+       revision raises ``SchemaError`` (run ``alembic upgrade head``).
+    2. Otherwise, if the ``schema_fingerprint`` table holds the fingerprint of
+       the current models, the live schema was already verified against them.
+    3. Otherwise the live database is reflected. Missing tables are created;
+       missing columns raise ``SchemaError`` (``create_all`` cannot add them).
+       The fingerprint is stored only once the schema matches.
+
+    Returns which path was taken ("alembic", "fingerprint", "reflection" or
+    "create_all" when tables were created).
+    """
+    bind = bind or engine
+    fingerprint = schema_fingerprint()
+
+    async with bind.connect() as conn:
+        revision = await _scalar_or_none(conn, "SELECT version_num FROM alembic_version")
+        if revision is not None:
+            heads = alembic_heads()
+            if {revision} != heads:
+                raise SchemaError(
+                    f"Banco na revisão {revision}, migrações em {', '.join(sorted(heads))}: "
+                    "execute `alembic upgrade head`"
+                )
+            return "alembic"
+        await conn.rollback()
+        cached = await _scalar_or_none(conn, "SELECT fingerprint FROM schema_fingerprint")
+        if cached == fingerprint:
+            return "fingerprint"
+
+    async with bind.begin() as conn:
+        missing_tables, missing_columns = await conn.run_sync(_reflect_differences)
+        if missing_columns:
+            raise SchemaError(
+                f"Colunas ausentes no banco: {', '.join(missing_columns)}. "
+                "Aplique as migrações (`alembic upgrade head`) ou recrie o banco"
+            )
+        if missing_tables:
+            await conn.run_sync(Base.metadata.create_all, tables=missing_tables)
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_fingerprint (fingerprint VARCHAR(64) NOT NULL)"
+        ))
+        await conn.execute(text("DELETE FROM schema_fingerprint"))
+        await conn.execute(
+            text("INSERT INTO schema_fingerprint (fingerprint) VALUES (:fingerprint)"),
+            {"fingerprint": fingerprint}
+        )
+    return "create_all" if missing_tables else "reflection"
@@ -1,29 +1,89 @@
 """
 DevFlow API - Main Application
 """
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import logging
+import time
 
-from app.config import get_settings
-from app.database import init_db
-from app.routers import auth, usuarios, projetos, execucoes, plugins
+from app.core.startup import startup_report
+
+with startup_report.phase("import:framework"):
+    from contextlib import asynccontextmanager
+    from fastapi import Depends, FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse
+
+with startup_report.phase("import:config+database"):
+    from app.config import get_settings
+    from app.database import async_session, engine, init_db, check_schema
+
+with startup_report.phase("import:routers"):
+    from app.core.akita_wrapper import get_orchestrator
+    from app.core.compression import CompressionMiddleware
+    from app.core.duration_model import duration_model
+    from app.core.metrics import EventLoopMonitor, MetricsMiddleware, instrument_engine, registry
+    from app.core.profiling import ProfilingMiddleware, background_profiler
+    from app.core.security import require_admin
+    from app.routers import auth, usuarios, projetos, execucoes, plugins, diagnostics, sync, dashboard
+    from app.services.execucao_service import (
+        ExecucaoService, recover_orphaned_executions, refresh_duration_model, stop_cancelled_executions
+    )
+    from app.services.indice_service import IndiceService
+    from app.services.sync_service import SyncService
+    from app.tasks.scheduler import scheduler
+    from app.tasks.worker import inline_leases
 
 settings = get_settings()
+logger = logging.getLogger("uvicorn.error")
+
+loop_monitor = EventLoopMonitor(
+    interval=settings.event_loop_monitor_interval,
+    slow_threshold=settings.event_loop_slow_threshold
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
-    await init_db()
+    with startup_report.phase(f"init:schema ({settings.startup_schema_mode})"):
+        if settings.startup_schema_mode == "create_all":
+            await init_db()
+        elif settings.startup_schema_mode == "check":
+            await check_schema()
+    with startup_report.phase("init:scheduler"):
+        async with async_session() as db:
+            await ExecucaoService.warm_duration_model(db)
+            reattached, restored = await ExecucaoService.recover(db)
+            await IndiceService.reset_stale(db)
+            await SyncService.prune(db)
+    startup_report.log()
+    if reattached or restored:
+        logger.info("Reattached %d running and re-queued %d pending executions", reattached, restored)
+    if settings.metrics_enabled:
+        loop_monitor.start()
+    if settings.profile_background_interval > 0:
+        background_profiler.start()
+    get_orchestrator().pool.start()
+    duration_model.start(refresh_duration_model, settings.eta_refresh_seconds)
+    if settings.execution_mode != "worker":
+        inline_leases.start(recover_orphaned_executions, stop_cancelled_executions)
     yield
     # Shutdown
-    pass
+    await scheduler.shutdown(settings.shutdown_grace_seconds)
+    if settings.execution_mode != "worker":
+        # After the checkpoints: unfinished rows are free for the next process
+        await inline_leases.stop()
+    await IndiceService.shutdown()
+    await duration_model.stop()
+    await get_orchestrator().pool.stop()
+    await loop_monitor.stop()
+    if settings.profile_background_interval > 0:
+        await background_profiler.stop()
 
 
 
 # Trigger reload for aiosqlite installation
+app_init_start = time.perf_counter()
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
@@ -42,12 +102,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression (gzip/brotli, skipped for streaming responses)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
+# On-demand profiling (X-Profile header), only when it can be authorized
+if settings.admin_token:
+    app.add_middleware(ProfilingMiddleware, sample_interval=settings.profile_sample_interval)
+
+# Metrics (outermost, so latency includes every other middleware)
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
 # Routers
 app.include_router(auth.router, prefix="/auth", tags=["Autenticação"])
 app.include_router(usuarios.router, prefix="/usuarios", tags=["Usuários"])
 app.include_router(projetos.router, prefix="/projetos", tags=["Projetos"])
 app.include_router(execucoes.router, prefix="/execucoes", tags=["Execuções"])
 app.include_router(plugins.router, prefix="/plugins", tags=["Plugins"])
+app.include_router(diagnostics.router, prefix="/diagnostics", tags=["Diagnóstico"])
+app.include_router(sync.router, prefix="/sync", tags=["Sincronização"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+startup_report.record("init:app", app_init_start)
 
 
 @app.get("/", tags=["Health"])
@@ -58,3 +139,9 @@ async def root():
         "version": settings.app_version,
         "status": "healthy"
     }
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False, dependencies=[Depends(require_admin)])
+async def metrics():
+    """Prometheus metrics endpoint (X-Admin-Token, like the diagnostics endpoints)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
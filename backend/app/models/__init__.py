@@ -2,5 +2,8 @@
 from app.models.usuario import Usuario
 from app.models.projeto import Projeto
 from app.models.execucao import Execucao
+from app.models.arquivo_indexado import ArquivoIndexado
+from app.models.resultado_blob import ResultadoBlob
+from app.models.alteracao import Alteracao
 
-__all__ = ["Usuario", "Projeto", "Execucao"]
+__all__ = ["Usuario", "Projeto", "Execucao", "ArquivoIndexado", "ResultadoBlob", "Alteracao"]
@@ -0,0 +1,96 @@
+"""
+Alteracao Model - Sequência de alterações para sincronização incremental
+"""
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index, String, event, insert, inspect, literal, select
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.database import Base
+from app.models.execucao import Execucao
+from app.models.projeto import Projeto
+
+PROJETO = "projeto"
+EXECUCAO = "execucao"
+
+# Execution columns clients never see: progress writes to them are not changes
+_EXECUCAO_INTERNAL = frozenset({
+    "logs", "core_execution_id", "core_log_cursor", "core_endpoint",
+    "lease_owner", "lease_expira_em",
+})
+
+
+class Alteracao(Base):
+    """
+    One write to a project or execution, numbered by a monotonically
+    increasing id (the change sequence behind GET /sync).
+    """
+
+    __tablename__ = "alteracoes"
+    __table_args__ = (
+        Index("ix_alteracoes_usuario_id_id", "usuario_id", "id"),
+        # Never reuse ids of pruned rows
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    usuario_id: Mapped[int] = mapped_column(ForeignKey("usuarios.id"), nullable=False)
+    entidade: Mapped[str] = mapped_column(String(20), nullable=False)
+    entidade_id: Mapped[int] = mapped_column(nullable=False)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<Alteracao(id={self.id}, {self.entidade}={self.entidade_id})>"
+
+
+def _changed(obj) -> bool:
+    state = inspect(obj)
+    internal = _EXECUCAO_INTERNAL if isinstance(obj, Execucao) else frozenset()
+    return any(
+        attr.history.has_changes()
+        for attr in state.attrs
+        if attr.key not in internal and attr.key in state.mapper.column_attrs
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session: Session, flush_context) -> None:
+    """Append a change for every project/execution written by this flush."""
+    now = datetime.utcnow()
+    rows = []
+    seen = set()
+    written = (
+        *((obj, False) for obj in session.new),
+        *((obj, True) for obj in session.dirty),
+        *((obj, False) for obj in session.deleted),
+    )
+    for obj, dirty in written:
+        if isinstance(obj, Projeto):
+            entidade = PROJETO
+        elif isinstance(obj, Execucao):
+            entidade = EXECUCAO
+        else:
+            continue
+        if (entidade, obj.id) in seen or (dirty and not _changed(obj)):
+            continue
+        seen.add((entidade, obj.id))
+        rows.append({"usuario_id": obj.usuario_id, "entidade": entidade, "entidade_id": obj.id, "criado_em": now})
+    if rows:
+        session.connection().execute(insert(Alteracao), rows)
+
+
+def record_projeto_change(projeto_id: int):
+    """Change for a project written with a bulk UPDATE (which skips the flush hook)."""
+    return insert(Alteracao).from_select(
+        ["usuario_id", "entidade", "entidade_id", "criado_em"],
+        select(Projeto.usuario_id, literal(PROJETO), Projeto.id, literal(datetime.utcnow()))
+        .where(Projeto.id == projeto_id)
+    )
+
+
+def record_execucao_change(execucao_ids: list[int]):
+    """Changes for executions written with a bulk UPDATE (which skips the flush hook)."""
+    return insert(Alteracao).from_select(
+        ["usuario_id", "entidade", "entidade_id", "criado_em"],
+        select(Execucao.usuario_id, literal(EXECUCAO), Execucao.id, literal(datetime.utcnow()))
+        .where(Execucao.id.in_(execucao_ids))
+    )
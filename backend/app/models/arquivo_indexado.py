@@ -0,0 +1,30 @@
+"""
+ArquivoIndexado Model - Manifesto de arquivos indexados por projeto
+"""
+from sqlalchemy import BigInteger, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ArquivoIndexado(Base):
+    """
+    One file of a project's index manifest: what the Core was last sent for
+    this path. Size and mtime short-circuit change detection; the content
+    hash decides whether a touched file really changed.
+    """
+    
+    __tablename__ = "arquivos_indexados"
+    __table_args__ = (
+        UniqueConstraint("projeto_id", "caminho", name="uq_arquivos_indexados_projeto_caminho"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    projeto_id: Mapped[int] = mapped_column(ForeignKey("projetos.id"), nullable=False, index=True)
+    caminho: Mapped[str] = mapped_column(String(1000), nullable=False)
+    tamanho: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    modificado_ns: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<ArquivoIndexado(projeto_id={self.projeto_id}, caminho={self.caminho})>"
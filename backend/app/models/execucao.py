@@ -3,7 +3,7 @@ Execucao Model - Representa execuções de pipeline
 """
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import String, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -15,13 +15,25 @@ class StatusExecucao(str, Enum):
     RUNNING = "running"
     SUCCESS = "success"
     FAILED = "failed"
+    PARTIAL = "partial"  # multi-target run where some targets failed
     CANCELLED = "cancelled"
 
 
+class PrioridadeExecucao(str, Enum):
+    """Scheduling classes (see app.tasks.scheduler)."""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
 class Execucao(Base):
     """Pipeline execution entity with logs and results."""
     
     __tablename__ = "execucoes"
+    __table_args__ = (
+        Index("ix_execucoes_status_lease", "status", "lease_expira_em"),
+        # Latest executions per project (dashboard)
+        Index("ix_execucoes_projeto_iniciado", "projeto_id", "iniciado_em"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     projeto_id: Mapped[int] = mapped_column(ForeignKey("projetos.id"), nullable=False)
@@ -29,12 +41,43 @@ class Execucao(Base):
     status: Mapped[str] = mapped_column(
         String(20), default=StatusExecucao.PENDING.value
     )
+    prioridade: Mapped[str] = mapped_column(
+        String(20), default=PrioridadeExecucao.INTERACTIVE.value
+    )
     parametros_entrada: Mapped[dict] = mapped_column(JSON, default=dict)
+    # Targets with globs expanded at creation (what runs; None on older rows)
+    alvos: Mapped[list] = mapped_column(JSON, nullable=True)
+    # Indexed files under the target when created (duration model feature)
+    tamanho_alvo: Mapped[int] = mapped_column(nullable=True)
     logs: Mapped[str] = mapped_column(Text, default="")
     resultado: Mapped[dict] = mapped_column(JSON, nullable=True)
+    # Large results live in resultados_blob (see ResultadoService)
+    resultado_hash: Mapped[str] = mapped_column(
+        String(64), ForeignKey("resultados_blob.hash"), nullable=True, index=True
+    )
+    resultado_tamanho: Mapped[int] = mapped_column(nullable=True)
+    arquivado_em: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     iniciado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     finalizado_em: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     
+    # Core job checkpoint, used to reattach after a restart
+    core_execution_id: Mapped[str] = mapped_column(String(100), nullable=True)
+    core_log_cursor: Mapped[int] = mapped_column(default=0)
+    # Core adapter replica running the job (reattach/cancel go back to it)
+    core_endpoint: Mapped[str] = mapped_column(String(200), nullable=True)
+    
+    # Worker lease (execution_mode="worker")
+    lease_owner: Mapped[str] = mapped_column(String(100), nullable=True)
+    lease_expira_em: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    
+    # Timing breakdown (seconds)
+    espera_fila_segundos: Mapped[float] = mapped_column(nullable=True)
+    latencia_submissao_segundos: Mapped[float] = mapped_column(nullable=True)
+    tempo_primeiro_log_segundos: Mapped[float] = mapped_column(nullable=True)
+    tempo_core_segundos: Mapped[float] = mapped_column(nullable=True)
+    tempo_persistencia_logs_segundos: Mapped[float] = mapped_column(nullable=True)
+    tempo_finalizacao_segundos: Mapped[float] = mapped_column(nullable=True)
+    
     # Relationships
     projeto: Mapped["Projeto"] = relationship("Projeto", back_populates="execucoes")
     usuario: Mapped["Usuario"] = relationship("Usuario", back_populates="execucoes")
@@ -42,7 +85,23 @@ class Execucao(Base):
     def __repr__(self) -> str:
         return f"<Execucao(id={self.id}, status={self.status})>"
     
+    @property
+    def resultado_externo(self) -> bool:
+        """Whether the result is stored out of line (GET /execucoes/{id}/resultado)."""
+        return self.resultado_hash is not None
+    
     def append_log(self, message: str) -> None:
         """Append a log message with timestamp."""
         timestamp = datetime.utcnow().isoformat()
         self.logs = f"{self.logs}[{timestamp}] {message}\n"
+
+    def append_logs(self, messages: list[str]) -> None:
+        """Append several log messages at once (one string rebuild per batch)."""
+        if messages:
+            self.logs = (self.logs or "") + self.format_logs(messages)
+
+    @staticmethod
+    def format_logs(messages: list[str]) -> str:
+        """Log lines as stored: timestamped, newline-terminated."""
+        timestamp = datetime.utcnow().isoformat()
+        return "".join(f"[{timestamp}] {message}\n" for message in messages)
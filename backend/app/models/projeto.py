@@ -2,12 +2,20 @@
 Projeto Model - Representa projetos de desenvolvimento
 """
 from datetime import datetime
+from enum import Enum
 from sqlalchemy import String, Boolean, DateTime, Text, ForeignKey, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 
+class EstadoIndice(str, Enum):
+    """Whether the Core already holds an index of the project's repository."""
+    COLD = "cold"
+    WARMING = "warming"
+    WARM = "warm"
+
+
 class Projeto(Base):
     """Project entity containing pipeline configuration."""
     
@@ -17,6 +25,12 @@ class Projeto(Base):
     usuario_id: Mapped[int] = mapped_column(ForeignKey("usuarios.id"), nullable=False)
     nome: Mapped[str] = mapped_column(String(100), nullable=False)
     descricao: Mapped[str] = mapped_column(Text, nullable=True)
+    # Local checkout of the project's code, used for indexing
+    caminho_repositorio: Mapped[str] = mapped_column(String(500), nullable=True)
+    estado_indice: Mapped[str] = mapped_column(
+        String(20), default=EstadoIndice.COLD.value
+    )
+    indice_atualizado_em: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     idioma: Mapped[str] = mapped_column(String(10), default="en")
     temperatura: Mapped[float] = mapped_column(default=0.7)
     configuracao_pipeline: Mapped[dict] = mapped_column(JSON, default=dict)
@@ -28,8 +42,9 @@ class Projeto(Base):
     
     # Relationships
     usuario: Mapped["Usuario"] = relationship("Usuario", back_populates="projetos")
+    # Unbounded: query executions explicitly instead of loading this
     execucoes: Mapped[list["Execucao"]] = relationship(
-        "Execucao", back_populates="projeto", lazy="selectin"
+        "Execucao", back_populates="projeto", lazy="raise"
     )
     
     def __repr__(self) -> str:
@@ -0,0 +1,27 @@
+"""
+ResultadoBlob Model - Resultados grandes de execuções, fora da linha
+"""
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ResultadoBlob(Base):
+    """
+    A compressed execution result, addressed by the SHA-256 of its canonical
+    JSON. Executions with identical results share one blob; ``referencias``
+    counts them and the blob is deleted when it drops to zero.
+    """
+    
+    __tablename__ = "resultados_blob"
+    
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    conteudo: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    tamanho: Mapped[int] = mapped_column(Integer, nullable=False)  # uncompressed bytes
+    referencias: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<ResultadoBlob(hash={self.hash[:12]}, referencias={self.referencias})>"
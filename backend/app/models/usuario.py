@@ -24,11 +24,12 @@ class Usuario(Base):
     )
     
     # Relationships
+    # Unbounded (and the user is loaded on every request): query explicitly
     projetos: Mapped[list["Projeto"]] = relationship(
-        "Projeto", back_populates="usuario", lazy="selectin"
+        "Projeto", back_populates="usuario", lazy="raise"
     )
     execucoes: Mapped[list["Execucao"]] = relationship(
-        "Execucao", back_populates="usuario", lazy="selectin"
+        "Execucao", back_populates="usuario", lazy="raise"
     )
     
     def __repr__(self) -> str:
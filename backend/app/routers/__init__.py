@@ -1,4 +1,4 @@
 """Routers Package"""
-from app.routers import auth, usuarios, projetos, execucoes
+from app.routers import auth, usuarios, projetos, execucoes, plugins, diagnostics, sync, dashboard
 
-__all__ = ["auth", "usuarios", "projetos", "execucoes"]
+__all__ = ["auth", "usuarios", "projetos", "execucoes", "plugins", "diagnostics", "sync", "dashboard"]
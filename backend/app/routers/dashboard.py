@@ -0,0 +1,25 @@
+"""
+Dashboard Router - Resumo de projetos e execuções do usuário
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.usuario import Usuario
+from app.schemas.dashboard import DashboardResponse
+from app.core.security import get_current_user
+from app.core.responses import json_response_class
+from app.services.dashboard_service import DashboardService
+
+router = APIRouter(default_response_class=json_response_class())
+
+
+@router.get("/", response_model=DashboardResponse)
+async def get_dashboard(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """Active projects with their latest executions, queue counts and recent failures."""
+    return await DashboardService.summary(db, current_user.id)
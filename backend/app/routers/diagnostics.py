@@ -0,0 +1,113 @@
+"""
+Diagnostics Router - Endpoints operacionais (restritos a administradores)
+"""
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from app.config import get_settings
+from app.core.security import require_admin
+from app.core.diagnostics import (
+    memory_tracker,
+    task_counts,
+    database_stats,
+    http_client_stats,
+    process_stats
+)
+from app.database import engine
+
+settings = get_settings()
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """List stored request/background profiles, newest first."""
+    directory = Path(settings.profile_dir)
+    if not directory.is_dir():
+        return []
+    files = sorted(directory.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {"nome": f.name, "tamanho": f.stat().st_size}
+        for f in files if f.suffix in (".folded", ".prof")
+    ]
+
+
+@router.get("/profiles/{nome}")
+async def get_profile(nome: str):
+    """Download a profile (.folded for flamegraphs, .prof for pstats)."""
+    path = Path(settings.profile_dir) / nome
+    if Path(nome).name != nome or not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile não encontrado"
+        )
+    return FileResponse(path, media_type="text/plain" if path.suffix == ".folded" else "application/octet-stream")
+
+
+@router.get("/processo")
+async def get_process():
+    """Process memory, live tasks, DB sessions/connections and HTTP connections."""
+    # Tasks are read on the loop; the GC heap walks run off it
+    tarefas = task_counts()
+    return {
+        "processo": await run_in_threadpool(process_stats),
+        "tarefas": tarefas,
+        "banco": await run_in_threadpool(database_stats, engine),
+        "http": await run_in_threadpool(http_client_stats),
+        "tracemalloc_ativo": memory_tracker.tracing,
+    }
+
+
+@router.get("/tarefas")
+async def get_tasks():
+    """Live asyncio tasks grouped by coroutine name."""
+    return task_counts()
+
+
+@router.post("/memoria/iniciar", status_code=status.HTTP_204_NO_CONTENT)
+async def start_tracemalloc(frames: int = 10):
+    """Start tracemalloc (adds allocation overhead until stopped)."""
+    memory_tracker.start(frames)
+
+
+@router.post("/memoria/parar", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_tracemalloc():
+    """Stop tracemalloc and discard stored snapshots."""
+    memory_tracker.stop()
+
+
+@router.get("/memoria/snapshots")
+async def list_snapshots():
+    """List stored tracemalloc snapshots."""
+    return memory_tracker.list_snapshots()
+
+
+@router.post("/memoria/snapshots", status_code=status.HTTP_201_CREATED)
+async def take_snapshot():
+    """Take a tracemalloc snapshot (tracemalloc must be started)."""
+    try:
+        return await run_in_threadpool(memory_tracker.take_snapshot)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.get("/memoria/snapshots/{snapshot_id}/diff")
+async def diff_snapshots(
+    snapshot_id: int,
+    base: int,
+    agrupar: str = "lineno",
+    limite: int = 25
+):
+    """Allocation growth between ``base`` and ``snapshot_id``."""
+    if agrupar not in ("lineno", "filename", "traceback"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="agrupar deve ser lineno, filename ou traceback"
+        )
+    try:
+        return await run_in_threadpool(memory_tracker.diff, snapshot_id, base, agrupar, limite)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
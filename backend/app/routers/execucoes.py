@@ -1,18 +1,48 @@
 """
 Execucoes Router - Gerenciamento de execuções de pipeline
 """
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
+from app.models.execucao import StatusExecucao
 from app.models.usuario import Usuario
-from app.schemas.execucao import ExecucaoResponse, ExecucaoLogsResponse
+from app.schemas.execucao import ExecucaoResponse, ExecucaoLogsResponse, ExecucaoResultadoResponse
 from app.core.security import get_current_user
+from app.core.responses import json_response_class
+from app.core.http_cache import cached_json_response, compute_etag, execucao_cache_key
 from app.services.execucao_service import ExecucaoService
+from app.services.export_service import MEDIA_TYPES, ExportService
 
-router = APIRouter()
+settings = get_settings()
+router = APIRouter(default_response_class=json_response_class())
+
+ATIVOS = (StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value)
+
+
+def _execucao_validators(execucao: ExecucaoResponse):
+    # Only state that moves on an event (a write, a queue change, a new
+    # duration sample): the wait and a pending run's completion estimate are
+    # recomputed from the clock on every request and would never match.
+    # A running job's completion only moves when it overruns its p50.
+    conclusao = execucao.conclusao_estimada_em if execucao.status == StatusExecucao.RUNNING.value else None
+    etag = compute_etag(
+        execucao.id, execucao.status, execucao.finalizado_em, execucao.posicao_fila, execucao.arquivado_em,
+        execucao.duracao_estimada_segundos, conclusao
+    )
+    if execucao.status in ATIVOS:
+        # Position and estimates move without a write: no Last-Modified
+        return etag, None
+    return etag, execucao.arquivado_em or execucao.finalizado_em or execucao.iniciado_em
+
+
+async def _load_execucao(db: AsyncSession, execucao_id: int, user_id: int) -> ExecucaoResponse:
+    return ExecucaoService.to_response(await ExecucaoService.get_by_id(db, execucao_id, user_id))
 
 
 @router.get("/", response_model=list[ExecucaoResponse])
@@ -20,20 +50,93 @@ async def list_execucoes(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[Usuario, Depends(get_current_user)],
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    projeto_id: int | None = None,
+    status_execucao: Annotated[str | None, Query(alias="status")] = None,
+    desde: datetime | None = None,
+    ate: datetime | None = None
 ):
-    """List all executions for the current user."""
-    return await ExecucaoService.list_by_user(db, current_user.id, skip, limit)
+    """List the current user's executions, optionally by project, status and start time."""
+    execucoes = await ExecucaoService.list_by_user(
+        db, current_user.id, skip, limit,
+        projeto_id=projeto_id, status_execucao=status_execucao, desde=desde, ate=ate
+    )
+    return [ExecucaoService.to_response(execucao) for execucao in execucoes]
+
+
+@router.get("/exportar")
+async def export_execucoes(
+    current_user: Annotated[Usuario, Depends(get_current_user)],
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    compactar: bool = False,
+    incluir_logs: bool = False,
+    projeto_id: int | None = None,
+    status_execucao: Annotated[str | None, Query(alias="status")] = None,
+    desde: datetime | None = None,
+    ate: datetime | None = None
+):
+    """
+    Stream the execution history (same filters as the listing) as NDJSON or
+    CSV, gzip-compressed with ``compactar``. Logs only with ``incluir_logs``.
+    """
+    return StreamingResponse(
+        ExportService.export(
+            current_user.id, formato, incluir_logs, compactar,
+            projeto_id=projeto_id, status_execucao=status_execucao, desde=desde, ate=ate
+        ),
+        media_type="application/gzip" if compactar else MEDIA_TYPES[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="{ExportService.filename(formato, compactar)}"'
+        }
+    )
 
 
 @router.get("/{execucao_id}", response_model=ExecucaoResponse)
 async def get_execucao(
     execucao_id: int,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[Usuario, Depends(get_current_user)]
 ):
-    """Get execution details by ID."""
-    return await ExecucaoService.get_by_id(db, execucao_id, current_user.id)
+    """Get execution details by ID (supports conditional GET)."""
+    # Pending and running rows change without a write in this process (queue
+    # position, estimates; in worker mode the status too): those, and every
+    # row in worker mode, are only revalidated, never stored
+    return await cached_json_response(
+        request,
+        execucao_cache_key(current_user.id, execucao_id),
+        load=lambda: _load_execucao(db, execucao_id, current_user.id),
+        validators=_execucao_validators,
+        render=lambda execucao: execucao,
+        store=settings.execution_mode != "worker",
+        storable=lambda execucao: execucao.status not in ATIVOS
+    )
+
+
+@router.get("/{execucao_id}/resultado", response_model=ExecucaoResultadoResponse)
+async def get_execucao_resultado(
+    execucao_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)],
+    pointer: str = "",
+    campos: str | None = None,
+    limite: Annotated[int | None, Query(ge=1, le=1000)] = None,
+    cursor: str | None = None
+):
+    """
+    Get the execution result, or part of it.
+
+    - ``pointer``: JSON pointer (RFC 6901) into the result, e.g. ``/findings``
+    - ``campos``: comma-separated fields to keep (of an object, or of each
+      object in a list)
+    - ``limite`` / ``cursor``: page through a list; follow ``proximo_cursor``
+
+    Example: ``?pointer=/findings&limite=10&campos=titulo,severidade``
+    """
+    selected = [campo.strip() for campo in campos.split(",") if campo.strip()] if campos else None
+    return await ExecucaoService.get_resultado(
+        db, execucao_id, current_user.id, pointer, selected, limite, cursor
+    )
 
 
 @router.get("/{execucao_id}/logs", response_model=ExecucaoLogsResponse)
@@ -46,6 +149,21 @@ async def get_execucao_logs(
     return await ExecucaoService.get_by_id(db, execucao_id, current_user.id)
 
 
+@router.get("/{execucao_id}/logs/stream")
+async def stream_execucao_logs(
+    execucao_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """Stream execution logs live as server-sent events."""
+    execucao = await ExecucaoService.get_by_id(db, execucao_id, current_user.id)
+    return StreamingResponse(
+        ExecucaoService.stream_logs(execucao.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 @router.post("/{execucao_id}/cancelar", response_model=ExecucaoResponse)
 async def cancel_execucao(
     execucao_id: int,
@@ -53,4 +171,14 @@ async def cancel_execucao(
     current_user: Annotated[Usuario, Depends(get_current_user)]
 ):
     """Cancel a pending or running execution."""
-    return await ExecucaoService.cancel(db, execucao_id, current_user.id)
+    return ExecucaoService.to_response(await ExecucaoService.cancel(db, execucao_id, current_user.id))
+
+
+@router.post("/{execucao_id}/arquivar", response_model=ExecucaoResponse)
+async def archive_execucao(
+    execucao_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """Archive a finished execution: its result is discarded, logs and timings are kept."""
+    return await ExecucaoService.archive(db, execucao_id, current_user.id)
@@ -1,18 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any, Optional
-from app.core.akita_wrapper import get_orchestrator, PipelineOrchestrator
-from pydantic import BaseModel
+"""
+Plugins Router - Geração de templates de plugins via Core
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response, status
+
+from app.models.usuario import Usuario
+from app.schemas.plugin import PluginGenerateRequest, PluginJobResponse, PluginTemplateResponse
+from app.core.security import get_current_user
+from app.services.plugin_service import PluginService
 
 router = APIRouter()
 
-class PluginGenerateRequest(BaseModel):
-    name: str
-    description: str
-    tools: Optional[List[Dict[str, Any]]] = None
-
-@router.post("/generate") # This will be prefixed with /plugins in main.py
-async def generate_plugin(req: PluginGenerateRequest, orchestrator: PipelineOrchestrator = Depends(get_orchestrator)):
-    template = await orchestrator.generate_plugin_template(req.name, req.description, req.tools)
-    if not template:
-        raise HTTPException(status_code=500, detail="Failed to generate plugin template from Core")
-    return {"template": template}
+
+@router.post(
+    "/generate",  # This will be prefixed with /plugins in main.py
+    response_model=PluginTemplateResponse | PluginJobResponse,
+    responses={202: {"model": PluginJobResponse}}
+)
+async def generate_plugin(
+    req: PluginGenerateRequest,
+    response: Response,
+    current_user: Annotated[Usuario, Depends(get_current_user)],
+    async_mode: bool = False
+):
+    """
+    Generate a plugin template. Identical specs are served from cache.
+
+    With ``async_mode=true`` the generation runs in the background and the
+    response is 202 with a ``status_url`` to poll (GET /plugins/jobs/{id}).
+    """
+    if async_mode:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return PluginJobResponse.model_validate(PluginService.start_job(req, current_user.id))
+    return PluginTemplateResponse(template=await PluginService.generate(req))
+
+
+@router.get("/jobs/{job_id}", response_model=PluginJobResponse)
+async def get_plugin_job(
+    job_id: str,
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """Status of an asynchronous template generation."""
+    return PluginService.get_job(job_id, current_user.id)
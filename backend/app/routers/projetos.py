@@ -3,22 +3,46 @@ Projetos Router - CRUD de projetos
 """
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import after_commit, get_db
+from app.models.projeto import Projeto
 from app.models.usuario import Usuario
 from app.schemas.projeto import ProjetoCreate, ProjetoUpdate, ProjetoResponse
-from app.schemas.execucao import ExecucaoCreate, ExecucaoResponse
+from app.schemas.execucao import ExecucaoCreate, ExecucaoResponse, ExecucaoTemposAgregados
+from app.schemas.indice import IndexacaoResponse
+from app.schemas.diff import DiffAplicacaoResponse
 from app.core.security import get_current_user
+from app.core.responses import json_response_class
+from app.core.http_cache import cached_json_response, compute_etag, projeto_cache_prefix
 from app.services.projeto_service import ProjetoService
-from app.services.execucao_service import ExecucaoService, run_pipeline_task
+from app.services.execucao_service import ExecucaoService
+from app.services.indice_service import IndiceService
+from app.services.diff_service import DiffService
 
-router = APIRouter()
+router = APIRouter(default_response_class=json_response_class())
+
+
+def _last_modified(projeto: Projeto):
+    # Index state changes move indice_atualizado_em, not atualizado_em
+    return max(filter(None, (projeto.atualizado_em, projeto.indice_atualizado_em)))
+
+
+def _projeto_validators(projeto: Projeto):
+    etag = compute_etag(projeto.id, projeto.atualizado_em.isoformat(), projeto.estado_indice)
+    return etag, _last_modified(projeto)
+
+
+def _projetos_validators(projetos: list[Projeto]):
+    etag = compute_etag(*(f"{p.id}:{p.atualizado_em.isoformat()}:{p.estado_indice}" for p in projetos))
+    last_modified = max((_last_modified(p) for p in projetos), default=None)
+    return etag, last_modified
 
 
 @router.get("/", response_model=list[ProjetoResponse])
 async def list_projetos(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[Usuario, Depends(get_current_user)],
     skip: int = 0,
@@ -26,8 +50,15 @@ async def list_projetos(
 ):
     """
     List all projects for the current user.
+    Supports conditional GET via ETag / Last-Modified.
     """
-    return await ProjetoService.list_by_user(db, current_user.id, skip, limit)
+    return await cached_json_response(
+        request,
+        f"{projeto_cache_prefix(current_user.id)}list:{skip}:{limit}",
+        load=lambda: ProjetoService.list_by_user(db, current_user.id, skip, limit),
+        validators=_projetos_validators,
+        render=lambda projetos: [ProjetoResponse.model_validate(p) for p in projetos]
+    )
 
 
 @router.post("/", response_model=ProjetoResponse, status_code=status.HTTP_201_CREATED)
@@ -43,11 +74,18 @@ async def create_projeto(
 @router.get("/{projeto_id}", response_model=ProjetoResponse)
 async def get_projeto(
     projeto_id: int,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[Usuario, Depends(get_current_user)]
 ):
-    """Get a specific project by ID."""
-    return await ProjetoService.get_by_id(db, projeto_id, current_user.id)
+    """Get a specific project by ID (supports conditional GET)."""
+    return await cached_json_response(
+        request,
+        f"{projeto_cache_prefix(current_user.id)}{projeto_id}",
+        load=lambda: ProjetoService.get_by_id(db, projeto_id, current_user.id),
+        validators=_projeto_validators,
+        render=ProjetoResponse.model_validate
+    )
 
 
 @router.put("/{projeto_id}", response_model=ProjetoResponse)
@@ -75,42 +113,87 @@ async def delete_projeto(
 async def create_execucao(
     projeto_id: int,
     execucao_data: ExecucaoCreate,
-    background_tasks: BackgroundTasks,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[Usuario, Depends(get_current_user)]
 ):
     """
     Initiate a new pipeline execution for a project.
     
-    The execution runs asynchronously. Use GET /execucoes/{id} to check status.
+    The execution is queued by the scheduler and runs asynchronously.
+    Use GET /execucoes/{id} to check status and queue position.
     
     Returns 202 Accepted with execution ID.
     """
-    # Create execution record via Service
     execucao = await ExecucaoService.create(
         db, 
         projeto_id, 
         current_user.id, 
-        execucao_data.parametros_entrada
+        execucao_data.parametros_entrada,
+        execucao_data.prioridade
     )
-    
-    # We need to re-fetch the project to get configuration for the pipeline
-    # (Or modify ExecucaoService.create to return it, but keeping it simple for now)
     projeto = await ProjetoService.get_by_id(db, projeto_id, current_user.id)
     
-    # Build pipeline config
-    # Merge project config/settings with execution params
-    pipeline_config = {
-        "mode": execucao_data.parametros_entrada.get("mode", "review"),
-        "target": execucao_data.parametros_entrada.get("target", "."),
-        "options": {
-            "language": projeto.idioma,
-            "temperature": projeto.temperatura,
-            "project_config": projeto.configuracao_pipeline
-        }
-    }
+    # The scheduler may start the run right away, so the row must be visible
+    after_commit(db, lambda: ExecucaoService.schedule(execucao, projeto))
     
-    # Schedule background execution
-    background_tasks.add_task(run_pipeline_task, execucao.id, pipeline_config)
-    
-    return execucao
+    return ExecucaoService.to_response(execucao)
+
+
+@router.get("/{projeto_id}/execucoes/tempos", response_model=ExecucaoTemposAgregados)
+async def get_execucao_tempos(
+    projeto_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """
+    Aggregate timing breakdown (queue wait, Core submit, first log, Core run,
+    log persistence, finalize) over the project's finished executions.
+    """
+    return await ExecucaoService.timing_summary(db, projeto_id, current_user.id)
+
+
+@router.post("/{projeto_id}/indice", response_model=IndexacaoResponse, status_code=status.HTTP_202_ACCEPTED)
+async def indexar_projeto(
+    projeto_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """
+    Incrementally (re)index the project's repository in the background.
+    Only files added, changed or deleted since the last run are sent to the
+    Core. If a run is already in progress, it is returned instead.
+    """
+    projeto = await ProjetoService.get_by_id(db, projeto_id, current_user.id)
+    return IndiceService.start(projeto)
+
+
+@router.get("/{projeto_id}/indice", response_model=IndexacaoResponse)
+async def get_indexacao(
+    projeto_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)]
+):
+    """Progress of the project's current (or last) indexing run."""
+    await ProjetoService.get_by_id(db, projeto_id, current_user.id)
+    return IndiceService.get_job(projeto_id)
+
+
+@router.post("/{projeto_id}/diffs", response_model=DiffAplicacaoResponse)
+async def aplicar_diffs(
+    projeto_id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)],
+    dry_run: bool = False
+):
+    """
+    Apply a unified diff to the project's repository.
+
+    The body is the raw diff (one multi-file diff, or several concatenated),
+    streamed and parsed as it arrives. Every file is dry-run locally first:
+    conflicting files are reported and skipped, the others are applied by
+    the Core in parallel. With ``dry_run=true`` nothing is applied.
+    Returns per-file results.
+    """
+    projeto = await ProjetoService.get_by_id(db, projeto_id, current_user.id)
+    return await DiffService.apply(projeto, request.stream(), dry_run_only=dry_run)
@@ -0,0 +1,29 @@
+"""
+Sync Router - Sincronização incremental para os clientes web e mobile
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.usuario import Usuario
+from app.schemas.sync import SyncResponse
+from app.core.security import get_current_user
+from app.core.responses import json_response_class
+from app.services.sync_service import SyncService
+
+router = APIRouter(default_response_class=json_response_class())
+
+
+@router.get("/", response_model=SyncResponse)
+async def sync(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[Usuario, Depends(get_current_user)],
+    token: str | None = None
+):
+    """
+    Projects and executions changed since ``token``; without one, a full
+    snapshot. Store the returned token for the next call.
+    """
+    return await SyncService.changes(db, current_user.id, token)
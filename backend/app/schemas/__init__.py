@@ -16,7 +16,8 @@ from app.schemas.execucao import (
     ExecucaoBase,
     ExecucaoCreate,
     ExecucaoResponse,
-    ExecucaoLogsResponse
+    ExecucaoLogsResponse,
+    ExecucaoTemposAgregados
 )
 from app.schemas.auth import Token, TokenData
 
@@ -24,5 +25,6 @@ __all__ = [
     "UsuarioBase", "UsuarioCreate", "UsuarioUpdate", "UsuarioResponse", "UsuarioLogin",
     "ProjetoBase", "ProjetoCreate", "ProjetoUpdate", "ProjetoResponse",
     "ExecucaoBase", "ExecucaoCreate", "ExecucaoResponse", "ExecucaoLogsResponse",
+    "ExecucaoTemposAgregados",
     "Token", "TokenData"
 ]
@@ -0,0 +1,32 @@
+"""
+Dashboard Schemas - Resumo de projetos e execuções em uma única resposta
+"""
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ExecucaoResumo(BaseModel):
+    """Execution fields the dashboard shows (no parameters, logs or results)."""
+    id: int
+    projeto_id: int
+    status: str
+    prioridade: str
+    iniciado_em: datetime
+    finalizado_em: datetime | None = None
+
+
+class DashboardProjeto(BaseModel):
+    id: int
+    nome: str
+    estado_indice: str
+    executando: int = 0
+    na_fila: int = 0
+    ultimas_execucoes: list[ExecucaoResumo] = Field(default_factory=list)
+
+
+class DashboardResponse(BaseModel):
+    """Active projects with their latest executions, plus recent failures."""
+    projetos: list[DashboardProjeto]
+    executando: int
+    na_fila: int
+    falhas_recentes: list[ExecucaoResumo]
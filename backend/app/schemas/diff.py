@@ -0,0 +1,22 @@
+"""
+Diff Schemas - Resultado da aplicação de diffs em projetos
+"""
+from pydantic import BaseModel
+
+
+class ArquivoDiffResultado(BaseModel):
+    """Outcome for one file of an uploaded diff."""
+    arquivo: str
+    status: str  # valid (dry run), applied, conflict, failed
+    hunks: int = 0
+    detalhe: str | None = None
+
+
+class DiffAplicacaoResponse(BaseModel):
+    """Per-file results of a batched diff application."""
+    dry_run: bool
+    total_arquivos: int
+    aplicados: int
+    conflitos: int
+    falhas: int
+    arquivos: list[ArquivoDiffResultado]
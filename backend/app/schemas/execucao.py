@@ -2,7 +2,7 @@
 Execucao Schemas - Validação de dados de execução
 """
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 from pydantic import BaseModel, Field
 
 
@@ -13,7 +13,8 @@ class ExecucaoBase(BaseModel):
 
 class ExecucaoCreate(ExecucaoBase):
     """Schema for initiating an execution."""
-    pass
+    # "interactive" runs ahead of "batch" (weighted, batch is never starved)
+    prioridade: Literal["interactive", "batch"] = "interactive"
 
 
 class ExecucaoResponse(ExecucaoBase):
@@ -22,9 +23,27 @@ class ExecucaoResponse(ExecucaoBase):
     projeto_id: int
     usuario_id: int
     status: str
+    prioridade: str = "interactive"
+    posicao_fila: int | None = None
+    alvos: list[str] | None = None
+    # Set by ExecucaoService.to_response while pending/running
+    duracao_estimada_segundos: float | None = None
+    espera_estimada_segundos: float | None = None
+    conclusao_estimada_em: datetime | None = None
+    # Large results are not embedded: resultado is None and resultado_externo
+    # is set; fetch them from GET /execucoes/{id}/resultado
     resultado: dict[str, Any] | None
+    resultado_externo: bool = False
+    resultado_tamanho: int | None = None
+    arquivado_em: datetime | None = None
     iniciado_em: datetime
     finalizado_em: datetime | None
+    espera_fila_segundos: float | None = None
+    latencia_submissao_segundos: float | None = None
+    tempo_primeiro_log_segundos: float | None = None
+    tempo_core_segundos: float | None = None
+    tempo_persistencia_logs_segundos: float | None = None
+    tempo_finalizacao_segundos: float | None = None
     
     class Config:
         from_attributes = True
@@ -38,3 +57,31 @@ class ExecucaoLogsResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ExecucaoResultadoResponse(BaseModel):
+    """Schema for an execution result, or the part selected by a JSON pointer."""
+    id: int
+    pointer: str = ""
+    resultado: Any
+    # Set when the selected value is a list; proximo_cursor fetches the next page
+    total: int | None = None
+    proximo_cursor: str | None = None
+
+
+class EtapaTempoAgregado(BaseModel):
+    """Aggregate of one timing stage across executions."""
+    media: float | None
+    maximo: float | None
+
+
+class ExecucaoTemposAgregados(BaseModel):
+    """Per-project aggregate of execution timing breakdowns."""
+    projeto_id: int
+    total_execucoes: int
+    espera_fila: EtapaTempoAgregado
+    latencia_submissao: EtapaTempoAgregado
+    tempo_primeiro_log: EtapaTempoAgregado
+    tempo_core: EtapaTempoAgregado
+    tempo_persistencia_logs: EtapaTempoAgregado
+    tempo_finalizacao: EtapaTempoAgregado
@@ -0,0 +1,27 @@
+"""
+Indice Schemas - Estado da indexação incremental de projetos
+"""
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class IndexacaoResponse(BaseModel):
+    """Progress and outcome of a project's indexing job."""
+    projeto_id: int
+    status: str
+    fase: str
+    completa: bool
+    arquivos: int
+    a_verificar: int
+    verificados: int
+    adicionados: int
+    alterados: int
+    removidos: int
+    enviados: int
+    total_envio: int
+    iniciado_em: datetime
+    finalizado_em: datetime | None = None
+    erro: str | None = None
+    
+    class Config:
+        from_attributes = True
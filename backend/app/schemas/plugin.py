@@ -0,0 +1,32 @@
+"""
+Plugin Schemas - Geração de templates de plugins
+"""
+from datetime import datetime
+from typing import Any
+from pydantic import BaseModel, Field
+
+
+class PluginGenerateRequest(BaseModel):
+    """Plugin spec sent to the Core template generator."""
+    name: str = Field(..., min_length=1)
+    description: str
+    tools: list[dict[str, Any]] | None = None
+
+
+class PluginTemplateResponse(BaseModel):
+    """Generated plugin template."""
+    template: str
+
+
+class PluginJobResponse(BaseModel):
+    """Asynchronous template generation job."""
+    id: str
+    status: str
+    status_url: str
+    template: str | None = None
+    erro: str | None = None
+    criado_em: datetime
+    finalizado_em: datetime | None = None
+    
+    class Config:
+        from_attributes = True
@@ -10,6 +10,7 @@ class ProjetoBase(BaseModel):
     """Base schema with common project fields."""
     nome: str = Field(..., min_length=1, max_length=100)
     descricao: str | None = None
+    caminho_repositorio: str | None = Field(None, max_length=500)
     idioma: str = "en"
     temperatura: float = 0.7
 
@@ -23,6 +24,7 @@ class ProjetoUpdate(BaseModel):
     """Schema for project updates (all fields optional)."""
     nome: str | None = Field(None, min_length=1, max_length=100)
     descricao: str | None = None
+    caminho_repositorio: str | None = Field(None, max_length=500)
     idioma: str | None = None
     temperatura: float | None = None
     configuracao_pipeline: dict[str, Any] | None = None
@@ -36,6 +38,8 @@ class ProjetoResponse(ProjetoBase):
     temperatura: float
     configuracao_pipeline: dict[str, Any]
     ativo: bool
+    estado_indice: str
+    indice_atualizado_em: datetime | None = None
     criado_em: datetime
     atualizado_em: datetime
     
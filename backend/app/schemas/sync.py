@@ -0,0 +1,22 @@
+"""
+Sync Schemas - Sincronização incremental de projetos e execuções
+"""
+from pydantic import BaseModel, Field
+
+from app.schemas.execucao import ExecucaoResponse
+from app.schemas.projeto import ProjetoResponse
+
+
+class SyncResponse(BaseModel):
+    """
+    Projects and executions changed since the request's token (or all of them
+    when ``completo``). Pass ``token`` on the next call; when ``mais`` is set,
+    call again right away for the rest.
+    """
+    token: str
+    completo: bool = False
+    mais: bool = False
+    projetos: list[ProjetoResponse] = Field(default_factory=list)
+    execucoes: list[ExecucaoResponse] = Field(default_factory=list)
+    projetos_removidos: list[int] = Field(default_factory=list)
+    execucoes_removidas: list[int] = Field(default_factory=list)
@@ -0,0 +1,91 @@
+"""
+Dashboard Service - Everything the dashboard shows, in a fixed number of queries
+
+Four bounded queries regardless of how many executions a user has:
+
+1. the active projects
+2. the latest ``dashboard_latest_per_project`` executions of each, ranked
+   with ``row_number()`` over (projeto_id, iniciado_em) and served by the
+   ix_execucoes_projeto_iniciado index
+3. pending/running counts, grouped per project (ix_execucoes_status_lease)
+4. the failures (and partial failures) of the last ``dashboard_failure_window_hours``
+
+Only the columns the dashboard shows are selected: parameters, logs and
+results never leave the database.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.projeto import Projeto
+
+settings = get_settings()
+
+RESUMO_COLUMNS = (
+    Execucao.id, Execucao.projeto_id, Execucao.status, Execucao.prioridade,
+    Execucao.iniciado_em, Execucao.finalizado_em,
+)
+
+
+class DashboardService:
+    @staticmethod
+    async def summary(db: AsyncSession, user_id: int) -> dict:
+        result = await db.execute(
+            select(Projeto.id, Projeto.nome, Projeto.estado_indice)
+            .where(Projeto.usuario_id == user_id)
+            .where(Projeto.ativo == True)
+            .order_by(Projeto.atualizado_em.desc())
+        )
+        projetos = {row.id: {**row._mapping, "ultimas_execucoes": []} for row in result}
+
+        if projetos:
+            posicao = func.row_number().over(
+                partition_by=Execucao.projeto_id,
+                order_by=(Execucao.iniciado_em.desc(), Execucao.id.desc())
+            ).label("posicao")
+            ranked = (
+                select(*RESUMO_COLUMNS, posicao)
+                .where(Execucao.usuario_id == user_id)
+                .where(Execucao.projeto_id.in_(list(projetos)))
+                .subquery()
+            )
+            result = await db.execute(
+                select(*(ranked.c[column.key] for column in RESUMO_COLUMNS))
+                .where(ranked.c.posicao <= settings.dashboard_latest_per_project)
+                .order_by(ranked.c.projeto_id, ranked.c.posicao)
+            )
+            for row in result:
+                projetos[row.projeto_id]["ultimas_execucoes"].append(row._mapping)
+
+        result = await db.execute(
+            select(Execucao.projeto_id, Execucao.status, func.count())
+            .where(Execucao.usuario_id == user_id)
+            .where(Execucao.status.in_([StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value]))
+            .group_by(Execucao.projeto_id, Execucao.status)
+        )
+        totais = defaultdict(int)
+        for projeto_id, status_atual, count in result:
+            campo = "executando" if status_atual == StatusExecucao.RUNNING.value else "na_fila"
+            totais[campo] += count
+            if projeto_id in projetos:
+                projetos[projeto_id][campo] = count
+
+        desde = datetime.utcnow() - timedelta(hours=settings.dashboard_failure_window_hours)
+        result = await db.execute(
+            select(*RESUMO_COLUMNS)
+            .where(Execucao.usuario_id == user_id)
+            .where(Execucao.status.in_([StatusExecucao.FAILED.value, StatusExecucao.PARTIAL.value]))
+            .where(Execucao.finalizado_em >= desde)
+            .order_by(Execucao.finalizado_em.desc())
+            .limit(settings.dashboard_failures_limit)
+        )
+        return {
+            "projetos": list(projetos.values()),
+            "executando": totais["executando"],
+            "na_fila": totais["na_fila"],
+            "falhas_recentes": [row._mapping for row in result],
+        }
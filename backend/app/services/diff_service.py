@@ -0,0 +1,166 @@
+"""
+Diff Service - Batched diff application with local pre-validation
+
+An upload (one large multi-file diff, or many diffs concatenated) is parsed
+as it streams in (app.core.diffs) and grouped per file, in upload order.
+Each file's patches are then dry-run against the repository in a thread
+pool; files that do not apply cleanly, or that several file sections
+touch under different names (renames), are rejected locally and never
+reach the Core; so are sections with nothing to patch (pure renames, mode
+changes, binary files), reported as failed. The remaining files are independent of each other, so
+they are sent to ``/v1/diff/apply`` one file per call, several at a time.
+"""
+import asyncio
+import codecs
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.core.akita_wrapper import get_orchestrator
+from app.core.diffs import DiffParseError, DiffStreamParser, FilePatch, PatchConflict, dry_run
+from app.core.repositories import checkout_path
+from app.models.projeto import Projeto
+from app.schemas.diff import ArquivoDiffResultado, DiffAplicacaoResponse
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+VALID = "valid"
+APPLIED = "applied"
+CONFLICT = "conflict"
+FAILED = "failed"
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode an upload into lines (newline kept), enforcing ``diff_max_upload_bytes``."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+    received = 0
+    pending = ""
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > settings.diff_max_upload_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Diff excede o tamanho máximo permitido"
+            )
+        # Split on "\n" only: str.splitlines() also breaks on form feeds etc.
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def parse_upload(chunks: AsyncIterator[bytes]) -> dict[str, list[FilePatch]]:
+    """File patches of the upload grouped by path, in upload order."""
+    parser = DiffStreamParser()
+    groups: dict[str, list[FilePatch]] = {}
+    try:
+        async for line in _iter_lines(chunks):
+            for patch in parser.feed(line):
+                groups.setdefault(patch.path, []).append(patch)
+        for patch in parser.close():
+            groups.setdefault(patch.path, []).append(patch)
+    except DiffParseError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not groups:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nenhum diff enviado")
+    return groups
+
+
+def _overlapping(groups: dict[str, list[FilePatch]]) -> set[str]:
+    """Paths a rename moves away from while another section also patches them."""
+    overlapping = set()
+    for path, patches in groups.items():
+        for patch in patches:
+            source = patch.old_path
+            if not patch.creates and source != path and source in groups:
+                overlapping.update((path, source))
+    return overlapping
+
+
+class DiffService:
+    @staticmethod
+    async def apply(
+        projeto: Projeto, chunks: AsyncIterator[bytes], dry_run_only: bool = False
+    ) -> DiffAplicacaoResponse:
+        # Patches are confined to the checkout, and the checkout to the repository root
+        base_path = checkout_path(projeto.caminho_repositorio)
+
+        groups = await parse_upload(chunks)
+        results = {path: ArquivoDiffResultado(arquivo=path, status=VALID) for path in groups}
+        for path in _overlapping(groups):
+            results[path].status = CONFLICT
+            results[path].detalhe = "Arquivo alterado por patches sobrepostos"
+        for path, patches in groups.items():
+            if any(patch.unsupported for patch in patches):
+                results[path].status = FAILED
+                results[path].detalhe = "Seção sem patch aplicável (renomeação, modo ou binário) não suportada"
+
+        await DiffService._validate(base_path, groups, results)
+
+        if not dry_run_only:
+            await DiffService._apply(base_path, groups, results)
+
+        arquivos = list(results.values())
+        return DiffAplicacaoResponse(
+            dry_run=dry_run_only,
+            total_arquivos=len(arquivos),
+            aplicados=sum(1 for r in arquivos if r.status == APPLIED),
+            conflitos=sum(1 for r in arquivos if r.status == CONFLICT),
+            falhas=sum(1 for r in arquivos if r.status == FAILED),
+            arquivos=arquivos
+        )
+
+    @staticmethod
+    async def _validate(
+        base_path: str, groups: dict[str, list[FilePatch]], results: dict[str, ArquivoDiffResultado]
+    ) -> None:
+        """Dry-run every file's patches in the worker pool."""
+        paths = [path for path in groups if results[path].status == VALID]
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=max(settings.diff_workers, 1)) as executor:
+            outcomes = await asyncio.gather(
+                *(loop.run_in_executor(executor, dry_run, base_path, groups[path]) for path in paths),
+                return_exceptions=True
+            )
+        for path, outcome in zip(paths, outcomes):
+            result = results[path]
+            if isinstance(outcome, PatchConflict):
+                result.status = CONFLICT
+                result.detalhe = str(outcome)
+            elif isinstance(outcome, BaseException):
+                result.status = FAILED
+                result.detalhe = str(outcome) or outcome.__class__.__name__
+            else:
+                result.hunks = outcome
+
+    @staticmethod
+    async def _apply(
+        base_path: str, groups: dict[str, list[FilePatch]], results: dict[str, ArquivoDiffResultado]
+    ) -> None:
+        """Send each validated file to the Core, ``diff_apply_concurrency`` at a time."""
+        orchestrator = get_orchestrator()
+        semaphore = asyncio.Semaphore(max(settings.diff_apply_concurrency, 1))
+
+        async def apply_file(path: str) -> None:
+            result = results[path]
+            diff = "".join(patch.text for patch in groups[path])
+            async with semaphore:
+                try:
+                    applied = await orchestrator.apply_diff(diff, base_path)
+                except Exception as e:
+                    logger.warning("Core diff apply failed for %s: %s", path, e)
+                    applied = False
+                    result.detalhe = str(e) or e.__class__.__name__
+            if applied:
+                result.status = APPLIED
+            else:
+                result.status = FAILED
+                result.detalhe = result.detalhe or "O Core recusou o diff"
+
+        await asyncio.gather(*(apply_file(path) for path, r in results.items() if r.status == VALID))
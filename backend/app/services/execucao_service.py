@@ -1,15 +1,36 @@
 """
 Execucao Service - Business logic for pipeline executions
 """
-from datetime import datetime
-from sqlalchemy import select
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.models.arquivo_indexado import ArquivoIndexado
 from app.models.execucao import Execucao, StatusExecucao
 from app.models.projeto import Projeto
+from app.schemas.execucao import ExecucaoResponse, ExecucaoTemposAgregados, EtapaTempoAgregado
+from app.config import get_settings
 from app.core.akita_wrapper import get_orchestrator
+from app.core.duration_model import duration_model
+from app.core.fanout import TargetError, check_target_count, expand_targets, parse_targets
+from app.core.repositories import RepositoryPathError, resolve_repository
+from app.core.http_cache import response_cache, execucao_cache_key
+from app.core.log_sink import LOG, LogEvent, LogStream, active_streams
+from app.core.metrics import executions_running
+from app.core.profiling import track_pipeline_task
 from app.database import async_session
+from app.services.resultado_service import ResultadoService
+from app.tasks.scheduler import ScheduledJob, scheduler
+from app.tasks.worker import inline_leases
+
+settings = get_settings()
+
+CANCEL_LOG = "Execução cancelada pelo usuário"
 
 class ExecucaoService:
     @staticmethod
@@ -28,10 +49,62 @@ class ExecucaoService:
         return execucao
 
     @staticmethod
-    async def list_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> list[Execucao]:
+    def to_response(execucao: Execucao) -> ExecucaoResponse:
+        """
+        Response for an execution, with its queue position and estimates
+        while pending or running. A running job is given its median duration,
+        then its p90 once it overruns that; past both there is no completion
+        estimate.
+        """
+        resposta = ExecucaoResponse.model_validate(execucao)
+        if execucao.status not in (StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value):
+            return resposta
+        estimativa = duration_model.estimate_for(execucao)
+        resposta.duracao_estimada_segundos = estimativa.p50
+        now = datetime.utcnow()
+        if execucao.status == StatusExecucao.PENDING.value:
+            resposta.posicao_fila = scheduler.position(execucao.id)
+            resposta.espera_estimada_segundos = scheduler.estimate_wait(execucao.id)
+            if resposta.espera_estimada_segundos is not None:
+                resposta.conclusao_estimada_em = now + timedelta(
+                    seconds=resposta.espera_estimada_segundos + estimativa.p50
+                )
+            return resposta
+        inicio = execucao.iniciado_em + timedelta(seconds=execucao.espera_fila_segundos or 0.0)
+        for seconds in (estimativa.p50, estimativa.p90):
+            fim = inicio + timedelta(seconds=seconds)
+            if fim >= now:
+                resposta.conclusao_estimada_em = fim
+                break
+        return resposta
+
+    @staticmethod
+    def filter_query(
+        query,
+        user_id: int,
+        projeto_id: int | None = None,
+        status_execucao: str | None = None,
+        desde: datetime | None = None,
+        ate: datetime | None = None
+    ):
+        """The user's executions, optionally by project, status and start time range."""
+        query = query.where(Execucao.usuario_id == user_id)
+        if projeto_id is not None:
+            query = query.where(Execucao.projeto_id == projeto_id)
+        if status_execucao is not None:
+            query = query.where(Execucao.status == status_execucao)
+        if desde is not None:
+            query = query.where(Execucao.iniciado_em >= desde)
+        if ate is not None:
+            query = query.where(Execucao.iniciado_em < ate)
+        return query
+
+    @staticmethod
+    async def list_by_user(
+        db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, **filtros
+    ) -> list[Execucao]:
         result = await db.execute(
-            select(Execucao)
-            .where(Execucao.usuario_id == user_id)
+            ExecucaoService.filter_query(select(Execucao), user_id, **filtros)
             .order_by(Execucao.iniciado_em.desc())
             .offset(skip)
             .limit(limit)
@@ -39,7 +112,9 @@ class ExecucaoService:
         return result.scalars().all()
 
     @staticmethod
-    async def create(db: AsyncSession, projeto_id: int, user_id: int, params: dict) -> Execucao:
+    async def create(
+        db: AsyncSession, projeto_id: int, user_id: int, params: dict, prioridade: str = "interactive"
+    ) -> Execucao:
         # Verify project exists and belongs to user
         result = await db.execute(
             select(Projeto)
@@ -54,12 +129,27 @@ class ExecucaoService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Projeto não encontrado"
             )
+        try:
+            targets = parse_targets(params)
+            # Globbing a large checkout walks it: off the event loop, once
+            alvos = await asyncio.to_thread(expand_targets, targets, _glob_base(projeto))
+            check_target_count(alvos, settings.fanout_max_targets)
+        except TargetError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         execucao = Execucao(
             projeto_id=projeto_id,
             usuario_id=user_id,
-            parametros_entrada=params
+            prioridade=prioridade,
+            parametros_entrada=params,
+            alvos=alvos,
+            # A multi-target run is sized by the whole project
+            tamanho_alvo=await ExecucaoService.target_size(db, projeto_id, "." if len(alvos) > 1 else alvos[0])
         )
+        if settings.execution_mode != "worker":
+            # Queued in this process: other API processes must leave it alone
+            execucao.lease_owner = inline_leases.owner
+            execucao.lease_expira_em = inline_leases.deadline()
         
         db.add(execucao)
         await db.flush()
@@ -67,30 +157,365 @@ class ExecucaoService:
         
         return execucao
 
+    @staticmethod
+    async def target_size(db: AsyncSession, projeto_id: int, target: str | None) -> int | None:
+        """Indexed files under ``target`` (None when the project is not indexed)."""
+        query = select(func.count()).select_from(ArquivoIndexado).where(ArquivoIndexado.projeto_id == projeto_id)
+        target = (target or ".").strip().removeprefix("./").strip("/")
+        if target not in ("", "."):
+            query = query.where(
+                (ArquivoIndexado.caminho == target) | ArquivoIndexado.caminho.startswith(f"{target}/")
+            )
+        return await db.scalar(query) or None
+
+    @staticmethod
+    async def warm_duration_model(db: AsyncSession) -> int:
+        """Rebuild the duration model from the most recent finished runs. Returns how many."""
+        result = await db.execute(
+            select(
+                Execucao.projeto_id, Execucao.parametros_entrada, Execucao.tamanho_alvo,
+                Execucao.iniciado_em, Execucao.finalizado_em, Execucao.espera_fila_segundos
+            )
+            .where(Execucao.status.in_([
+                StatusExecucao.SUCCESS.value, StatusExecucao.FAILED.value, StatusExecucao.PARTIAL.value
+            ]))
+            .where(Execucao.finalizado_em.is_not(None))
+            .order_by(Execucao.finalizado_em.desc())
+            .limit(settings.eta_history_size)
+        )
+        rows = result.all()
+        duration_model.load(
+            (
+                projeto_id, (params or {}).get("mode", "review"), tamanho_alvo,
+                (finalizado_em - iniciado_em).total_seconds() - (espera or 0.0)
+            )
+            for projeto_id, params, tamanho_alvo, iniciado_em, finalizado_em, espera in reversed(rows)
+        )
+        return len(rows)
+
+    @staticmethod
+    def build_pipeline_config(projeto: Projeto, execucao: Execucao) -> dict:
+        """
+        Merge project settings with the execution parameters. Several targets
+        go to ``targets``, run as a fan-out (app.core.fanout): those expanded
+        at creation, or for older rows the requested ones, unexpanded.
+        """
+        params = execucao.parametros_entrada or {}
+        targets = execucao.alvos or parse_targets(params)
+        return {
+            "mode": params.get("mode", "review"),
+            "target": targets[0],
+            **({"targets": targets} if len(targets) > 1 else {}),
+            "options": {
+                "language": projeto.idioma,
+                "temperature": projeto.temperatura,
+                "project_config": projeto.configuracao_pipeline
+            }
+        }
+
+    @staticmethod
+    def schedule(execucao: Execucao, projeto: Projeto) -> None:
+        """
+        Hand a committed execution to the in-process scheduler. In worker mode
+        the pending row itself is the queue, so there is nothing to do.
+        """
+        if settings.execution_mode == "worker":
+            return
+        scheduler.submit(ScheduledJob(
+            execucao_id=execucao.id,
+            usuario_id=execucao.usuario_id,
+            projeto_id=execucao.projeto_id,
+            config=ExecucaoService.build_pipeline_config(projeto, execucao),
+            prioridade=execucao.prioridade,
+            duracao_estimada=duration_model.estimate_for(execucao).p50
+        ))
+
+    @staticmethod
+    async def recover(db: AsyncSession) -> tuple[int, int]:
+        """
+        Inline mode: take over executions whose owning process is gone (no
+        lease, or an expired one; see app.tasks.worker.InlineLeases).
+        Running rows with a Core checkpoint are reattached, the rest go back
+        to the queue. Rows of live API processes are left alone.
+        Returns how many were reattached and re-queued.
+        """
+        if settings.execution_mode == "worker":
+            return 0, 0
+        claimed = await inline_leases.claim(db)
+        if not claimed:
+            return 0, 0
+        result = await db.execute(
+            select(Execucao, Projeto)
+            .join(Projeto, Projeto.id == Execucao.projeto_id)
+            .where(Execucao.id.in_(claimed))
+            .order_by(Execucao.iniciado_em)
+        )
+        reattach, requeue = [], []
+        for execucao, projeto in result.all():
+            if scheduler.owns(execucao.id):
+                continue  # still ours (a late heartbeat let the lease lapse)
+            if execucao.status == StatusExecucao.RUNNING.value:
+                if execucao.core_execution_id:
+                    reattach.append((execucao, projeto))
+                    continue
+                execucao.status = StatusExecucao.PENDING.value
+                execucao.append_log("Execução interrompida antes de chegar ao Core; reenfileirada")
+            requeue.append((execucao, projeto))
+        await db.commit()
+
+        for execucao, projeto in reattach:
+            scheduler.submit(ScheduledJob(
+                execucao_id=execucao.id,
+                usuario_id=execucao.usuario_id,
+                projeto_id=execucao.projeto_id,
+                config=ExecucaoService.build_pipeline_config(projeto, execucao),
+                prioridade=execucao.prioridade,
+                reattach=True,
+                duracao_estimada=duration_model.estimate_for(execucao).p50
+            ))
+        for execucao, projeto in requeue:
+            ExecucaoService.schedule(execucao, projeto)
+        return len(reattach), len(requeue)
+
+    @staticmethod
+    async def stop_cancelled(db: AsyncSession) -> int:
+        """
+        Inline mode: stop this process's executions that were cancelled
+        through another API process (the cancel only reaches the scheduler of
+        the process that served it). Returns how many were stopped.
+        """
+        local = scheduler.owned()
+        if not local:
+            return 0
+        cancelled = (await db.execute(
+            select(Execucao.id)
+            .where(Execucao.id.in_(local))
+            .where(Execucao.status == StatusExecucao.CANCELLED.value)
+        )).scalars().all()
+        for execucao_id in cancelled:
+            if not scheduler.cancel(execucao_id):
+                scheduler.cancel_running(execucao_id)
+        return len(cancelled)
+
     @staticmethod
     async def cancel(db: AsyncSession, execucao_id: int, user_id: int) -> Execucao:
         execucao = await ExecucaoService.get_by_id(db, execucao_id, user_id)
         
-        if execucao.status not in [StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value]:
+        # Conditional, like the task's final write: of a cancel and a
+        # finishing run, whichever leaves pending/running first wins
+        cancelled = await db.execute(
+            update(Execucao)
+            .where(
+                Execucao.id == execucao.id,
+                Execucao.status.in_([StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value])
+            )
+            .values(status=StatusExecucao.CANCELLED.value)
+        )
+        if cancelled.rowcount == 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Esta execução não pode ser cancelada"
             )
         
-        execucao.status = StatusExecucao.CANCELLED.value
-        execucao.append_log("Execução cancelada pelo usuário")
+        execucao.append_log(CANCEL_LOG)
         execucao.finalizado_em = datetime.utcnow()
         
         await db.flush()
         await db.refresh(execucao)
+        # The running task checks the committed status when it is interrupted
+        await db.commit()
+        if not scheduler.cancel(execucao_id):
+            # In worker mode the owning worker notices on its next heartbeat
+            scheduler.cancel_running(execucao_id)
+        response_cache.invalidate(execucao_cache_key(user_id, execucao_id))
+        return execucao
+
+    @staticmethod
+    async def get_resultado(
+        db: AsyncSession,
+        execucao_id: int,
+        user_id: int,
+        pointer: str = "",
+        campos: list[str] | None = None,
+        limite: int | None = None,
+        cursor: str | None = None
+    ) -> dict:
+        execucao = await ExecucaoService.get_by_id(db, execucao_id, user_id)
+        if execucao.arquivado_em is not None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Resultado removido: execução arquivada"
+            )
+        return await ResultadoService.select(db, execucao, pointer, campos, limite, cursor)
+
+    @staticmethod
+    async def archive(db: AsyncSession, execucao_id: int, user_id: int) -> Execucao:
+        """Drop a finished execution's result (releasing its blob); logs and timings stay."""
+        execucao = await ExecucaoService.get_by_id(db, execucao_id, user_id)
+        if execucao.status in [StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Apenas execuções finalizadas podem ser arquivadas"
+            )
+        if execucao.arquivado_em is None:
+            await ResultadoService.release(db, execucao)
+            execucao.arquivado_em = datetime.utcnow()
+            await db.commit()
+            response_cache.invalidate(execucao_cache_key(user_id, execucao_id))
         return execucao
 
-async def run_pipeline_task(execucao_id: int, config: dict):
+    @staticmethod
+    async def stream_logs(execucao_id: int) -> AsyncIterator[str]:
+        """
+        Server-sent events for an execution's logs: a ``snapshot`` of what is
+        stored, then ``log`` chunks and Core ``status`` changes, then ``end``.
+
+        While the run is in this process the viewer subscribes to its
+        ``LogStream`` with a bounded, drop-oldest queue (a slow viewer never
+        holds up the pipeline; gaps are reported as ``dropped`` events).
+        Otherwise (queued, or running on a worker) the row is polled. Lines
+        committed while the viewer connects may be sent twice.
+        """
+        stream = active_streams.get(execucao_id)
+        subscription = None
+        if stream is not None:
+            subscription = stream.subscribe(
+                settings.log_viewer_queue_size, settings.log_viewer_overflow_policy, name="viewer"
+            )
+        try:
+            async with async_session() as db:
+                execucao = await db.get(Execucao, execucao_id)
+            if execucao is None:
+                return
+            yield _sse("snapshot", {"status": execucao.status, "logs": execucao.logs})
+
+            if subscription is not None:
+                dropped = 0
+                async for event in subscription:
+                    if subscription.dropped > dropped:
+                        yield _sse("dropped", {"count": subscription.dropped - dropped})
+                        dropped = subscription.dropped
+                    if event.kind == LOG:
+                        yield _sse("log", {"text": Execucao.format_logs(event.lines)})
+                    else:
+                        yield _sse("status", {"status": event.status})
+            else:
+                sent = len(execucao.logs or "")
+                while execucao.status in (StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value):
+                    await asyncio.sleep(settings.log_stream_poll_interval)
+                    async with async_session() as db:
+                        execucao = await db.get(Execucao, execucao_id)
+                    if execucao is None:
+                        return
+                    if len(execucao.logs or "") > sent:
+                        yield _sse("log", {"text": execucao.logs[sent:]})
+                        sent = len(execucao.logs)
+        finally:
+            if subscription is not None:
+                stream.unsubscribe(subscription)
+
+        async with async_session() as db:
+            status_final = await db.scalar(select(Execucao.status).where(Execucao.id == execucao_id))
+        yield _sse("end", {"status": status_final})
+
+    @staticmethod
+    async def timing_summary(db: AsyncSession, projeto_id: int, user_id: int) -> ExecucaoTemposAgregados:
+        """Average/max of each timing stage over a project's finished executions."""
+        result = await db.execute(
+            select(Projeto.id)
+            .where(Projeto.id == projeto_id)
+            .where(Projeto.usuario_id == user_id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Projeto não encontrado"
+            )
+
+        columns = [func.count(Execucao.id)]
+        for column in TIMING_STAGES.values():
+            columns.extend([func.avg(column), func.max(column)])
+        row = (await db.execute(
+            select(*columns)
+            .where(Execucao.projeto_id == projeto_id)
+            .where(Execucao.finalizado_em.is_not(None))
+        )).one()
+
+        stages = {
+            name: EtapaTempoAgregado(media=row[1 + 2 * i], maximo=row[2 + 2 * i])
+            for i, name in enumerate(TIMING_STAGES)
+        }
+        return ExecucaoTemposAgregados(projeto_id=projeto_id, total_execucoes=row[0], **stages)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+TIMING_STAGES = {
+    "espera_fila": Execucao.espera_fila_segundos,
+    "latencia_submissao": Execucao.latencia_submissao_segundos,
+    "tempo_primeiro_log": Execucao.tempo_primeiro_log_segundos,
+    "tempo_core": Execucao.tempo_core_segundos,
+    "tempo_persistencia_logs": Execucao.tempo_persistencia_logs_segundos,
+    "tempo_finalizacao": Execucao.tempo_finalizacao_segundos,
+}
+
+
+async def run_pipeline_task(execucao_id: int, config: dict, reattach: bool = False):
     """
     Background task that runs the pipeline execution.
-    Updates execution status, logs, and results in the database.
+    Updates execution status, logs, and results in the database,
+    and records the per-stage timing breakdown on the row.
+
+    Core logs flow through a ``LogStream`` (app.core.log_sink): a DB writer
+    subscribes with a bounded queue and commits one batch at a time, and live
+    viewers can subscribe through ``active_streams`` while the task runs.
+
+    The Core execution id and log cursor are checkpointed with the logs they
+    cover. With ``reattach=True`` a ``running`` row is resumed from that
+    checkpoint instead of starting a new Core job.
+
+    When the task is cancelled, the committed status tells why: ``cancelled``
+    means the user cancelled it (the Core job is aborted); otherwise it is a
+    shutdown and the row is left ``running`` with its checkpoint committed.
     """
+    executions_running.inc()
+    track_pipeline_task()
+    task_started_at = datetime.utcnow()
+    log_persist_seconds = 0.0
+    execucao: Execucao | None = None
+    stream = LogStream()
+    db_feed = stream.subscribe(settings.log_queue_size, settings.log_overflow_policy, name="db")
+    writer: asyncio.Task | None = None
+
     async with async_session() as db:
+        async def write_logs():
+            """DB subscriber: apply queued events to the row, one commit per batch."""
+            nonlocal log_persist_seconds
+            try:
+                while batch := await db_feed.get_batch():
+                    for event in batch:
+                        if event.kind != LOG:
+                            continue
+                        execucao.append_logs(event.lines)
+                        if event.log_cursor is not None:
+                            execucao.core_execution_id = event.execution_id
+                            execucao.core_log_cursor = event.log_cursor
+                            execucao.core_endpoint = event.endpoint
+                    start = time.perf_counter()
+                    await db.commit()
+                    log_persist_seconds += time.perf_counter() - start
+            finally:
+                # A dead writer must not leave the Core reader blocked on its queue
+                db_feed.close()
+
+        async def wait_flush(discard: bool = False):
+            """Stop the DB writer once it has committed (or dropped) what is queued."""
+            db_feed.close(discard=discard)
+            if writer is not None:
+                # Shielded so a cancellation never interrupts a commit halfway
+                await asyncio.shield(writer)
+
         try:
             # Fetch execution
             result = await db.execute(
@@ -101,69 +526,191 @@ async def run_pipeline_task(execucao_id: int, config: dict):
             if not execucao:
                 return
             
-            # Update status to running
-            execucao.status = StatusExecucao.RUNNING.value
-            execucao.append_log("Pipeline iniciado")
+            resume = None
+            if reattach:
+                if execucao.status != StatusExecucao.RUNNING.value or not execucao.core_execution_id:
+                    return
+                resume = {
+                    "execution_id": execucao.core_execution_id,
+                    "log_cursor": execucao.core_log_cursor or 0,
+                    "endpoint": execucao.core_endpoint
+                }
+                execucao.append_log("Retomando execução após reinício")
+            else:
+                if execucao.status != StatusExecucao.PENDING.value:
+                    return
+                # Update status to running
+                execucao.status = StatusExecucao.RUNNING.value
+                execucao.espera_fila_segundos = (task_started_at - execucao.iniciado_em).total_seconds()
+                execucao.append_log("Pipeline iniciado")
             await db.commit()
+            response_cache.invalidate(execucao_cache_key(execucao.usuario_id, execucao.id))
             
-            # Get orchestrator
-            orchestrator = get_orchestrator()
+            writer = asyncio.create_task(write_logs())
+            active_streams[execucao_id] = stream
             
-            # Helper to save logs (we can't await inside the sync callback)
-            # So we will collect them and saving is tricky in sync callback.
-            # However, since we re-wrote the wrapper, we can assume it runs in the same loop.
-            # But the wrapper calls on_log strictly as a sync function.
-            # We'll simple append to a list and commit periodically? 
-            # Or better: We pass a callback that just prints, and we rely on the final result?
-            # NO, we want realtime.
-            # Let's use a queue or just simple accumulating for now, 
-            # and maybe force a refresh if possible. 
-            # Currently, let's just append to object and commit only at the end to avoid DB lock issues,
-            # unless we really need realtime streaming in frontend.
-            # The User requested "Real-time logs". 
-            # So we should try to commit every invalidation.
-            
-            # Hack: We define a sync wrapper that uses the running loop to schedule a commit
-            # usage of asyncio.run_coroutine_threadsafe is for threads. We are in the same loop.
-            # We can just create a Task.
-            
-            def log_callback(message: str):
-                """Callback to append logs."""
-                # Append to the SQLAlchemy object
-                # Note: This might not persist immediately without commit
-                execucao.append_log(message)
-                
-                # We schedule a commit task on the loop
-                # This is risky if too frequent. Let's do it.
-                asyncio.create_task(db.commit())
-
             # Execute pipeline
-            pipeline_result = await orchestrator.execute(
-                config=config,
-                on_log=log_callback
-            )
+            if config.get("targets"):
+                # The cap is checked at creation; older rows or a lowered cap meet it here
+                check_target_count(config["targets"], settings.fanout_max_targets)
+                pipeline_result = await get_orchestrator().execute_many(
+                    config, config["targets"], sink=stream, max_concurrency=settings.fanout_max_concurrency
+                )
+            else:
+                pipeline_result = await get_orchestrator().execute(config=config, resume=resume, sink=stream)
+            finalize_start = time.perf_counter()
+            await wait_flush()
             
             # Update execution with results
             if pipeline_result.get("success"):
-                execucao.status = StatusExecucao.SUCCESS.value
-                execucao.resultado = pipeline_result.get("data", {})
-                execucao.append_log("Pipeline concluído com sucesso")
+                final_status = StatusExecucao.SUCCESS.value
+                data = pipeline_result.get("data", {})
+                message = "Pipeline concluído com sucesso"
+            elif pipeline_result.get("partial"):
+                final_status = StatusExecucao.PARTIAL.value
+                data = pipeline_result.get("data", {})
+                message = f"Pipeline concluído parcialmente: {pipeline_result.get('error')}"
             else:
-                execucao.status = StatusExecucao.FAILED.value
-                execucao.resultado = {"error": pipeline_result.get("error")}
-                execucao.append_log(f"Pipeline falhou: {pipeline_result.get('error')}")
+                final_status = StatusExecucao.FAILED.value
+                data = {"error": pipeline_result.get("error")}
+                message = f"Pipeline falhou: {pipeline_result.get('error')}"
+            # Only a row still running is finished: a cancel committed by any
+            # process wins, and once this write is in no cancel can land
+            # before the commit (the updated row stays locked until then)
+            finished = await db.execute(
+                update(Execucao)
+                .where(Execucao.id == execucao.id, Execucao.status == StatusExecucao.RUNNING.value)
+                .values(status=final_status)
+            )
+            if finished.rowcount == 0:
+                await db.rollback()
+                return  # cancelled while the result was on its way
+            await ResultadoService.store(db, execucao, data)
+            execucao.append_log(message)
             
+            timings = pipeline_result.get("timings", {})
+            execucao.latencia_submissao_segundos = timings.get("submit")
+            execucao.tempo_primeiro_log_segundos = timings.get("first_log")
+            execucao.tempo_core_segundos = timings.get("core_run")
+            execucao.tempo_persistencia_logs_segundos = log_persist_seconds
             execucao.finalizado_em = datetime.utcnow()
+            # Finalize = draining log commits + storing the result, written
+            # with the result in one commit
+            execucao.tempo_finalizacao_segundos = time.perf_counter() - finalize_start
             await db.commit()
+            if not reattach:
+                # Resumed runs include the downtime: keep them out of the model
+                duration_model.observe(
+                    execucao.projeto_id, config.get("mode", "review"), execucao.tamanho_alvo,
+                    (execucao.finalizado_em - task_started_at).total_seconds()
+                )
+            response_cache.invalidate(execucao_cache_key(execucao.usuario_id, execucao.id))
             
+        except asyncio.CancelledError:
+            if execucao is not None and await _cancelled_by_user(execucao_id):
+                await _abort_core_job(db, execucao, wait_flush, stream.checkpoint)
+                raise
+            # Shutdown: keep the row running with its checkpoint for reattach
+            if execucao is not None and execucao.status == StatusExecucao.RUNNING.value:
+                try:
+                    await wait_flush()
+                    execucao.append_log("Processo encerrado; a execução será retomada")
+                    await db.commit()
+                except Exception:
+                    # Interrupted mid-commit: the last committed checkpoint stands
+                    await db.rollback()
+            raise
         except Exception as e:
             # Re-fetch if needed (session might be expired if error happened)
             # but usually we are fine.
+            try:
+                await wait_flush()
+            except Exception:
+                await db.rollback()
             try:
                 execucao.status = StatusExecucao.FAILED.value
-                execucao.resultado = {"error": str(e)}
+                await ResultadoService.store(db, execucao, {"error": str(e)})
                 execucao.append_log(f"Erro inesperado: {str(e)}")
+                execucao.tempo_persistencia_logs_segundos = log_persist_seconds
                 execucao.finalizado_em = datetime.utcnow()
                 await db.commit()
+                response_cache.invalidate(execucao_cache_key(execucao.usuario_id, execucao.id))
             except:
                 pass
+        finally:
+            if active_streams.get(execucao_id) is stream:
+                del active_streams[execucao_id]
+            stream.close()
+            executions_running.dec()
+
+
+def _glob_base(projeto: Projeto) -> str | None:
+    """Checkout to expand target globs in (None: patterns go to the Core as is)."""
+    if not projeto.caminho_repositorio:
+        return None
+    try:
+        return resolve_repository(projeto.caminho_repositorio)
+    except RepositoryPathError:
+        return None
+
+
+async def recover_orphaned_executions() -> tuple[int, int]:
+    """``ExecucaoService.recover`` in its own session (startup and every lease heartbeat)."""
+    async with async_session() as db:
+        return await ExecucaoService.recover(db)
+
+
+async def stop_cancelled_executions() -> int:
+    """``ExecucaoService.stop_cancelled`` in its own session (every lease heartbeat)."""
+    async with async_session() as db:
+        return await ExecucaoService.stop_cancelled(db)
+
+
+async def refresh_duration_model() -> int:
+    """``ExecucaoService.warm_duration_model`` in its own session (every ``eta_refresh_seconds``)."""
+    async with async_session() as db:
+        return await ExecucaoService.warm_duration_model(db)
+
+
+async def _cancelled_by_user(execucao_id: int) -> bool:
+    async with async_session() as db:
+        status_atual = await db.scalar(select(Execucao.status).where(Execucao.id == execucao_id))
+    return status_atual == StatusExecucao.CANCELLED.value
+
+
+async def _abort_core_job(
+    db: AsyncSession,
+    execucao: Execucao,
+    wait_flush: Callable[..., Awaitable[None]],
+    checkpoint: LogEvent | None = None
+) -> None:
+    """
+    After a user cancel: drop pending writes, abort the Core job, log it.
+    The job is the one of ``checkpoint``, the last one the stream saw (the
+    dropped writes may be the only record of it), or else the row's.
+    """
+    try:
+        await wait_flush(discard=True)
+    except Exception:
+        pass
+    await db.rollback()
+    await db.refresh(execucao)
+    if CANCEL_LOG not in (execucao.logs or ""):
+        # The log writer committed its in-memory logs over the cancel line
+        # (until the task is stopped: at once inline, up to a heartbeat on a worker)
+        execucao.append_log(CANCEL_LOG)
+    if checkpoint is not None:
+        execucao.core_execution_id = checkpoint.execution_id
+        execucao.core_endpoint = checkpoint.endpoint
+    if not execucao.core_execution_id:
+        await db.commit()
+        return
+    try:
+        aborted = await get_orchestrator().cancel(execucao.core_execution_id, execucao.core_endpoint)
+    except Exception as e:
+        aborted = False
+        execucao.append_log(f"Falha ao cancelar no Core: {e}")
+    if aborted:
+        execucao.append_log(f"Execução {execucao.core_execution_id} abortada no Core")
+    await db.commit()
+    response_cache.invalidate(execucao_cache_key(execucao.usuario_id, execucao.id))
@@ -0,0 +1,134 @@
+"""
+Export Service - Streaming NDJSON/CSV export of execution history
+
+Rows come from a server-side cursor (``yield_per``) ``export_batch_size`` at
+a time and are written out batch by batch, optionally through an incremental
+gzip compressor, so memory stays constant however many executions match.
+Plain columns are selected rather than ORM objects, so nothing accumulates in
+the session's identity map. Results are not exported (only their size and
+whether they are stored out of line); logs are included on request.
+
+The export opens its own session: it outlives the request's dependencies.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import async_session
+from app.models.execucao import Execucao
+from app.services.execucao_service import ExecucaoService
+
+settings = get_settings()
+
+EXPORT_COLUMNS = (
+    Execucao.id,
+    Execucao.projeto_id,
+    Execucao.status,
+    Execucao.prioridade,
+    Execucao.parametros_entrada,
+    Execucao.iniciado_em,
+    Execucao.finalizado_em,
+    Execucao.arquivado_em,
+    Execucao.resultado_hash,
+    Execucao.resultado_tamanho,
+    Execucao.espera_fila_segundos,
+    Execucao.latencia_submissao_segundos,
+    Execucao.tempo_primeiro_log_segundos,
+    Execucao.tempo_core_segundos,
+    Execucao.tempo_persistencia_logs_segundos,
+    Execucao.tempo_finalizacao_segundos,
+)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _record(row) -> dict:
+    record = dict(row._mapping)
+    record["resultado_externo"] = record.pop("resultado_hash") is not None
+    return record
+
+
+def _field_names(incluir_logs: bool) -> list[str]:
+    names = [column.key for column in EXPORT_COLUMNS if column.key != "resultado_hash"]
+    names.append("resultado_externo")
+    if incluir_logs:
+        names.append("logs")
+    return names
+
+
+def _ndjson(records: list[dict]) -> str:
+    return "".join(
+        json.dumps(record, default=_json_default, ensure_ascii=False) + "\n" for record in records
+    )
+
+
+def _csv(records: list[dict], fields: list[str], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    for record in records:
+        writer.writerow([
+            json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list))
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in (record[field] for field in fields)
+        ])
+    return buffer.getvalue()
+
+
+class ExportService:
+    @staticmethod
+    def filename(formato: str, compactar: bool) -> str:
+        return f"execucoes.{formato}" + (".gz" if compactar else "")
+
+    @staticmethod
+    async def export(
+        user_id: int,
+        formato: str = "ndjson",
+        incluir_logs: bool = False,
+        compactar: bool = False,
+        **filtros
+    ) -> AsyncIterator[bytes]:
+        """Matching executions (the listing filters), oldest first, as encoded chunks."""
+        columns = EXPORT_COLUMNS + ((Execucao.logs,) if incluir_logs else ())
+        query = (
+            ExecucaoService.filter_query(select(*columns), user_id, **filtros)
+            .order_by(Execucao.id)
+            .execution_options(yield_per=settings.export_batch_size)
+        )
+        fields = _field_names(incluir_logs)
+        compressor = zlib.compressobj(settings.export_gzip_level, zlib.DEFLATED, 31) if compactar else None
+
+        def encode(text: str) -> bytes:
+            data = text.encode("utf-8")
+            return compressor.compress(data) if compressor is not None else data
+
+        header = formato == "csv"
+        async with async_session() as db:
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                records = [_record(row) for row in rows]
+                if formato == "csv":
+                    chunk = encode(_csv(records, fields, header))
+                    header = False
+                else:
+                    chunk = encode(_ndjson(records))
+                if chunk:
+                    yield chunk
+        if header:
+            yield encode(_csv([], fields, header=True))
+        if compressor is not None:
+            yield compressor.flush()
@@ -0,0 +1,342 @@
+"""
+Indice Service - Incremental project indexing
+
+Each project keeps a manifest (``arquivos_indexados``) of the files last sent
+to the Core. An indexing job scans the repository, diffs it against the
+manifest (app.core.manifest) and sends only the delta to the Core in
+batches, committing the manifest after each accepted batch so an interrupted
+job resumes where it stopped. The first run, with an empty manifest, asks
+the Core for a full index instead, and so does any run against a Core
+without the delta endpoint (the manifest is then rebuilt from scratch).
+
+Jobs run in the background, one per project; progress is kept in memory
+and the resulting warm/cold state is stored on the project.
+
+Creating a project or changing its pipeline configuration queues a
+low-priority warm-up so the first execution does not pay for indexing.
+Warm-ups are deduplicated per project (one queued at most, merged) and
+rate-limited globally: at most ``index_warmup_max_concurrent`` indexing jobs
+at a time, started at least ``index_warmup_interval_seconds`` apart.
+Explicit ``POST /projetos/{id}/indice`` requests skip that queue.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.core.akita_wrapper import get_orchestrator
+from app.core.http_cache import response_cache, projeto_cache_prefix
+from app.core.manifest import FileState, diff_manifest, scan_tree
+from app.core.repositories import RepositoryPathError, checkout_path, resolve_repository
+from app.database import async_session
+from app.models.alteracao import record_projeto_change
+from app.models.arquivo_indexado import ArquivoIndexado
+from app.models.projeto import EstadoIndice, Projeto
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class IndexacaoJob:
+    """Progress of one indexing run (see ``IndexacaoResponse``)."""
+    projeto_id: int
+    caminho: str
+    usuario_id: int | None = None
+    status: str = RUNNING
+    fase: str = "scanning"  # scanning -> hashing -> sending -> done
+    completa: bool = False
+    arquivos: int = 0
+    a_verificar: int = 0
+    verificados: int = 0
+    adicionados: int = 0
+    alterados: int = 0
+    removidos: int = 0
+    enviados: int = 0
+    total_envio: int = 0
+    iniciado_em: datetime = field(default_factory=datetime.utcnow)
+    finalizado_em: datetime | None = None
+    erro: str | None = None
+
+
+class IndexacaoError(Exception):
+    pass
+
+
+# Latest job per project and the tasks still running
+_jobs: dict[int, IndexacaoJob] = {}
+_tasks: dict[int, asyncio.Task] = {}
+# Queued warm-ups: projeto_id -> (usuario_id, caminho, full), in arrival order
+_warmups: dict[int, tuple[int, str, bool]] = {}
+_warmup_task: asyncio.Task | None = None
+
+
+class IndiceService:
+    @staticmethod
+    def start(projeto: Projeto) -> IndexacaoJob:
+        """Start indexing the project, or return the job already running for it."""
+        running = _jobs.get(projeto.id)
+        if running is not None and running.status == RUNNING:
+            return running
+        caminho = checkout_path(projeto.caminho_repositorio)
+        _warmups.pop(projeto.id, None)
+        return _start_job(projeto.id, projeto.usuario_id, caminho, full=False)
+
+    @staticmethod
+    def schedule_warmup(projeto: Projeto, full: bool = False) -> bool:
+        """
+        Queue a low-priority warm-up (see module docs). ``full`` drops the
+        manifest first, for changes the delta cannot see (pipeline config).
+        Returns False when the project has no repository to index.
+        """
+        global _warmup_task
+        if not projeto.caminho_repositorio:
+            return False
+        queued = _warmups.get(projeto.id)
+        full = full or (queued is not None and queued[2])
+        _warmups[projeto.id] = (projeto.usuario_id, projeto.caminho_repositorio, full)
+        if _warmup_task is None or _warmup_task.done():
+            _warmup_task = asyncio.create_task(_run_warmups(), name="indice-warmups")
+        return True
+
+    @staticmethod
+    def get_job(projeto_id: int) -> IndexacaoJob:
+        job = _jobs.get(projeto_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Nenhuma indexação para este projeto"
+            )
+        return job
+
+    @staticmethod
+    async def wait(projeto_id: int) -> None:
+        task = _tasks.get(projeto_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    @staticmethod
+    async def shutdown() -> None:
+        """Cancel running jobs; the manifest only holds batches the Core accepted."""
+        _warmups.clear()
+        tasks = list(_tasks.values())
+        if _warmup_task is not None:
+            tasks.append(_warmup_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def reset_stale(db: AsyncSession) -> int:
+        """
+        Startup: projects left ``warming`` by a process that died mid-run go
+        back to ``cold`` (an interrupted run resets its own project). A run in
+        another live API process is shown cold until it finishes. Returns how
+        many were reset.
+        """
+        stale = (await db.execute(
+            select(Projeto.id, Projeto.usuario_id).where(Projeto.estado_indice == EstadoIndice.WARMING.value)
+        )).all()
+        for projeto_id, usuario_id in stale:
+            await _set_estado(db, projeto_id, usuario_id, EstadoIndice.COLD)
+        return len(stale)
+
+    @staticmethod
+    async def run(job: IndexacaoJob, session_factory: async_sessionmaker[AsyncSession] | None = None) -> None:
+        session_factory = session_factory or async_session
+        root = job.caminho
+        try:
+            async with session_factory() as db:
+                await _set_estado(db, job.projeto_id, job.usuario_id, EstadoIndice.WARMING)
+                if job.completa:
+                    await _save_manifest(db, job.projeto_id, {}, None)
+                    manifest = {}
+                else:
+                    manifest = await _load_manifest(db, job.projeto_id)
+
+                scanned = await asyncio.to_thread(
+                    scan_tree, root, frozenset(settings.index_ignore_dirs), settings.index_workers
+                )
+                job.arquivos = len(scanned)
+
+                job.fase = "hashing"
+
+                def on_hashed(done: int, total: int):
+                    job.a_verificar = total
+                    job.verificados = done
+
+                diff = await diff_manifest(root, scanned, manifest, settings.index_workers, on_hashed)
+                job.adicionados = len(diff.added)
+                job.alterados = len(diff.changed)
+                job.removidos = len(diff.deleted)
+
+                job.fase = "sending"
+                orchestrator = get_orchestrator()
+                full = not manifest
+                if not full and not await _send_delta(db, job, orchestrator, diff):
+                    logger.warning("Core has no index delta endpoint; fully re-indexing project %s", job.projeto_id)
+                    full = True
+                if full:
+                    deleted = set(diff.deleted)
+                    files = {path: state for path, state in manifest.items() if path not in deleted}
+                    files.update(diff.added)
+                    files.update(diff.changed)
+                    job.completa = True
+                    job.total_envio = len(files)
+                    if not await orchestrator.index_project(root):
+                        raise IndexacaoError("O Core recusou a indexação completa")
+                    await _save_manifest(db, job.projeto_id, files, None)
+                    job.enviados = job.total_envio
+                # Touched but identical files: only the manifest needs the new mtime
+                await _save_manifest(db, job.projeto_id, diff.touched, [])
+                job.status = SUCCEEDED
+                await _set_estado(db, job.projeto_id, job.usuario_id, EstadoIndice.WARM)
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.erro = "Indexação interrompida"
+            try:
+                async with session_factory() as db:
+                    await _set_estado(db, job.projeto_id, job.usuario_id, EstadoIndice.COLD)
+            except Exception:
+                logger.exception("Could not record index state for project %s", job.projeto_id)
+            raise
+        except Exception as e:
+            logger.exception("Indexing failed for project %s", job.projeto_id)
+            job.status = FAILED
+            job.erro = str(e)
+            try:
+                async with session_factory() as db:
+                    await _set_estado(db, job.projeto_id, job.usuario_id, EstadoIndice.COLD)
+            except Exception:
+                logger.exception("Could not record index state for project %s", job.projeto_id)
+        finally:
+            job.fase = "done"
+            job.finalizado_em = datetime.utcnow()
+
+
+async def _send_delta(db: AsyncSession, job: IndexacaoJob, orchestrator, diff) -> bool:
+    """
+    Send the diff to the Core in batches, saving the manifest after each.
+    False when the Core has no delta endpoint.
+    """
+    updates = list({**diff.added, **diff.changed}.items())
+    job.total_envio = len(updates) + len(diff.deleted)
+    size = max(settings.index_batch_size, 1)
+    batches = [(dict(updates[start:start + size]), []) for start in range(0, len(updates), size)]
+    batches += [({}, diff.deleted[start:start + size]) for start in range(0, len(diff.deleted), size)]
+    for batch, batch_deleted in batches:
+        changed = [{"path": path, "hash": state.hash, "size": state.tamanho} for path, state in batch.items()]
+        accepted = await orchestrator.index_delta(job.caminho, changed, batch_deleted)
+        if accepted is None:
+            return False
+        if not accepted:
+            raise IndexacaoError("O Core recusou a atualização do índice")
+        await _save_manifest(db, job.projeto_id, batch, batch_deleted)
+        job.enviados += len(batch) + len(batch_deleted)
+    return True
+
+
+def _start_job(projeto_id: int, usuario_id: int, caminho: str, full: bool) -> IndexacaoJob:
+    job = IndexacaoJob(projeto_id=projeto_id, caminho=caminho, usuario_id=usuario_id, completa=full)
+    _jobs[projeto_id] = job
+    task = asyncio.create_task(IndiceService.run(job), name=f"indice-{projeto_id}")
+    _tasks[projeto_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(projeto_id, None))
+    return job
+
+
+async def _run_warmups() -> None:
+    """Start queued warm-ups within the global concurrency and spacing limits."""
+    last_start = float("-inf")
+    while _warmups:
+        ready = next((projeto_id for projeto_id in _warmups if projeto_id not in _tasks), None)
+        if ready is None or len(_tasks) >= max(settings.index_warmup_max_concurrent, 1):
+            # Queued projects are all indexing already, or no slot is free
+            await asyncio.wait(list(_tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+            continue
+        delay = last_start + settings.index_warmup_interval_seconds - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            continue
+        usuario_id, caminho, full = _warmups.pop(ready)
+        try:
+            caminho = resolve_repository(caminho)
+        except RepositoryPathError:
+            logger.warning("Skipping index warm-up for project %s: %s is outside the repository root", ready, caminho)
+            continue
+        if not os.path.isdir(caminho):
+            logger.warning("Skipping index warm-up for project %s: %s not found", ready, caminho)
+            continue
+        _start_job(ready, usuario_id, caminho, full)
+        last_start = time.monotonic()
+
+
+async def _set_estado(db: AsyncSession, projeto_id: int, usuario_id: int | None, estado: EstadoIndice) -> None:
+    await db.execute(
+        update(Projeto)
+        .where(Projeto.id == projeto_id)
+        .values(
+            estado_indice=estado.value,
+            indice_atualizado_em=datetime.utcnow(),
+            atualizado_em=Projeto.atualizado_em  # not a user edit
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(record_projeto_change(projeto_id))
+    await db.commit()
+    if usuario_id is not None:
+        response_cache.invalidate(projeto_cache_prefix(usuario_id))
+
+
+async def _load_manifest(db: AsyncSession, projeto_id: int) -> dict[str, FileState]:
+    result = await db.execute(
+        select(
+            ArquivoIndexado.caminho, ArquivoIndexado.tamanho,
+            ArquivoIndexado.modificado_ns, ArquivoIndexado.hash
+        ).where(ArquivoIndexado.projeto_id == projeto_id)
+    )
+    return {caminho: FileState(tamanho, modificado_ns, hash_) for caminho, tamanho, modificado_ns, hash_ in result}
+
+
+async def _save_manifest(
+    db: AsyncSession, projeto_id: int, entries: dict[str, FileState], deleted: list[str] | None
+) -> None:
+    """
+    Replace the manifest rows of ``entries`` and drop ``deleted``, in bounded
+    chunks. ``deleted=None`` drops the whole manifest.
+    """
+    if deleted is None:
+        await db.execute(delete(ArquivoIndexado).where(ArquivoIndexado.projeto_id == projeto_id))
+        deleted = []
+    paths = list(entries) + deleted
+    size = max(settings.index_batch_size, 1)
+    for start in range(0, len(paths), size):
+        await db.execute(
+            delete(ArquivoIndexado)
+            .where(ArquivoIndexado.projeto_id == projeto_id)
+            .where(ArquivoIndexado.caminho.in_(paths[start:start + size]))
+        )
+    rows = [
+        {
+            "projeto_id": projeto_id,
+            "caminho": path,
+            "tamanho": state.tamanho,
+            "modificado_ns": state.modificado_ns,
+            "hash": state.hash,
+        }
+        for path, state in entries.items()
+    ]
+    for start in range(0, len(rows), size):
+        await db.execute(insert(ArquivoIndexado), rows[start:start + size])
+    await db.commit()
@@ -0,0 +1,222 @@
+"""
+Plugin Service - Cached, deduplicated plugin template generation
+
+Templates are cached by a hash of the normalized spec (whitespace in name and
+description collapsed, tools serialized with sorted keys, no tools == []), so
+resubmitting an unchanged or trivially edited spec never reaches the Core.
+The cache is LRU with a TTL. Concurrent requests for the same spec share one
+Core call (single-flight), and a client disconnecting does not cancel it for
+the others.
+
+Slow generations can run as jobs: the request returns at once with a status
+URL to poll. Finished jobs are kept for ``plugin_job_ttl_seconds``, and a
+user holds at most ``plugin_max_jobs_per_user`` (a new job evicts their
+oldest finished one; with all of them still running it gets 429).
+
+Jobs are kept in memory, in the process that started them: behind several
+API processes the status URL only resolves with sticky routing.
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException, status
+
+from app.config import get_settings
+from app.core.akita_wrapper import get_orchestrator
+from app.core.metrics import plugin_template_cache
+from app.schemas.plugin import PluginGenerateRequest
+
+settings = get_settings()
+
+
+def _normalize_text(value: str) -> str:
+    return " ".join(value.split())
+
+
+def plugin_cache_key(spec: PluginGenerateRequest) -> str:
+    canonical = json.dumps(
+        {
+            "name": _normalize_text(spec.name),
+            "description": _normalize_text(spec.description),
+            "tools": spec.tools or [],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class TemplateCache:
+    """LRU + TTL cache of generated templates with single-flight misses."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        template, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return template
+
+    def set(self, key: str, template: str) -> None:
+        self._entries[key] = (template, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[str | None]]) -> str | None:
+        """Cached template, or the result of one shared ``generate()`` call. Failures are not cached."""
+        template = self.get(key)
+        if template is not None:
+            plugin_template_cache.labels("hit").inc()
+            return template
+
+        task = self._inflight.get(key)
+        if task is not None:
+            plugin_template_cache.labels("shared").inc()
+        else:
+            plugin_template_cache.labels("miss").inc()
+            task = asyncio.create_task(generate())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Shielded: one caller going away must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None and task.result():
+            self.set(key, task.result())
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+template_cache = TemplateCache(
+    max_entries=settings.plugin_cache_max_entries,
+    ttl_seconds=settings.plugin_cache_ttl_seconds
+)
+
+
+@dataclass
+class PluginJob:
+    """An asynchronous template generation (see ``PluginJobResponse``)."""
+    id: str
+    usuario_id: int
+    status: str = "pending"
+    template: str | None = None
+    erro: str | None = None
+    criado_em: datetime = field(default_factory=datetime.utcnow)
+    finalizado_em: datetime | None = None
+    expires_at: float | None = None
+
+    @property
+    def status_url(self) -> str:
+        return f"/plugins/jobs/{self.id}"
+
+
+_jobs: dict[str, PluginJob] = {}
+_job_tasks: set[asyncio.Task] = set()
+
+
+class PluginService:
+    @staticmethod
+    async def generate(spec: PluginGenerateRequest) -> str:
+        async def call_core() -> str | None:
+            return await get_orchestrator().generate_plugin_template(spec.name, spec.description, spec.tools)
+
+        template = await template_cache.get_or_generate(plugin_cache_key(spec), call_core)
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate plugin template from Core"
+            )
+        return template
+
+    @staticmethod
+    def start_job(spec: PluginGenerateRequest, user_id: int) -> PluginJob:
+        _prune_jobs()
+        _make_room(user_id)
+        job = PluginJob(id=uuid.uuid4().hex, usuario_id=user_id)
+        template = template_cache.get(plugin_cache_key(spec))
+        if template is not None:
+            # Nothing to wait for
+            plugin_template_cache.labels("hit").inc()
+            _finish(job, template=template)
+        else:
+            task = asyncio.create_task(_run_job(job, spec))
+            _job_tasks.add(task)
+            task.add_done_callback(_job_tasks.discard)
+        _jobs[job.id] = job
+        return job
+
+    @staticmethod
+    def get_job(job_id: str, user_id: int) -> PluginJob:
+        _prune_jobs()
+        job = _jobs.get(job_id)
+        if job is None or job.usuario_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job não encontrado"
+            )
+        return job
+
+
+async def _run_job(job: PluginJob, spec: PluginGenerateRequest) -> None:
+    job.status = "running"
+    try:
+        template = await PluginService.generate(spec)
+    except HTTPException as e:
+        _finish(job, erro=e.detail)
+    except Exception as e:
+        _finish(job, erro=str(e))
+    else:
+        _finish(job, template=template)
+
+
+def _finish(job: PluginJob, template: str | None = None, erro: str | None = None) -> None:
+    job.status = "succeeded" if template else "failed"
+    job.template = template
+    job.erro = erro
+    job.finalizado_em = datetime.utcnow()
+    job.expires_at = time.monotonic() + settings.plugin_job_ttl_seconds
+
+
+def _make_room(user_id: int) -> None:
+    """Keep the user under ``plugin_max_jobs_per_user`` before adding a job."""
+    owned = [job for job in _jobs.values() if job.usuario_id == user_id]
+    excess = len(owned) - max(settings.plugin_max_jobs_per_user, 1) + 1
+    if excess <= 0:
+        return
+    finished = sorted((job for job in owned if job.finalizado_em is not None), key=lambda job: job.finalizado_em)
+    if len(finished) < excess:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitos jobs de plugin em andamento"
+        )
+    for job in finished[:excess]:
+        del _jobs[job.id]
+
+
+def _prune_jobs() -> None:
+    now = time.monotonic()
+    for job_id in [i for i, job in _jobs.items() if job.expires_at is not None and job.expires_at < now]:
+        del _jobs[job_id]
@@ -7,6 +7,10 @@ from fastapi import HTTPException, status
 
 from app.models.projeto import Projeto
 from app.schemas.projeto import ProjetoCreate, ProjetoUpdate
+from app.core.http_cache import response_cache, projeto_cache_prefix
+from app.core.repositories import RepositoryPathError, resolve_repository
+from app.database import after_commit
+from app.services.indice_service import IndiceService
 
 class ProjetoService:
     @staticmethod
@@ -26,6 +30,7 @@ class ProjetoService:
             usuario_id=user_id,
             nome=projeto_data.nome,
             descricao=projeto_data.descricao,
+            caminho_repositorio=_repository_path(projeto_data.caminho_repositorio),
             idioma=projeto_data.idioma,
             temperatura=projeto_data.temperatura,
             configuracao_pipeline=projeto_data.configuracao_pipeline
@@ -34,6 +39,8 @@ class ProjetoService:
         db.add(projeto)
         await db.flush()
         await db.refresh(projeto)
+        ProjetoService._invalidate_on_commit(db, user_id)
+        await ProjetoService._warm_up_index(db, projeto, full=False)
         return projeto
 
     @staticmethod
@@ -55,6 +62,14 @@ class ProjetoService:
     @staticmethod
     async def update(db: AsyncSession, projeto_id: int, projeto_data: ProjetoUpdate, user_id: int) -> Projeto:
         projeto = await ProjetoService.get_by_id(db, projeto_id, user_id)
+        caminho = _repository_path(projeto_data.caminho_repositorio)
+        # Config changes can alter what the Core indexes, so those rebuild it
+        reindex = (
+            projeto_data.configuracao_pipeline is not None
+            and projeto_data.configuracao_pipeline != projeto.configuracao_pipeline
+        ) or (
+            caminho is not None and caminho != projeto.caminho_repositorio
+        )
         
         if projeto_data.nome is not None:
             projeto.nome = projeto_data.nome
@@ -62,6 +77,9 @@ class ProjetoService:
         if projeto_data.descricao is not None:
             projeto.descricao = projeto_data.descricao
         
+        if caminho is not None:
+            projeto.caminho_repositorio = caminho
+        
         if projeto_data.idioma is not None:
             projeto.idioma = projeto_data.idioma
         
@@ -73,6 +91,9 @@ class ProjetoService:
         
         await db.flush()
         await db.refresh(projeto)
+        ProjetoService._invalidate_on_commit(db, user_id)
+        if reindex:
+            await ProjetoService._warm_up_index(db, projeto, full=True)
         return projeto
 
     @staticmethod
@@ -80,3 +101,34 @@ class ProjetoService:
         projeto = await ProjetoService.get_by_id(db, projeto_id, user_id)
         projeto.ativo = False
         await db.flush()
+        ProjetoService._invalidate_on_commit(db, user_id)
+
+    @staticmethod
+    def _invalidate_on_commit(db: AsyncSession, user_id: int) -> None:
+        """
+        Drop cached project responses once the change commits; before that a
+        concurrent GET would only re-cache the old row.
+        """
+        after_commit(db, lambda: response_cache.invalidate(projeto_cache_prefix(user_id)))
+
+    @staticmethod
+    async def _warm_up_index(db: AsyncSession, projeto: Projeto, full: bool) -> None:
+        """
+        Queue a background index warm-up; the row is committed first so the job
+        sees it. The job itself marks the project ``warming`` once it starts:
+        a warm-up that is skipped or never runs leaves the state as it was.
+        """
+        if not projeto.caminho_repositorio:
+            return
+        await db.commit()
+        IndiceService.schedule_warmup(projeto, full=full)
+
+
+def _repository_path(caminho: str | None) -> str | None:
+    """The checkout path to store: resolved and confined to the repository root."""
+    if not caminho:
+        return caminho
+    try:
+        return resolve_repository(caminho)
+    except RepositoryPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
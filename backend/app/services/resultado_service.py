@@ -0,0 +1,217 @@
+"""
+Resultado Service - Out-of-line, content-addressed execution results
+
+Small results stay inline in ``execucoes.resultado``. Results whose
+canonical JSON exceeds ``result_inline_max_bytes`` are zlib-compressed into
+``resultados_blob`` under their SHA-256, so reruns producing the same output
+share one blob; the row keeps only the hash and size. Blobs are read only
+when the result itself is requested (GET /execucoes/{id}/resultado), never
+when executions are listed.
+
+Clients can ask for part of a result: a JSON pointer into it, a field
+selection and cursor pages over arrays (e.g. ``/findings``), so only that
+part is sent. Blobs are compressed, so the document itself must be
+decompressed and parsed once; as blobs are immutable, parsed documents are
+kept in an LRU (bounded by ``result_cache_max_bytes``) keyed by content hash,
+and paging through a large array does not parse it again for every page.
+
+Each referencing execution holds one count on its blob. Archiving an
+execution releases it, and a blob is deleted when its last reference goes.
+"""
+import asyncio
+import hashlib
+import json
+import zlib
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.json_pointer import (
+    PointerError, PointerNotFound, decode_cursor, encode_cursor, resolve, select_fields
+)
+from app.models.execucao import Execucao
+from app.models.resultado_blob import ResultadoBlob
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+settings = get_settings()
+
+
+def canonical_json(data: Any) -> bytes:
+    """Serialization the content hash is taken over (key order does not matter)."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _pack(encoded: bytes) -> tuple[str, bytes]:
+    return hashlib.sha256(encoded).hexdigest(), zlib.compress(encoded, settings.result_compression_level)
+
+
+def _unpack(conteudo: bytes) -> Any:
+    raw = zlib.decompress(conteudo)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+class DocumentCache:
+    """LRU of parsed blob documents, bounded by their uncompressed size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._size = 0
+
+    def get(self, content_hash: str) -> Any | None:
+        entry = self._entries.get(content_hash)
+        if entry is None:
+            return None
+        self._entries.move_to_end(content_hash)
+        return entry[0]
+
+    def set(self, content_hash: str, document: Any, size: int) -> None:
+        if size > self.max_bytes or content_hash in self._entries:
+            return
+        self._entries[content_hash] = (document, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+document_cache = DocumentCache(settings.result_cache_max_bytes)
+
+
+class ResultadoService:
+    @staticmethod
+    async def store(db: AsyncSession, execucao: Execucao, data: dict | None) -> None:
+        """Set the execution's result, out of line when it is large. Not committed."""
+        await ResultadoService.release(db, execucao)
+        if data is None:
+            return
+        encoded = canonical_json(data)
+        if len(encoded) <= settings.result_inline_max_bytes:
+            execucao.resultado = data
+            return
+
+        content_hash, conteudo = await asyncio.to_thread(_pack, encoded)
+        await _add_reference(db, content_hash, conteudo, len(encoded))
+        execucao.resultado_hash = content_hash
+        execucao.resultado_tamanho = len(encoded)
+
+    @staticmethod
+    async def load(db: AsyncSession, execucao: Execucao) -> dict | None:
+        """
+        The execution's result, reading and decompressing its blob if needed.
+        Blob documents are shared through the cache: do not mutate them.
+        """
+        content_hash = execucao.resultado_hash
+        if content_hash is None:
+            return execucao.resultado
+        document = document_cache.get(content_hash)
+        if document is not None:
+            return document
+        result = await db.execute(select(ResultadoBlob.conteudo).where(ResultadoBlob.hash == content_hash))
+        conteudo = result.scalar_one_or_none()
+        if conteudo is None:
+            return None
+        document = await asyncio.to_thread(_unpack, conteudo)
+        document_cache.set(content_hash, document, execucao.resultado_tamanho or len(conteudo))
+        return document
+
+    @staticmethod
+    async def select(
+        db: AsyncSession,
+        execucao: Execucao,
+        pointer: str = "",
+        campos: list[str] | None = None,
+        limite: int | None = None,
+        cursor: str | None = None
+    ) -> dict:
+        """
+        Part of the result (see module docs): the value at ``pointer``,
+        restricted to ``campos``; arrays are paged when ``limite`` or
+        ``cursor`` is given.
+        """
+        try:
+            offset = decode_cursor(cursor) if cursor else 0
+            value = resolve(await ResultadoService.load(db, execucao), pointer)
+        except PointerError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except PointerNotFound:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Caminho não encontrado no resultado"
+            )
+
+        total = None
+        proximo_cursor = None
+        if isinstance(value, list):
+            total = len(value)
+            if limite is not None or cursor:
+                limite = limite or settings.result_page_size
+                value = value[offset:offset + limite]
+                if offset + limite < total:
+                    proximo_cursor = encode_cursor(offset + limite)
+        elif limite is not None or cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Paginação exige que o ponteiro aponte para uma lista"
+            )
+        if campos:
+            value = select_fields(value, campos)
+        return {
+            "id": execucao.id,
+            "pointer": pointer,
+            "resultado": value,
+            "total": total,
+            "proximo_cursor": proximo_cursor,
+        }
+
+    @staticmethod
+    async def release(db: AsyncSession, execucao: Execucao) -> None:
+        """Drop the execution's result; the blob goes with its last reference. Not committed."""
+        content_hash = execucao.resultado_hash
+        execucao.resultado = None
+        execucao.resultado_hash = None
+        execucao.resultado_tamanho = None
+        if content_hash is None:
+            return
+        await db.flush()  # the row must stop pointing at the blob before it can go
+        await db.execute(
+            update(ResultadoBlob)
+            .where(ResultadoBlob.hash == content_hash)
+            .values(referencias=ResultadoBlob.referencias - 1)
+        )
+        await db.execute(
+            delete(ResultadoBlob)
+            .where(ResultadoBlob.hash == content_hash)
+            .where(ResultadoBlob.referencias <= 0)
+        )
+
+
+async def _add_reference(db: AsyncSession, content_hash: str, conteudo: bytes, tamanho: int) -> None:
+    increment = (
+        update(ResultadoBlob)
+        .where(ResultadoBlob.hash == content_hash)
+        .values(referencias=ResultadoBlob.referencias + 1)
+    )
+    if (await db.execute(increment)).rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(ResultadoBlob).values(
+                hash=content_hash, conteudo=conteudo, tamanho=tamanho, referencias=1
+            ))
+    except IntegrityError:
+        # Another execution stored the same result in the meantime
+        await db.execute(increment)
@@ -0,0 +1,153 @@
+"""
+Sync Service - Delta sync of projects and executions for the web and mobile clients
+
+Every flush that creates, edits or deletes a project or execution appends a
+row to ``alteracoes`` (app.models.alteracao); its autoincrement id is the
+change sequence. A sync token carries the last sequence a client has seen,
+so GET /sync returns only the entities with a later change, each once, in
+their current state (projects soft-deleted or gone are listed as removed).
+Without a token the client gets a snapshot: active projects and the latest
+``sync_snapshot_limit`` executions.
+
+Ids are assigned on insert but become visible on commit, so a slow
+transaction could commit a lower id after a client read past it. Tokens
+therefore stop short of changes younger than ``sync_settle_seconds``; those
+are sent again next time, which clients absorb by upserting by id.
+
+Changes are kept ``sync_retention_days``. Older tokens get 410 and the
+client starts over with a snapshot.
+"""
+import base64
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.alteracao import EXECUCAO, PROJETO, Alteracao
+from app.models.execucao import Execucao
+from app.models.projeto import Projeto
+
+settings = get_settings()
+
+
+def encode_token(sequencia: int) -> str:
+    raw = f"s:{sequencia}:{int(time.time())}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> tuple[int, float]:
+    """Token -> (sequence, issue time)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        prefix, sequencia, emitido = raw.split(":")
+        if prefix != "s" or not sequencia.isdigit() or not emitido.isdigit():
+            raise ValueError(raw)
+        return int(sequencia), float(emitido)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token de sincronização inválido"
+        )
+
+
+class SyncService:
+    @staticmethod
+    async def changes(db: AsyncSession, user_id: int, token: str | None = None) -> dict:
+        """Changes since ``token`` (see module docs)."""
+        if token is None:
+            return await SyncService.snapshot(db, user_id)
+
+        sequencia, emitido = decode_token(token)
+        if emitido < time.time() - settings.sync_retention_days * 86400:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Token de sincronização expirado; refaça a sincronização completa"
+            )
+
+        ultimo = func.max(Alteracao.id)
+        result = await db.execute(
+            select(Alteracao.entidade, Alteracao.entidade_id, ultimo)
+            .where(Alteracao.usuario_id == user_id)
+            .where(Alteracao.id > sequencia)
+            .group_by(Alteracao.entidade, Alteracao.entidade_id)
+            .order_by(ultimo)
+            .limit(settings.sync_page_size + 1)
+        )
+        rows = result.all()
+        mais = len(rows) > settings.sync_page_size
+        rows = rows[:settings.sync_page_size]
+
+        proxima = await SyncService._settled(db, user_id)
+        if mais:
+            # Entities past the page all changed after its last one
+            proxima = min(proxima, rows[-1][2])
+        proxima = max(proxima, sequencia)
+
+        projeto_ids = {entidade_id for entidade, entidade_id, _ in rows if entidade == PROJETO}
+        execucao_ids = {entidade_id for entidade, entidade_id, _ in rows if entidade == EXECUCAO}
+        projetos = await _load(db, Projeto, user_id, projeto_ids)
+        execucoes = await _load(db, Execucao, user_id, execucao_ids)
+        ativos = [projeto for projeto in projetos if projeto.ativo]
+        return {
+            "token": encode_token(proxima),
+            # Unsettled changes alone do not move the token: wait for the next poll
+            "mais": mais and proxima > sequencia,
+            "projetos": ativos,
+            "execucoes": execucoes,
+            "projetos_removidos": sorted(projeto_ids - {projeto.id for projeto in ativos}),
+            "execucoes_removidas": sorted(execucao_ids - {execucao.id for execucao in execucoes}),
+        }
+
+    @staticmethod
+    async def snapshot(db: AsyncSession, user_id: int) -> dict:
+        # Read the sequence first: anything written meanwhile comes in the next delta
+        sequencia = await SyncService._settled(db, user_id)
+        projetos = await db.execute(
+            select(Projeto)
+            .where(Projeto.usuario_id == user_id)
+            .where(Projeto.ativo == True)
+            .order_by(Projeto.id)
+        )
+        execucoes = await db.execute(
+            select(Execucao)
+            .where(Execucao.usuario_id == user_id)
+            .order_by(Execucao.iniciado_em.desc())
+            .limit(settings.sync_snapshot_limit)
+        )
+        return {
+            "token": encode_token(sequencia),
+            "completo": True,
+            "projetos": projetos.scalars().all(),
+            "execucoes": execucoes.scalars().all(),
+        }
+
+    @staticmethod
+    async def prune(db: AsyncSession) -> int:
+        """Delete changes past the retention period. Returns how many."""
+        limite = datetime.utcnow() - timedelta(days=settings.sync_retention_days)
+        result = await db.execute(delete(Alteracao).where(Alteracao.criado_em < limite))
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def _settled(db: AsyncSession, user_id: int) -> int:
+        """Latest sequence old enough that no lower one can still commit."""
+        limite = datetime.utcnow() - timedelta(seconds=settings.sync_settle_seconds)
+        sequencia = await db.scalar(
+            select(func.max(Alteracao.id))
+            .where(Alteracao.usuario_id == user_id)
+            .where(Alteracao.criado_em <= limite)
+        )
+        return sequencia or 0
+
+
+async def _load(db: AsyncSession, model, user_id: int, ids: set[int]) -> list:
+    if not ids:
+        return []
+    result = await db.execute(
+        select(model).where(model.id.in_(ids)).where(model.usuario_id == user_id).order_by(model.id)
+    )
+    return result.scalars().all()
@@ -0,0 +1,4 @@
+"""Background Tasks Package"""
+from app.tasks.scheduler import ExecutionScheduler, ScheduledJob, scheduler
+
+__all__ = ["ExecutionScheduler", "ScheduledJob", "scheduler"]
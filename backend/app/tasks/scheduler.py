@@ -0,0 +1,377 @@
+"""
+Execution Scheduler - Admission control and fair queuing for pipeline runs
+
+Executions are queued per priority class ("interactive" / "batch") and, inside
+each class, per user. Dispatch uses weighted fair queuing at both levels:
+every class and every user carries a virtual time that advances by
+``1 / weight`` each time one of its jobs starts, and the lowest virtual time
+goes next. A user (or class) that becomes active again starts at the current
+virtual clock, so idle time cannot be banked into a burst later.
+
+A job only starts while the global, per-user and per-project running counts
+are below their caps; blocked jobs stay queued without blocking other users.
+Reattached jobs (already running in the Core before a restart) skip the queue.
+
+Inside a user's queue jobs start in arrival order. With
+``shortest_job_first`` they start by ``enqueued_at + duracao_estimada``
+instead (estimates from app.core.duration_model), so quick runs overtake
+long ones while a long job waits at most its own estimate longer than FIFO.
+The same key breaks ties between users of a class; fairness across users and
+classes is unchanged.
+
+``estimate_wait`` replays the dispatch order over the global slots, using
+the remaining estimate of running jobs, to tell a queued job roughly when it
+will start. Per-user and per-project caps are not simulated.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from app.config import get_settings
+from app.core.metrics import executions_queued
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+Runner = Callable[..., Awaitable[None]]
+
+
+@dataclass
+class ScheduledJob:
+    """A queued execution and everything needed to start it."""
+    execucao_id: int
+    usuario_id: int
+    projeto_id: int
+    config: dict
+    prioridade: str = INTERACTIVE
+    reattach: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+    duracao_estimada: float | None = None
+    iniciado_em: float | None = None
+
+
+class ExecutionScheduler:
+    """In-process scheduler owning ``run_pipeline_task`` (see module docs)."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_per_user: int = 2,
+        max_per_project: int = 2,
+        class_weights: dict[str, float] | None = None,
+        runner: Runner | None = None,
+        shortest_job_first: bool = False
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_per_project = max_per_project
+        self.class_weights = class_weights or {INTERACTIVE: 4.0, BATCH: 1.0}
+        self._runner = runner
+        self.shortest_job_first = shortest_job_first
+
+        # class -> user -> jobs in arrival order
+        self._queues: dict[str, dict[int, deque[ScheduledJob]]] = {c: {} for c in self.class_weights}
+        self._queued: dict[int, ScheduledJob] = {}
+        self._class_vtime: dict[str, float] = {c: 0.0 for c in self.class_weights}
+        self._user_vtime: dict[tuple[str, int], float] = {}
+        self._class_clock = 0.0
+        self._user_clock: dict[str, float] = {c: 0.0 for c in self.class_weights}
+
+        self._running: dict[int, tuple[ScheduledJob, asyncio.Task]] = {}
+        self._running_by_user: Counter[int] = Counter()
+        self._running_by_project: Counter[int] = Counter()
+
+        self._order: list[ScheduledJob] | None = None
+        self._positions: dict[int, int] | None = None
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def queued(self) -> int:
+        return len(self._queued)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def submit(self, job: ScheduledJob) -> None:
+        """Queue a job and start whatever the caps allow."""
+        if job.reattach:
+            # Already consuming Core capacity: resume it right away
+            self._start(job)
+            self._changed()
+            return
+        if job.prioridade not in self._queues:
+            job.prioridade = INTERACTIVE
+        queues = self._queues[job.prioridade]
+
+        if not any(queues.values()):
+            # Class re-activated: join at the current clock
+            self._class_vtime[job.prioridade] = max(self._class_vtime[job.prioridade], self._class_clock)
+        user_key = (job.prioridade, job.usuario_id)
+        if not queues.get(job.usuario_id):
+            self._user_vtime[user_key] = max(
+                self._user_vtime.get(user_key, 0.0), self._user_clock[job.prioridade]
+            )
+
+        queues.setdefault(job.usuario_id, deque()).append(job)
+        self._queued[job.execucao_id] = job
+        self._changed()
+        self._dispatch()
+
+    def cancel(self, execucao_id: int) -> bool:
+        """Drop a queued job. Returns False if it is not queued."""
+        job = self._queued.pop(execucao_id, None)
+        if job is None:
+            return False
+        user_queue = self._queues[job.prioridade].get(job.usuario_id)
+        if user_queue is not None:
+            user_queue.remove(job)
+            if not user_queue:
+                del self._queues[job.prioridade][job.usuario_id]
+        self._changed()
+        return True
+
+    def cancel_running(self, execucao_id: int) -> bool:
+        """
+        Cancel a running job and free its slot immediately. The task is left
+        to clean up (abort the Core job) while the next job starts.
+        """
+        entry = self._running.get(execucao_id)
+        if entry is None:
+            return False
+        job, task = entry
+        self._release(job)
+        task.cancel()
+        self._dispatch()
+        self._changed()
+        return True
+
+    def is_running(self, execucao_id: int) -> bool:
+        return execucao_id in self._running
+
+    def owns(self, execucao_id: int) -> bool:
+        """Whether the job is queued or running in this process."""
+        return execucao_id in self._queued or execucao_id in self._running
+
+    def owned(self) -> list[int]:
+        """Ids of the jobs queued or running in this process."""
+        return [*self._queued, *self._running]
+
+    def position(self, execucao_id: int) -> int | None:
+        """1-based dispatch position of a queued job, or None if not queued."""
+        if execucao_id not in self._queued:
+            return None
+        if self._positions is None:
+            self._positions = {
+                job.execucao_id: i for i, job in enumerate(self._queue_order(), start=1)
+            }
+        return self._positions.get(execucao_id)
+
+    def estimate_wait(self, execucao_id: int) -> float | None:
+        """Estimated seconds until a queued job starts, or None if not queued."""
+        if execucao_id not in self._queued:
+            return None
+        if not self.max_concurrent:
+            return 0.0
+        now = time.monotonic()
+        busy = sorted(
+            max((job.duracao_estimada or 0.0) - (now - (job.iniciado_em or now)), 0.0)
+            for job, _ in self._running.values()
+        )
+        # Slot free times: over-cap reattached jobs hold their slot until enough finish
+        slots = busy[max(len(busy) - self.max_concurrent, 0):]
+        slots += [0.0] * (self.max_concurrent - len(slots))
+        heapq.heapify(slots)
+        for job in self._queue_order():
+            start = heapq.heappop(slots)
+            if job.execucao_id == execucao_id:
+                return start
+            heapq.heappush(slots, start + (job.duracao_estimada or 0.0))
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "executando": self.running,
+            "na_fila": self.queued,
+            "por_usuario": dict(self._running_by_user),
+            "por_projeto": dict(self._running_by_project),
+        }
+
+    async def shutdown(self, grace_seconds: float) -> None:
+        """
+        Stop starting jobs and give running ones ``grace_seconds`` to finish;
+        the rest are cancelled (run_pipeline_task checkpoints them). Queued
+        jobs stay ``pending`` in the database; once their leases are released
+        the next process to start (or any live one) recovers them.
+        """
+        self._closed = True
+        tasks = [task for _, task in self._running.values()]
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.info("Checkpointed %d running executions for reattach", len(pending))
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def wait_idle(self) -> None:
+        """Wait until nothing is running or queued (used by tests and benchmarks)."""
+        while self._running or (self._queued and not self._closed):
+            tasks = [task for _, task in self._running.values()]
+            if not tasks:
+                await asyncio.sleep(0)
+                continue
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _has_capacity(self) -> bool:
+        return not self.max_concurrent or len(self._running) < self.max_concurrent
+
+    def _eligible(self, job: ScheduledJob) -> bool:
+        if self.max_per_user and self._running_by_user[job.usuario_id] >= self.max_per_user:
+            return False
+        if self.max_per_project and self._running_by_project[job.projeto_id] >= self.max_per_project:
+            return False
+        return True
+
+    def _job_key(self, job: ScheduledJob) -> float:
+        """Order of jobs inside a user's queue (see module docs)."""
+        if self.shortest_job_first:
+            return job.enqueued_at + (job.duracao_estimada or 0.0)
+        return job.enqueued_at
+
+    def _select(self) -> ScheduledJob | None:
+        """Pick the next job to start among those allowed by the caps."""
+        best: tuple | None = None
+        for prioridade, queues in self._queues.items():
+            for usuario_id, jobs in queues.items():
+                job = min((j for j in jobs if self._eligible(j)), key=self._job_key, default=None)
+                if job is None:
+                    continue
+                key = (
+                    self._class_vtime[prioridade],
+                    self._user_vtime[(prioridade, usuario_id)],
+                    self._job_key(job),
+                )
+                if best is None or key < best[0]:
+                    best = (key, job)
+        return best[1] if best else None
+
+    def _charge(self, job: ScheduledJob, class_vtime: dict, user_vtime: dict) -> None:
+        """Advance the virtual times of the job's class and user."""
+        self._class_clock = class_vtime[job.prioridade]
+        self._user_clock[job.prioridade] = user_vtime[(job.prioridade, job.usuario_id)]
+        class_vtime[job.prioridade] += 1.0 / self.class_weights[job.prioridade]
+        user_vtime[(job.prioridade, job.usuario_id)] += 1.0
+
+    def _dequeue(self, job: ScheduledJob) -> None:
+        del self._queued[job.execucao_id]
+        user_queue = self._queues[job.prioridade][job.usuario_id]
+        user_queue.remove(job)
+        if not user_queue:
+            del self._queues[job.prioridade][job.usuario_id]
+
+    def _start(self, job: ScheduledJob) -> None:
+        self._running_by_user[job.usuario_id] += 1
+        self._running_by_project[job.projeto_id] += 1
+        job.iniciado_em = time.monotonic()
+        task = asyncio.create_task(self._run(job), name=f"execucao-{job.execucao_id}")
+        self._running[job.execucao_id] = (job, task)
+
+    def _dispatch(self) -> None:
+        started = False
+        while not self._closed and self._has_capacity():
+            job = self._select()
+            if job is None:
+                break
+            self._dequeue(job)
+            self._charge(job, self._class_vtime, self._user_vtime)
+            self._start(job)
+            started = True
+        if started:
+            self._changed()
+
+    def _queue_order(self) -> list[ScheduledJob]:
+        if self._order is None:
+            self._order = self._dispatch_order()
+        return self._order
+
+    def _dispatch_order(self) -> list[ScheduledJob]:
+        """Order in which queued jobs would start if no cap were hit."""
+        class_vtime = dict(self._class_vtime)
+        user_vtime = dict(self._user_vtime)
+        heads = {
+            (prioridade, usuario_id): sorted(jobs, key=self._job_key)
+            for prioridade, queues in self._queues.items()
+            for usuario_id, jobs in queues.items()
+        }
+        order: list[ScheduledJob] = []
+        while heads:
+            key = min(
+                heads,
+                key=lambda k: (class_vtime[k[0]], user_vtime[k], self._job_key(heads[k][0]))
+            )
+            job = heads[key].pop(0)
+            if not heads[key]:
+                del heads[key]
+            class_vtime[key[0]] += 1.0 / self.class_weights[key[0]]
+            user_vtime[key] += 1.0
+            order.append(job)
+        return order
+
+    def _changed(self) -> None:
+        self._order = None
+        self._positions = None
+        executions_queued.set(len(self._queued))
+
+    async def _run(self, job: ScheduledJob) -> None:
+        runner = self._runner
+        if runner is None:
+            from app.services.execucao_service import run_pipeline_task
+            runner = run_pipeline_task
+        try:
+            await runner(job.execucao_id, job.config, reattach=job.reattach)
+        except Exception:
+            logger.exception("Execution %s failed in the scheduler", job.execucao_id)
+        except asyncio.CancelledError:
+            pass  # cancelled by cancel_running() or shutdown()
+        finally:
+            if self._running.get(job.execucao_id, (None,))[0] is job:
+                self._release(job)
+            self._dispatch()
+
+    def _release(self, job: ScheduledJob) -> None:
+        del self._running[job.execucao_id]
+        self._running_by_user[job.usuario_id] -= 1
+        if self._running_by_user[job.usuario_id] <= 0:
+            del self._running_by_user[job.usuario_id]
+        self._running_by_project[job.projeto_id] -= 1
+        if self._running_by_project[job.projeto_id] <= 0:
+            del self._running_by_project[job.projeto_id]
+
+
+scheduler = ExecutionScheduler(
+    max_concurrent=settings.scheduler_max_concurrent,
+    max_per_user=settings.scheduler_max_per_user,
+    max_per_project=settings.scheduler_max_per_project,
+    class_weights={
+        INTERACTIVE: settings.scheduler_interactive_weight,
+        BATCH: settings.scheduler_batch_weight,
+    },
+    shortest_job_first=settings.scheduler_shortest_job_first
+)
@@ -0,0 +1,401 @@
+"""
+Execution Worker - Claims pending executions from the database with a lease
+
+Used when ``execution_mode="worker"``: the API only records executions and
+any number of worker processes (``python -m app.worker``) pick them up.
+
+A claim is a conditional UPDATE that only succeeds while the row is still
+claimable (pending or running without a live lease), so two
+workers can never own the same execution. On databases that support it the
+candidate SELECT uses ``FOR UPDATE SKIP LOCKED`` so concurrent workers skip
+each other's rows instead of racing for the same ones.
+
+While an execution runs its lease is renewed every ``heartbeat_seconds``. A
+worker that dies stops renewing; once the lease expires another worker
+reclaims the row. If the Core job id was checkpointed the new worker
+reattaches to it, otherwise the execution starts over. A worker shutting down
+checkpoints its runs and releases their leases so they are picked up at once.
+The heartbeat also notices executions cancelled through the API and stops them.
+
+In inline mode the same columns record which API process owns an execution
+(``InlineLeases``): rows are leased to their process from creation, one
+UPDATE per heartbeat renews all of them, and a process only recovers rows
+whose owner's lease expired, so several API processes (``--workers``, rolling
+restarts) never run or re-queue each other's executions. As with workers, the
+heartbeat stops the process's executions cancelled through another process.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import and_, case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import async_session
+from app.models.alteracao import record_execucao_change
+from app.models.execucao import Execucao, PrioridadeExecucao, StatusExecucao
+from app.models.projeto import Projeto
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SKIP_LOCKED_DIALECTS = {"postgresql", "mysql", "mariadb", "oracle"}
+
+Runner = Callable[..., Awaitable[None]]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _claimable(now: datetime):
+    """Rows a worker may take: pending or running without a live lease."""
+    expired = and_(Execucao.lease_expira_em.is_not(None), Execucao.lease_expira_em < now)
+    return and_(
+        Execucao.status.in_([StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value]),
+        or_(Execucao.lease_owner.is_(None), expired),
+    )
+
+
+def _reattachable():
+    return and_(
+        Execucao.status == StatusExecucao.RUNNING.value,
+        Execucao.core_execution_id.is_not(None)
+    )
+
+
+class Worker:
+    """Claims, runs and heartbeats executions (see module docs)."""
+
+    def __init__(
+        self,
+        worker_id: str | None = None,
+        concurrency: int = 4,
+        lease_seconds: float = 30.0,
+        heartbeat_seconds: float = 10.0,
+        poll_interval: float = 1.0,
+        shutdown_grace_seconds: float = 10.0,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        runner: Runner | None = None
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_interval = poll_interval
+        self.shutdown_grace_seconds = shutdown_grace_seconds
+        self.session_factory = session_factory or async_session
+        self._runner = runner
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._interrupted: set[int] = set()
+        self._stopping = asyncio.Event()
+
+    # ------------------------------------------------------------------
+    # Lease primitives
+    # ------------------------------------------------------------------
+
+    def _lease_deadline(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def claim(self, limit: int = 1) -> list[int]:
+        """Claim up to ``limit`` executions; interactive first, then oldest."""
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            query = (
+                select(Execucao.id, Execucao.status, Execucao.core_execution_id)
+                .where(_claimable(now))
+                .order_by(
+                    (Execucao.prioridade != PrioridadeExecucao.INTERACTIVE.value),
+                    Execucao.iniciado_em
+                )
+                .limit(limit * 2)  # some candidates may be lost to other workers
+            )
+            if db.bind.dialect.name in SKIP_LOCKED_DIALECTS:
+                query = query.with_for_update(skip_locked=True)
+            candidates = (await db.execute(query)).all()
+
+            claimed: list[int] = []
+            requeued: list[int] = []
+            for execucao_id, status_atual, core_execution_id in candidates:
+                if len(claimed) >= limit:
+                    break
+                result = await db.execute(
+                    update(Execucao)
+                    .where(Execucao.id == execucao_id)
+                    .where(_claimable(now))
+                    .values(
+                        lease_owner=self.worker_id,
+                        lease_expira_em=self._lease_deadline(),
+                        # Runs without a Core checkpoint restart from scratch
+                        status=case(
+                            (_reattachable(), StatusExecucao.RUNNING.value),
+                            else_=StatusExecucao.PENDING.value
+                        )
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    claimed.append(execucao_id)
+                    if status_atual == StatusExecucao.RUNNING.value and not core_execution_id:
+                        requeued.append(execucao_id)
+            if requeued:
+                # Back to pending: a change clients see (GET /sync)
+                await db.execute(record_execucao_change(requeued))
+            await db.commit()
+        return claimed
+
+    async def renew(self, execucao_id: int) -> bool:
+        """Extend our lease. False means another worker took the execution over."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Execucao)
+                .where(Execucao.id == execucao_id)
+                .where(Execucao.lease_owner == self.worker_id)
+                .values(lease_expira_em=self._lease_deadline())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def is_cancelled(self, execucao_id: int) -> bool:
+        async with self.session_factory() as db:
+            status_atual = await db.scalar(select(Execucao.status).where(Execucao.id == execucao_id))
+        return status_atual == StatusExecucao.CANCELLED.value
+
+    async def release(self, execucao_id: int) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Execucao)
+                .where(Execucao.id == execucao_id)
+                .where(Execucao.lease_owner == self.worker_id)
+                .values(lease_owner=None, lease_expira_em=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    async def _load(self, execucao_id: int) -> tuple[dict, bool] | None:
+        """Pipeline config and whether to reattach to a checkpointed Core job."""
+        from app.services.execucao_service import ExecucaoService
+
+        async with self.session_factory() as db:
+            row = (await db.execute(
+                select(Execucao, Projeto)
+                .join(Projeto, Projeto.id == Execucao.projeto_id)
+                .where(Execucao.id == execucao_id)
+            )).first()
+        if row is None:
+            return None
+        execucao, projeto = row
+        config = ExecucaoService.build_pipeline_config(projeto, execucao)
+        reattach = execucao.status == StatusExecucao.RUNNING.value and bool(execucao.core_execution_id)
+        return config, reattach
+
+    async def _heartbeat(self, execucao_id: int, run_task: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                renewed = await self.renew(execucao_id)
+                cancelled = renewed and await self.is_cancelled(execucao_id)
+            except Exception:
+                logger.exception("Failed to renew lease for execution %s", execucao_id)
+                continue
+            if not renewed:
+                logger.warning("Lost lease on execution %s; stopping it", execucao_id)
+            elif cancelled:
+                logger.info("Execution %s was cancelled; stopping it", execucao_id)
+            else:
+                continue
+            self._interrupted.add(execucao_id)
+            run_task.cancel()
+            return
+
+    async def execute(self, execucao_id: int) -> None:
+        """Run one claimed execution while keeping its lease alive."""
+        runner = self._runner
+        if runner is None:
+            from app.services.execucao_service import run_pipeline_task
+            runner = run_pipeline_task
+
+        try:
+            loaded = await self._load(execucao_id)
+            if loaded is None:
+                return
+            config, reattach = loaded
+            run_task = asyncio.create_task(runner(execucao_id, config, reattach=reattach))
+            heartbeat = asyncio.create_task(self._heartbeat(execucao_id, run_task))
+            try:
+                await run_task
+            except asyncio.CancelledError:
+                # Lost lease or user cancel: stop only this run. Otherwise we are shutting down.
+                if execucao_id not in self._interrupted:
+                    raise
+            finally:
+                heartbeat.cancel()
+        finally:
+            self._interrupted.discard(execucao_id)
+            await self.release(execucao_id)
+
+    def _start(self, execucao_id: int) -> None:
+        task = asyncio.create_task(self.execute(execucao_id), name=f"execucao-{execucao_id}")
+        self._tasks[execucao_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(execucao_id, None))
+
+    async def poll_once(self) -> int:
+        """Claim and start as many executions as there are free slots."""
+        free = self.concurrency - len(self._tasks)
+        if free <= 0 or self._stopping.is_set():
+            return 0
+        claimed = await self.claim(free)
+        for execucao_id in claimed:
+            self._start(execucao_id)
+        return len(claimed)
+
+    async def run(self) -> None:
+        logger.info("Worker %s started (concurrency=%d)", self.worker_id, self.concurrency)
+        while not self._stopping.is_set():
+            try:
+                started = await self.poll_once()
+            except Exception:
+                logger.exception("Worker poll failed")
+                started = 0
+            if started and len(self._tasks) < self.concurrency:
+                continue  # there may be more work right away
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        await self.drain(self.shutdown_grace_seconds)
+        logger.info("Worker %s stopped", self.worker_id)
+
+    async def drain(self, grace_seconds: float) -> None:
+        """Let running executions finish, then checkpoint and release the rest."""
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Stop claiming; ``run`` returns once in-flight executions finish."""
+        self._stopping.set()
+
+
+class InlineLeases:
+    """Ownership of the executions this API process queues and runs (inline mode)."""
+
+    def __init__(
+        self,
+        owner: str | None = None,
+        lease_seconds: float = 30.0,
+        heartbeat_seconds: float = 10.0,
+        session_factory: async_sessionmaker[AsyncSession] | None = None
+    ):
+        self.owner = owner or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.session_factory = session_factory or async_session
+        self._task: asyncio.Task | None = None
+
+    def deadline(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def claim(self, db: AsyncSession) -> list[int]:
+        """Take over pending/running rows without a live lease. Committed; returns their ids."""
+        now = datetime.utcnow()
+        candidates = (await db.execute(select(Execucao.id).where(_claimable(now)))).scalars().all()
+        claimed: list[int] = []
+        for execucao_id in candidates:
+            result = await db.execute(
+                update(Execucao)
+                .where(Execucao.id == execucao_id)
+                .where(_claimable(now))
+                .values(lease_owner=self.owner, lease_expira_em=self.deadline())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                claimed.append(execucao_id)
+        await db.commit()
+        return claimed
+
+    async def renew(self) -> None:
+        await self._update_own(lease_expira_em=self.deadline())
+
+    async def release(self) -> None:
+        """Give up our unfinished rows so the next process takes them at once."""
+        await self._update_own(lease_owner=None, lease_expira_em=None)
+
+    async def _update_own(self, **values) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Execucao)
+                .where(Execucao.lease_owner == self.owner)
+                .where(Execucao.status.in_([StatusExecucao.PENDING.value, StatusExecucao.RUNNING.value]))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    def start(
+        self,
+        recover: Callable[[], Awaitable[object]],
+        stop_cancelled: Callable[[], Awaitable[object]] | None = None
+    ) -> None:
+        """
+        Every heartbeat: renew our leases, ``stop_cancelled`` our runs cancelled
+        through another process, then ``recover`` rows orphaned meanwhile.
+        """
+        self._task = asyncio.create_task(self._run(recover, stop_cancelled), name="inline-leases")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.release()
+
+    async def _run(
+        self,
+        recover: Callable[[], Awaitable[object]],
+        stop_cancelled: Callable[[], Awaitable[object]] | None
+    ) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.renew()
+                if stop_cancelled is not None:
+                    await stop_cancelled()
+                await recover()
+            except Exception:
+                logger.exception("Failed to renew inline execution leases")
+
+
+inline_leases = InlineLeases(
+    lease_seconds=settings.worker_lease_seconds,
+    heartbeat_seconds=settings.worker_heartbeat_seconds
+)
+
+
+def create_worker(**overrides) -> Worker:
+    options = {
+        "concurrency": settings.worker_concurrency,
+        "lease_seconds": settings.worker_lease_seconds,
+        "heartbeat_seconds": settings.worker_heartbeat_seconds,
+        "poll_interval": settings.worker_poll_interval,
+        "shutdown_grace_seconds": settings.shutdown_grace_seconds,
+    }
+    options.update(overrides)
+    return Worker(**options)
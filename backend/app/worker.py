@@ -0,0 +1,61 @@
+"""
+DevFlow Worker - Standalone pipeline execution process
+
+Run alongside the API when ``EXECUTION_MODE=worker``:
+
+    python -m app.worker [--concurrency 4] [--id worker-1]
+
+Each worker claims pending executions from the database with a renewable
+lease (see app.tasks.worker), so API and pipeline capacity scale
+independently across processes and machines. SIGINT/SIGTERM stop claiming
+and wait for in-flight executions.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.config import get_settings
+from app.core.akita_wrapper import get_orchestrator
+from app.database import async_session, engine
+from app.services.execucao_service import ExecucaoService
+from app.tasks.worker import create_worker
+
+settings = get_settings()
+
+
+async def main(args: argparse.Namespace) -> None:
+    overrides = {}
+    if args.concurrency:
+        overrides["concurrency"] = args.concurrency
+    if args.id:
+        overrides["worker_id"] = args.id
+    worker = create_worker(**overrides)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, worker.stop)
+        except NotImplementedError:  # pragma: no cover - Windows
+            signal.signal(signum, lambda *_: worker.stop())
+
+    async with async_session() as db:
+        await ExecucaoService.warm_duration_model(db)
+    core_pool = get_orchestrator().pool
+    core_pool.start()
+    try:
+        await worker.run()
+    finally:
+        await core_pool.stop()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DevFlow pipeline worker")
+    parser.add_argument("--concurrency", type=int, help="parallel executions (default: WORKER_CONCURRENCY)")
+    parser.add_argument("--id", help="worker id used as lease owner (default: host:pid:random)")
+    logging.basicConfig(
+        level=logging.DEBUG if settings.debug else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    asyncio.run(main(parser.parse_args()))
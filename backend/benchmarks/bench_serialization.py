@@ -0,0 +1,70 @@
+"""
+Serialization & compression benchmark
+
+Compares the default encoder (jsonable_encoder + json.dumps, what FastAPI's
+JSONResponse does) against the fast path in app.core.responses, and measures
+gzip/brotli cost and ratio on realistic execution payloads.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--findings 2000 5000] [--repeat 10]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from app.core import compression
+from app.core.responses import dumps_default, dumps_fast, orjson
+from app.schemas.execucao import ExecucaoResponse, ExecucaoLogsResponse
+from benchmarks.payloads import make_logs, make_resultado
+
+
+def timeit(fn, repeat: int) -> tuple[float, float, object]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples), result
+
+
+def bench_payload(label: str, payload, repeat: int) -> None:
+    print(f"\n## {label}")
+    print(f"{'encoder':<28}{'median ms':>12}{'max ms':>12}{'bytes':>14}")
+    body = b""
+    for name, fn in (("default (jsonable+json)", dumps_default), ("fast", dumps_fast)):
+        median, worst, body = timeit(lambda: fn(payload), repeat)
+        print(f"{name:<28}{median:>12.2f}{worst:>12.2f}{len(body):>14,}")
+
+    print(f"{'compression':<28}{'median ms':>12}{'max ms':>12}{'bytes':>14}")
+    encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+    for encoding in encodings:
+        median, worst, compressed = timeit(lambda: compression.compress(body, encoding), repeat)
+        ratio = len(compressed) / len(body)
+        print(f"{encoding + f' ({ratio:.1%})':<28}{median:>12.2f}{worst:>12.2f}{len(compressed):>14,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, nargs="+", default=[500, 2000, 8000])
+    parser.add_argument("--log-lines", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"orjson available: {orjson is not None} | brotli available: {compression.brotli is not None}")
+    now = datetime.utcnow()
+    for findings in args.findings:
+        execucao = ExecucaoResponse(
+            id=1, projeto_id=1, usuario_id=1, status="success",
+            parametros_entrada={"mode": "review", "target": "."},
+            resultado=make_resultado(findings), iniciado_em=now, finalizado_em=now
+        )
+        bench_payload(f"ExecucaoResponse with {findings} findings", execucao, args.repeat)
+
+    logs = ExecucaoLogsResponse(id=1, status="running", logs=make_logs(args.log_lines))
+    bench_payload(f"ExecucaoLogsResponse with {args.log_lines} lines", logs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+"""
+API load test - realistic request mix against the real FastAPI app
+
+Seeds a database (see benchmarks.seed), logs in a pool of virtual users and
+replays a weighted mix of requests (login, list projects, list executions,
+get execution, poll logs, launch execution) for a fixed duration or number of
+requests. Reports throughput and latency percentiles per scenario and exits
+with status 1 when a threshold or baseline regression is crossed.
+
+By default the app runs in-process on a temporary SQLite database with a fake
+AkitaLLM Core (``--core-latency``), so results only depend on the API itself.
+With ``--base-url`` the requests go to a running server instead; pass the
+server's ``--database-url`` to seed it, or ``--skip-seed`` to reuse bench users.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --duration 20 --concurrency 32 \\
+        --thresholds benchmarks/thresholds.json --output results.json
+    python -m benchmarks.load_test --baseline results.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.log_sink import LogEvent
+from benchmarks.seed import BENCH_PASSWORD, add_seed_arguments, seed_config_from_args, seed_database
+
+DEFAULT_MIX = {
+    "login": 2,
+    "list_projects": 20,
+    "list_executions": 20,
+    "get_execution": 15,
+    "poll_logs": 35,
+    "launch_execution": 8,
+}
+
+
+# --------------------------------------------------------------------------
+# In-process harness
+# --------------------------------------------------------------------------
+
+class InProcessTransport(httpx.AsyncBaseTransport):
+    """
+    Like ``httpx.ASGITransport`` but returns as soon as the response body is
+    complete, so background tasks keep running after the response like they do
+    behind a real server (instead of being billed to the request latency).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._tasks: set[asyncio.Task] = set()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(k.lower(), v) for k, v in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port or 80),
+            "client": ("127.0.0.1", 123),
+            "root_path": "",
+        }
+        status_code = 500
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        response_complete = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        task = asyncio.create_task(self.app(scope, receive, send))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        waiter = asyncio.create_task(response_complete.wait())
+        await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        if not response_complete.is_set():
+            waiter.cancel()
+            task.result()  # re-raise application errors
+            raise RuntimeError("Application returned without sending a response")
+
+        return httpx.Response(status_code, headers=headers, content=b"".join(chunks), request=request)
+
+    async def aclose(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class FakeCore:
+    """Stand-in for the AkitaLLM Core: streams a few log lines then succeeds."""
+
+    def __init__(self, latency: float = 0.2, log_lines: int = 20):
+        self.latency = latency
+        self.log_lines = log_lines
+
+    async def execute(self, config, sink=None, **kwargs):
+        step = self.latency / max(self.log_lines, 1)
+        for i in range(self.log_lines):
+            if sink is not None:
+                await sink.publish(LogEvent.log([f"Analisando src/module_{i}.py ({i + 1}/{self.log_lines})"]))
+            await asyncio.sleep(step)
+        return {
+            "success": True,
+            "data": {"result": {"summary": "ok", "findings": []}},
+            "elapsed_seconds": self.latency,
+            "timings": {"submit": 0.0, "first_log": step, "core_run": self.latency},
+        }
+
+
+class InProcessApp:
+    """Points the app, the pipeline task and the orchestrator at a bench database."""
+
+    def __init__(self, engine: AsyncEngine, core: FakeCore):
+        self.engine = engine
+        self.core = core
+        self._saved: dict = {}
+
+    def __enter__(self):
+        from app.core import akita_wrapper
+        from app.database import get_db
+        from app.main import app
+        from app.services import execucao_service
+
+        session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        async def override_get_db():
+            # Same unit-of-work semantics as app.database.get_db
+            async with session_factory() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+        self._saved = {
+            "async_session": execucao_service.async_session,
+            "orchestrator": akita_wrapper._orchestrator,
+        }
+        app.dependency_overrides[get_db] = override_get_db
+        execucao_service.async_session = session_factory
+        akita_wrapper._orchestrator = self.core
+        self.app = app
+        return self
+
+    async def drain(self) -> None:
+        from app.tasks.scheduler import scheduler
+        await scheduler.wait_idle()
+
+    def __exit__(self, *exc):
+        from app.core import akita_wrapper
+        from app.services import execucao_service
+
+        self.app.dependency_overrides.clear()
+        execucao_service.async_session = self._saved["async_session"]
+        akita_wrapper._orchestrator = self._saved["orchestrator"]
+
+
+# --------------------------------------------------------------------------
+# Load generation
+# --------------------------------------------------------------------------
+
+@dataclass
+class LoadConfig:
+    concurrency: int = 16
+    duration: float = 10.0
+    max_requests: int | None = None
+    mix: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 99
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, scenario: str, seconds: float, ok: bool) -> None:
+        self.latencies[scenario].append(seconds)
+        if not ok:
+            self.errors[scenario] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str, password: str, rng: random.Random):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        self.projects: list[int] = []
+        self.executions: list[int] = []
+        self.launched: list[int] = []
+        self.etags: dict[int, str] = {}
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/auth/login", data={"username": self.email, "password": self.password}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def list_projects(self) -> httpx.Response:
+        response = await self.client.get("/projetos/", headers=self.headers)
+        if response.status_code == 200:
+            self.projects = [p["id"] for p in response.json()]
+        return response
+
+    async def list_executions(self) -> httpx.Response:
+        response = await self.client.get("/execucoes/", params={"limit": 50}, headers=self.headers)
+        if response.status_code == 200:
+            self.executions = [e["id"] for e in response.json()]
+        return response
+
+    def _pick_execution(self) -> int | None:
+        # Clients mostly poll what they just launched
+        if self.launched and self.rng.random() < 0.7:
+            return self.rng.choice(self.launched[-5:])
+        return self.rng.choice(self.executions) if self.executions else None
+
+    async def get_execution(self) -> httpx.Response | None:
+        execucao_id = self._pick_execution()
+        if execucao_id is None:
+            return None
+        headers = dict(self.headers)
+        if execucao_id in self.etags:
+            headers["If-None-Match"] = self.etags[execucao_id]
+        response = await self.client.get(f"/execucoes/{execucao_id}", headers=headers)
+        if response.status_code == 200 and "etag" in response.headers:
+            self.etags[execucao_id] = response.headers["etag"]
+        return response
+
+    async def poll_logs(self) -> httpx.Response | None:
+        execucao_id = self._pick_execution()
+        if execucao_id is None:
+            return None
+        return await self.client.get(f"/execucoes/{execucao_id}/logs", headers=self.headers)
+
+    async def launch_execution(self) -> httpx.Response | None:
+        if not self.projects:
+            return None
+        projeto_id = self.rng.choice(self.projects)
+        response = await self.client.post(
+            f"/projetos/{projeto_id}/execucoes",
+            json={"parametros_entrada": {"mode": "review", "target": "."}},
+            headers=self.headers,
+        )
+        if response.status_code == 202:
+            self.launched.append(response.json()["id"])
+        return response
+
+
+async def _timed(recorder: Recorder, scenario: str, call) -> None:
+    start = time.perf_counter()
+    try:
+        response = await call()
+    except httpx.HTTPError:
+        recorder.record(scenario, time.perf_counter() - start, ok=False)
+        return
+    if response is None:
+        return  # nothing to do yet for this user
+    recorder.record(scenario, time.perf_counter() - start, ok=response.status_code < 400)
+
+
+async def run_load(client: httpx.AsyncClient, emails: list[str], password: str, config: LoadConfig) -> Recorder:
+    rng = random.Random(config.seed)
+    recorder = Recorder()
+    users = [VirtualUser(client, emails[i % len(emails)], password, random.Random(rng.random()))
+             for i in range(config.concurrency)]
+
+    # Warm-up: every virtual user logs in and discovers its data (not recorded)
+    for user in users:
+        await user.login()
+        await user.list_projects()
+        await user.list_executions()
+
+    scenarios = [name for name, weight in config.mix.items() if weight > 0]
+    weights = [config.mix[name] for name in scenarios]
+    deadline = time.perf_counter() + config.duration
+    budget = config.max_requests
+
+    def take() -> bool:
+        nonlocal budget
+        if budget is not None:
+            if budget <= 0:
+                return False
+            budget -= 1
+        return time.perf_counter() < deadline
+
+    async def worker(user: VirtualUser) -> None:
+        while take():
+            scenario = user.rng.choices(scenarios, weights)[0]
+            await _timed(recorder, scenario, getattr(user, scenario))
+
+    recorder.started = time.perf_counter()
+    await asyncio.gather(*(worker(user) for user in users))
+    recorder.elapsed = time.perf_counter() - recorder.started
+    return recorder
+
+
+# --------------------------------------------------------------------------
+# Reporting and thresholds
+# --------------------------------------------------------------------------
+
+def summarize(recorder: Recorder) -> dict:
+    elapsed = recorder.elapsed or 1e-9
+    endpoints = {}
+    for scenario, samples in sorted(recorder.latencies.items()):
+        endpoints[scenario] = {
+            "requests": len(samples),
+            "errors": recorder.errors.get(scenario, 0),
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "max_ms": max(samples) * 1000,
+        }
+    return {
+        "elapsed_seconds": recorder.elapsed,
+        "requests": recorder.total,
+        "errors": sum(recorder.errors.values()),
+        "rps": recorder.total / elapsed,
+        "endpoints": endpoints,
+    }
+
+
+def render_report(summary: dict) -> str:
+    lines = [
+        f"{'scenario':<20}{'reqs':>8}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    ]
+    for name, s in summary["endpoints"].items():
+        lines.append(
+            f"{name:<20}{s['requests']:>8}{s['errors']:>8}{s['rps']:>10.1f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}"
+        )
+    lines.append(
+        f"{'total':<20}{summary['requests']:>8}{summary['errors']:>8}{summary['rps']:>10.1f}"
+        f"  in {summary['elapsed_seconds']:.1f}s"
+    )
+    return "\n".join(lines)
+
+
+def check_thresholds(summary: dict, thresholds: dict) -> list[str]:
+    """
+    Thresholds format::
+
+        {"min_rps": 50,
+         "default": {"p95_ms": 250, "p99_ms": 500, "error_rate": 0.01},
+         "endpoints": {"poll_logs": {"p95_ms": 400}}}
+    """
+    violations = []
+    if "min_rps" in thresholds and summary["rps"] < thresholds["min_rps"]:
+        violations.append(f"throughput {summary['rps']:.1f} rps < {thresholds['min_rps']}")
+    default = thresholds.get("default", {})
+    for name, stats in summary["endpoints"].items():
+        limits = {**default, **thresholds.get("endpoints", {}).get(name, {})}
+        for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+            if key in limits and stats[key] > limits[key]:
+                violations.append(f"{name}: {key} {stats[key]:.1f} > {limits[key]}")
+        if "error_rate" in limits and stats["requests"]:
+            rate = stats["errors"] / stats["requests"]
+            if rate > limits["error_rate"]:
+                violations.append(f"{name}: error rate {rate:.2%} > {limits['error_rate']:.2%}")
+    return violations
+
+
+def compare_baseline(summary: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Flag p95 latency growth or throughput loss beyond ``max_regression`` (0.2 = 20%)."""
+    violations = []
+    if baseline.get("rps") and summary["rps"] < baseline["rps"] * (1 - max_regression):
+        violations.append(f"throughput {summary['rps']:.1f} rps vs baseline {baseline['rps']:.1f}")
+    for name, stats in summary["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or not previous.get("p95_ms"):
+            continue
+        if stats["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            violations.append(f"{name}: p95 {stats['p95_ms']:.1f} ms vs baseline {previous['p95_ms']:.1f} ms")
+    return violations
+
+
+# --------------------------------------------------------------------------
+# CLI
+# --------------------------------------------------------------------------
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = dict(DEFAULT_MIX)
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+async def run(args: argparse.Namespace) -> dict:
+    seed_config = seed_config_from_args(args)
+    emails = [f"bench{i}@devflow.com" for i in range(seed_config.users)]
+    load_config = LoadConfig(
+        concurrency=args.concurrency,
+        duration=args.duration,
+        max_requests=args.requests,
+        mix=args.mix,
+    )
+
+    if args.base_url:
+        if not args.skip_seed:
+            engine = create_async_engine(args.database_url)
+            try:
+                await seed_database(engine, seed_config)
+            finally:
+                await engine.dispose()
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            recorder = await run_load(client, emails, BENCH_PASSWORD, load_config)
+        return summarize(recorder)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_async_engine(database_url)
+        try:
+            if not args.skip_seed:
+                await seed_database(engine, seed_config)
+            from app.core.http_cache import response_cache
+            response_cache.clear()
+            with InProcessApp(engine, FakeCore(args.core_latency)) as harness:
+                transport = InProcessTransport(harness.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                    recorder = await run_load(client, emails, BENCH_PASSWORD, load_config)
+                    await transport.aclose()
+                    await harness.drain()  # let launched pipelines finish
+        finally:
+            await engine.dispose()
+    return summarize(recorder)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="database to seed (default: temporary SQLite)")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="scenario weights, e.g. poll_logs=50,launch_execution=0")
+    parser.add_argument("--core-latency", type=float, default=0.2, help="fake Core run time (in-process)")
+    parser.add_argument("--thresholds", type=Path, help="JSON file with absolute limits")
+    parser.add_argument("--baseline", type=Path, help="previous --output file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed regression vs baseline")
+    parser.add_argument("--output", type=Path, help="write the summary as JSON")
+    add_seed_arguments(parser)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.base_url and not (args.database_url or args.skip_seed):
+        print("--base-url requires --database-url (to seed) or --skip-seed", file=sys.stderr)
+        return 2
+
+    summary = asyncio.run(run(args))
+    print(render_report(summary))
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    violations = []
+    if args.thresholds:
+        violations += check_thresholds(summary, json.loads(args.thresholds.read_text(encoding="utf-8")))
+    if args.baseline:
+        violations += compare_baseline(
+            summary, json.loads(args.baseline.read_text(encoding="utf-8")), args.max_regression
+        )
+    for violation in violations:
+        print(f"REGRESSION: {violation}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
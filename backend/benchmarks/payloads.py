@@ -0,0 +1,55 @@
+"""
+Realistic payload generators for benchmarks (review results and logs)
+"""
+import random
+from datetime import datetime, timedelta
+
+SEVERITIES = ["info", "low", "medium", "high", "critical"]
+CATEGORIES = ["security", "performance", "style", "bug", "maintainability"]
+
+
+def make_finding(rng: random.Random, index: int) -> dict:
+    module = f"src/{rng.choice(['api', 'core', 'services', 'models', 'utils'])}/module_{index % 400}.py"
+    line = rng.randint(1, 3000)
+    return {
+        "id": f"F{index:06d}",
+        "file": module,
+        "line": line,
+        "end_line": line + rng.randint(0, 12),
+        "severity": rng.choice(SEVERITIES),
+        "category": rng.choice(CATEGORIES),
+        "message": "Variável não utilizada e possível condição de corrida ao acessar o recurso compartilhado. " * rng.randint(1, 3),
+        "suggestion": "\n".join(
+            f"    resultado_{i} = await servico.processar(item_{i}, timeout={rng.randint(1, 30)})"
+            for i in range(rng.randint(2, 8))
+        ),
+        "confidence": round(rng.random(), 3),
+    }
+
+
+def make_resultado(findings: int = 2000, seed: int = 42) -> dict:
+    """Review result shaped like the Core output, roughly 350 bytes per finding."""
+    rng = random.Random(seed)
+    return {
+        "result": {
+            "summary": "Revisão concluída. " * 50,
+            "stats": {severity: rng.randint(0, findings) for severity in SEVERITIES},
+            "findings": [make_finding(rng, i) for i in range(findings)],
+            "diff": "".join(
+                f"--- a/src/file_{i}.py\n+++ b/src/file_{i}.py\n@@ -1,3 +1,3 @@\n-old\n+new\n"
+                for i in range(findings // 10)
+            ),
+        }
+    }
+
+
+def make_logs(lines: int = 5000, seed: int = 7) -> str:
+    """Execution log text in the ``[timestamp] message`` format of Execucao.append_log."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    return "".join(
+        f"[{(start + timedelta(milliseconds=i * 37)).isoformat()}] "
+        f"{rng.choice(['Analisando', 'Indexando', 'Gerando sugestão para', 'Validando'])} "
+        f"src/module_{rng.randint(0, 999)}.py ({i}/{lines})\n"
+        for i in range(lines)
+    )
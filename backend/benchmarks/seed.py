@@ -0,0 +1,153 @@
+"""
+Seed a database with a configurable synthetic dataset for benchmarks
+
+Usage (from backend/):
+    python -m benchmarks.seed --database-url sqlite+aiosqlite:///./bench.db \\
+        --users 20 --projects 10 --executions 50 --large-log-ratio 0.1
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401 - register tables
+from app.core.security import get_password_hash
+from app.database import Base
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.projeto import Projeto
+from app.models.usuario import Usuario
+from benchmarks.payloads import make_logs, make_resultado
+
+BENCH_PASSWORD = "benchmark123"
+FINISHED_STATUSES = [StatusExecucao.SUCCESS.value] * 8 + [StatusExecucao.FAILED.value] * 2
+
+
+@dataclass
+class SeedConfig:
+    users: int = 10
+    projects_per_user: int = 5
+    executions_per_project: int = 20
+    log_lines: int = 50
+    large_log_lines: int = 20000
+    large_log_ratio: float = 0.05
+    result_findings: int = 200
+    seed: int = 1234
+
+
+@dataclass
+class SeededData:
+    emails: list[str]
+    password: str
+    projects: int
+    executions: int
+
+
+async def seed_database(engine: AsyncEngine, config: SeedConfig, batch_size: int = 500) -> SeededData:
+    """Create tables (if needed) and bulk-insert users, projects and executions."""
+    rng = random.Random(config.seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Hashing is the expensive part of user creation; every bench user shares one
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    small_logs = make_logs(config.log_lines)
+    large_logs = make_logs(config.large_log_lines)
+    resultado = make_resultado(config.result_findings)
+    now = datetime.utcnow()
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    emails = [f"bench{i}@devflow.com" for i in range(config.users)]
+    async with session_factory() as db:
+        await db.execute(insert(Usuario), [
+            {"email": email, "nome": f"Bench {i}", "senha_hash": password_hash}
+            for i, email in enumerate(emails)
+        ])
+        user_ids = (await db.execute(
+            select(Usuario.id).where(Usuario.email.in_(emails))
+        )).scalars().all()
+
+        await db.execute(insert(Projeto), [
+            {
+                "usuario_id": user_id,
+                "nome": f"Projeto {user_id}-{p}",
+                "descricao": "Projeto gerado para benchmark",
+                "configuracao_pipeline": {"path": "."},
+            }
+            for user_id in user_ids
+            for p in range(config.projects_per_user)
+        ])
+        projects = (await db.execute(
+            select(Projeto.id, Projeto.usuario_id).where(Projeto.usuario_id.in_(user_ids))
+        )).all()
+
+        batch: list[dict] = []
+        total = 0
+        for projeto_id, usuario_id in projects:
+            for e in range(config.executions_per_project):
+                started = now - timedelta(minutes=rng.randint(1, 60 * 24 * 90))
+                batch.append({
+                    "projeto_id": projeto_id,
+                    "usuario_id": usuario_id,
+                    "status": rng.choice(FINISHED_STATUSES),
+                    "parametros_entrada": {"mode": "review", "target": "."},
+                    "logs": large_logs if rng.random() < config.large_log_ratio else small_logs,
+                    "resultado": resultado,
+                    "iniciado_em": started,
+                    "finalizado_em": started + timedelta(seconds=rng.randint(5, 900)),
+                })
+                if len(batch) >= batch_size:
+                    await db.execute(insert(Execucao), batch)
+                    total += len(batch)
+                    batch = []
+        if batch:
+            await db.execute(insert(Execucao), batch)
+            total += len(batch)
+        await db.commit()
+
+    return SeededData(emails=emails, password=BENCH_PASSWORD, projects=len(projects), executions=total)
+
+
+def add_seed_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = SeedConfig()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--projects", type=int, default=defaults.projects_per_user, help="projects per user")
+    parser.add_argument("--executions", type=int, default=defaults.executions_per_project, help="executions per project")
+    parser.add_argument("--log-lines", type=int, default=defaults.log_lines)
+    parser.add_argument("--large-log-lines", type=int, default=defaults.large_log_lines)
+    parser.add_argument("--large-log-ratio", type=float, default=defaults.large_log_ratio)
+    parser.add_argument("--result-findings", type=int, default=defaults.result_findings)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def seed_config_from_args(args: argparse.Namespace) -> SeedConfig:
+    return SeedConfig(
+        users=args.users,
+        projects_per_user=args.projects,
+        executions_per_project=args.executions,
+        log_lines=args.log_lines,
+        large_log_lines=args.large_log_lines,
+        large_log_ratio=args.large_log_ratio,
+        result_findings=args.result_findings,
+        seed=args.seed,
+    )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    try:
+        data = await seed_database(engine, seed_config_from_args(args))
+    finally:
+        await engine.dispose()
+    print(f"Seeded {len(data.emails)} users, {data.projects} projects, {data.executions} executions "
+          f"(password: {data.password})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    add_seed_arguments(parser)
+    asyncio.run(_main(parser.parse_args()))
@@ -4,7 +4,9 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app.config import get_settings
 from app.database import Base, get_db
+from app.core.http_cache import response_cache
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -18,6 +20,13 @@ def event_loop():
     yield loop
     loop.close()
 
+@pytest.fixture(autouse=True)
+def repository_root(tmp_path_factory, monkeypatch):
+    """Checkouts created under tmp_path are inside the repository root."""
+    root = tmp_path_factory.getbasetemp()
+    monkeypatch.setattr(get_settings(), "repository_root", str(root))
+    return root
+
 @pytest.fixture(scope="function")
 async def db_session():
     async with engine.begin() as conn:
@@ -31,10 +40,28 @@ async def db_session():
 
 @pytest.fixture(scope="function")
 async def client(db_session):
+    # Commits like get_db so after-commit hooks run. Requests share the test's
+    # session: commits are serialized and errors do not roll back (a rollback
+    # would expire the objects the test holds)
+    commit_lock = asyncio.Lock()
+
     async def override_get_db():
         yield db_session
+        async with commit_lock:
+            await db_session.commit()
     
     app.dependency_overrides[get_db] = override_get_db
+    response_cache.clear()
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+async def auth_headers(client):
+    await client.post("/auth/register", json={
+        "email": "teste@devflow.com", "nome": "Teste", "senha": "devflow123"
+    })
+    response = await client.post("/auth/login", data={
+        "username": "teste@devflow.com", "password": "devflow123"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
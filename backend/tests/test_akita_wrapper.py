@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from app.core.akita_wrapper import PipelineOrchestrator
+from app.core.core_pool import CorePool
+from app.core.log_sink import LogStream
 
 @pytest.fixture
 def orchestrator():
@@ -30,4 +32,94 @@ async def test_orchestrator_execute_mock(orchestrator):
         
         assert result["success"] is True
         assert result["data"]["result"] == "done"
+        assert result["timings"]["submit"] is not None
+        assert result["timings"]["first_log"] is not None
+        assert result["timings"]["core_run"] >= result["timings"]["first_log"]
         mock_post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_reattaches_from_checkpoint(orchestrator):
+    checkpoints = []
+    with patch("httpx.AsyncClient.post") as mock_post, \
+         patch("httpx.AsyncClient.get") as mock_get:
+        mock_get.side_effect = [
+            MagicMock(status_code=200, json=lambda: {"status": "running"}),  # reattach check
+            MagicMock(status_code=200, json=lambda: {"logs": ["l5", "l6"]}),
+            MagicMock(status_code=200, json=lambda: {"status": "succeeded", "result": "done"}),
+        ]
+
+        result = await orchestrator.execute(
+            {"mode": "review"},
+            resume={"execution_id": "core-1", "log_cursor": 5},
+            on_checkpoint=lambda execution_id, cursor: checkpoints.append((execution_id, cursor))
+        )
+
+    assert result["success"] is True
+    mock_post.assert_not_called()
+    assert mock_get.call_args_list[1].kwargs["params"] == {"last_index": 5}
+    assert checkpoints == [("core-1", 7)]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_without_endpoint_reattaches_to_default_replica():
+    orchestrator = PipelineOrchestrator(pool=CorePool(["http://core-a", "http://core-b"], health_interval=0))
+    orchestrator.pool.endpoints["http://core-a"].active = 5  # least loaded is core-b
+    with patch.object(orchestrator, "_get_client", wraps=orchestrator._get_client) as get_client, \
+         patch("httpx.AsyncClient.get") as mock_get:
+        mock_get.side_effect = [
+            MagicMock(status_code=200, json=lambda: {"status": "running"}),
+            MagicMock(status_code=200, json=lambda: {"logs": []}),
+            MagicMock(status_code=200, json=lambda: {"status": "succeeded", "result": "done"}),
+        ]
+        result = await orchestrator.execute({"mode": "review"}, resume={"execution_id": "core-1", "log_cursor": 5})
+
+    assert result["success"] is True
+    get_client.assert_called_once_with("http://core-a")
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_resubmits_when_core_lost_the_job(orchestrator):
+    checkpoints = []
+    with patch("httpx.AsyncClient.post") as mock_post, \
+         patch("httpx.AsyncClient.get") as mock_get:
+        mock_post.return_value = MagicMock(status_code=200)
+        mock_post.return_value.json.return_value = {"execution_id": "core-2"}
+        mock_get.side_effect = [
+            MagicMock(status_code=404),
+            MagicMock(status_code=200, json=lambda: {"logs": []}),
+            MagicMock(status_code=200, json=lambda: {"status": "succeeded", "result": "done"}),
+        ]
+
+        result = await orchestrator.execute(
+            {"mode": "review"},
+            resume={"execution_id": "core-1", "log_cursor": 5},
+            on_checkpoint=lambda execution_id, cursor: checkpoints.append((execution_id, cursor))
+        )
+
+    assert result["success"] is True
+    mock_post.assert_called_once()
+    assert checkpoints == [("core-2", 0)]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_publishes_batches_to_sink(orchestrator):
+    stream = LogStream()
+    events = stream.subscribe(maxsize=10)
+    with patch("httpx.AsyncClient.post") as mock_post, \
+         patch("httpx.AsyncClient.get") as mock_get:
+        mock_post.return_value = MagicMock(status_code=200)
+        mock_post.return_value.json.return_value = {"execution_id": "core-3"}
+        mock_get.side_effect = [
+            MagicMock(status_code=200, json=lambda: {"logs": [f"l{i}" for i in range(1000)]}),
+            MagicMock(status_code=200, json=lambda: {"status": "succeeded", "result": "done"}),
+        ]
+
+        result = await orchestrator.execute({"mode": "review"}, sink=stream)
+
+    assert result["success"] is True
+    batch = await events.get_batch()
+    core_logs = next(e for e in batch if e.kind == "log" and e.log_cursor == 1000)
+    assert len(core_logs.lines) == 1000
+    assert core_logs.execution_id == "core-3"
+    assert batch[-1].kind == "status" and batch[-1].status == "succeeded"
@@ -0,0 +1,67 @@
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.execucao import Execucao
+from benchmarks.load_test import (
+    FakeCore, InProcessApp, InProcessTransport, LoadConfig,
+    check_thresholds, compare_baseline, percentile, run_load, summarize
+)
+from benchmarks.seed import BENCH_PASSWORD, SeedConfig, seed_database
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+def test_thresholds_and_baseline():
+    summary = {
+        "rps": 40.0,
+        "endpoints": {
+            "poll_logs": {"requests": 100, "errors": 5, "p50_ms": 10, "p95_ms": 120, "p99_ms": 200, "max_ms": 250},
+        },
+    }
+    thresholds = {"min_rps": 50, "default": {"p95_ms": 100, "error_rate": 0.01}}
+    violations = check_thresholds(summary, thresholds)
+    assert len(violations) == 3
+
+    baseline = {"rps": 45.0, "endpoints": {"poll_logs": {"p95_ms": 90}}}
+    assert compare_baseline(summary, baseline, max_regression=0.5) == []
+    assert len(compare_baseline(summary, baseline, max_regression=0.2)) == 1
+
+
+@pytest.mark.asyncio
+async def test_seed_and_load_in_process(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bench.db'}")
+    try:
+        data = await seed_database(engine, SeedConfig(
+            users=2, projects_per_user=2, executions_per_project=3,
+            log_lines=5, large_log_lines=50, large_log_ratio=0.5, result_findings=3
+        ))
+        assert data.executions == 12
+
+        with InProcessApp(engine, FakeCore(latency=0.01, log_lines=2)) as harness:
+            transport = InProcessTransport(harness.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                recorder = await run_load(
+                    client, data.emails, BENCH_PASSWORD,
+                    LoadConfig(concurrency=2, duration=30, max_requests=30)
+                )
+                await transport.aclose()
+                await harness.drain()
+
+        summary = summarize(recorder)
+        assert summary["requests"] <= 30
+        assert summary["errors"] == 0
+        assert "list_projects" in summary["endpoints"]
+
+        async with engine.connect() as conn:
+            total = await conn.scalar(select(func.count()).select_from(Execucao))
+        assert total == 12 + summary["endpoints"].get("launch_execution", {}).get("requests", 0)
+    finally:
+        await engine.dispose()
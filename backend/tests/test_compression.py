@@ -0,0 +1,65 @@
+import json
+import pytest
+from datetime import datetime
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+from app.core.responses import dumps_default, dumps_fast
+from app.schemas.execucao import ExecucaoResponse
+
+
+def test_negotiate_encoding_honours_q_values():
+    assert negotiate_encoding("gzip, deflate", brotli_available=True) == "gzip"
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert negotiate_encoding("br, gzip", brotli_available=True) == "br"
+    assert negotiate_encoding("br, gzip", brotli_available=False) == "gzip"
+    assert negotiate_encoding("identity", brotli_available=True) is None
+    assert negotiate_encoding("gzip;q=0", brotli_available=False) is None
+
+
+def test_fast_serializer_matches_default():
+    now = datetime(2026, 1, 1, 12, 30)
+    execucao = ExecucaoResponse(
+        id=1, projeto_id=2, usuario_id=3, status="success",
+        parametros_entrada={"mode": "review"}, resultado={"result": {"ok": "ção"}},
+        iniciado_em=now, finalizado_em=None
+    )
+    assert json.loads(dumps_fast(execucao)) == json.loads(dumps_default(execucao))
+    assert json.loads(dumps_fast([execucao])) == json.loads(dumps_default([execucao]))
+
+
+def _app():
+    async def large(request):
+        return JSONResponse({"data": "x" * 5000})
+
+    async def small(request):
+        return JSONResponse({"data": "x"})
+
+    async def stream(request):
+        async def chunks():
+            for _ in range(3):
+                yield b"y" * 2000
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app = Starlette(routes=[Route("/large", large), Route("/small", small), Route("/stream", stream)])
+    return CompressionMiddleware(app, minimum_size=1024)
+
+
+@pytest.mark.asyncio
+async def test_compression_middleware():
+    async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test") as ac:
+        large = await ac.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert large.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in large.headers["vary"]
+        assert int(large.headers["content-length"]) < 5000
+        assert large.json()["data"] == "x" * 5000
+
+        small = await ac.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+        stream = await ac.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in stream.headers
+        assert stream.content == b"y" * 6000
@@ -0,0 +1,71 @@
+import httpx
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.akita_wrapper import PipelineOrchestrator
+from app.core.core_pool import CorePool
+from app.core.log_sink import LogStream
+
+URLS = ["http://core-a", "http://core-b"]
+
+
+@pytest.mark.asyncio
+async def test_routes_to_least_loaded_healthy_endpoint():
+    pool = CorePool(URLS, health_interval=0)
+    async with pool.lease() as first:
+        async with pool.lease() as second:
+            assert {first.url, second.url} == set(URLS)
+        assert pool.choose().url == second.url  # first is still busy
+
+    pool.mark_failure(pool.endpoints["http://core-b"])
+    pool.mark_failure(pool.endpoints["http://core-b"])
+    assert not pool.endpoints["http://core-b"].healthy
+    assert {pool.choose().url for _ in range(4)} == {"http://core-a"}
+
+    pool.mark_failure(pool.endpoints["http://core-a"], conclusive=True)
+    assert pool.choose().url in URLS  # all down: still try, don't fail outright
+
+
+@pytest.mark.asyncio
+async def test_health_checks_remove_and_restore_endpoints():
+    pool = CorePool(URLS, health_interval=0)
+    down = {"http://core-b"}
+
+    async def fake_get(client, url, **kwargs):
+        if str(client.base_url).rstrip("/") in down:
+            raise httpx.ConnectError("refused")
+        return MagicMock(status_code=200)
+
+    with patch("httpx.AsyncClient.get", autospec=True, side_effect=fake_get):
+        await pool.check_all()
+        assert [e.url for e in pool.endpoints.values() if e.healthy] == ["http://core-a"]
+        down.clear()
+        await pool.check_all()
+    assert all(e.healthy for e in pool.endpoints.values())
+
+
+@pytest.mark.asyncio
+async def test_execution_stays_on_its_core():
+    orchestrator = PipelineOrchestrator(pool=CorePool(URLS, health_interval=0))
+    stream = LogStream()
+    feed = stream.subscribe(64)
+    used = []
+
+    async def fake_get(client, url, **kwargs):
+        used.append(str(client.base_url).rstrip("/"))
+        if url.startswith("/v1/logs"):
+            return MagicMock(status_code=200, json=lambda: {"logs": ["l1"]})
+        return MagicMock(status_code=200, json=lambda: {"status": "succeeded", "result": "ok"})
+
+    with patch("httpx.AsyncClient.get", autospec=True, side_effect=fake_get):
+        result = await orchestrator.execute(
+            {"mode": "review"}, resume={"execution_id": "core-1", "log_cursor": 0, "endpoint": "http://core-b"},
+            sink=stream
+        )
+    stream.close()
+
+    assert result["success"] is True
+    assert set(used) == {"http://core-b"}
+    checkpoints = [event async for event in feed if event.log_cursor is not None]
+    assert checkpoints[-1].endpoint == "http://core-b"
+    assert all(e.active == 0 for e in orchestrator.pool.endpoints.values())
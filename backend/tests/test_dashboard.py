@@ -0,0 +1,57 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.usuario import Usuario
+from app.services.dashboard_service import DashboardService
+
+
+@pytest.mark.asyncio
+async def test_dashboard_uses_fixed_bounded_queries(client, auth_headers, db_session):
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    projeto_ids = []
+    for nome in ("A", "B"):
+        response = await client.post("/projetos/", json={"nome": nome}, headers=auth_headers)
+        projeto_ids.append(response.json()["id"])
+    inicio = datetime.utcnow() - timedelta(hours=1)
+    for projeto_id in projeto_ids:
+        db_session.add_all(
+            Execucao(
+                projeto_id=projeto_id, usuario_id=user.id, status=StatusExecucao.SUCCESS.value,
+                iniciado_em=inicio + timedelta(minutes=i), logs="x" * 1000
+            )
+            for i in range(20)
+        )
+    db_session.add_all([
+        Execucao(projeto_id=projeto_ids[0], usuario_id=user.id, status=StatusExecucao.RUNNING.value),
+        Execucao(projeto_id=projeto_ids[0], usuario_id=user.id, status=StatusExecucao.PENDING.value),
+        Execucao(
+            projeto_id=projeto_ids[1], usuario_id=user.id, status=StatusExecucao.FAILED.value,
+            finalizado_em=datetime.utcnow()
+        ),
+    ])
+    await db_session.commit()
+
+    statements = []
+    engine = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        summary = await DashboardService.summary(db_session, user.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 4
+    assert all("logs" not in statement for statement in statements)
+    por_projeto = {p["id"]: p for p in summary["projetos"]}
+    assert [len(por_projeto[i]["ultimas_execucoes"]) for i in projeto_ids] == [5, 5]
+    assert (por_projeto[projeto_ids[0]]["executando"], por_projeto[projeto_ids[0]]["na_fila"]) == (1, 1)
+    assert [e["projeto_id"] for e in summary["falhas_recentes"]] == [projeto_ids[1]]
+
+    response = await client.get("/dashboard/", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["executando"], body["na_fila"]) == (1, 1)
+    ultimas = body["projetos"][0]["ultimas_execucoes"]
+    assert set(ultimas[0]) == {"id", "projeto_id", "status", "prioridade", "iniciado_em", "finalizado_em"}
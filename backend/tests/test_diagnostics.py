@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import patch
+
+from app.core import security
+from app.core.diagnostics import MemoryTracker
+
+
+def test_memory_tracker_diff_reports_growth():
+    tracker = MemoryTracker(max_snapshots=2)
+    leak = None
+    tracker.start()
+    try:
+        first = tracker.take_snapshot()
+        leak = [bytearray(1024) for _ in range(200)]
+        second = tracker.take_snapshot()
+        diff = tracker.diff(second["id"], first["id"])
+        assert diff and diff[0]["diferenca_tamanho"] > 0
+
+        tracker.take_snapshot()
+        assert [s["id"] for s in tracker.list_snapshots()] == [second["id"], second["id"] + 1]
+        with pytest.raises(KeyError):
+            tracker.diff(second["id"], first["id"])
+    finally:
+        tracker.stop()
+        del leak
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_process_with_admin_token(client):
+    with patch.object(security.settings, "admin_token", "segredo"):
+        forbidden = await client.get("/diagnostics/processo", headers={"X-Admin-Token": "errado"})
+        response = await client.get("/diagnostics/processo", headers={"X-Admin-Token": "segredo"})
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    data = response.json()
+    assert data["tarefas"]["total"] >= 1
+    assert "pool" in data["banco"]
+    assert "conexoes" in data["http"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_diff_endpoints(client):
+    headers = {"X-Admin-Token": "segredo"}
+    with patch.object(security.settings, "admin_token", "segredo"):
+        await client.post("/diagnostics/memoria/iniciar", headers=headers)
+        try:
+            first = (await client.post("/diagnostics/memoria/snapshots", headers=headers)).json()
+            second = (await client.post("/diagnostics/memoria/snapshots", headers=headers)).json()
+            response = await client.get(
+                f"/diagnostics/memoria/snapshots/{second['id']}/diff",
+                params={"base": first["id"], "limite": 5}, headers=headers
+            )
+        finally:
+            await client.post("/diagnostics/memoria/parar", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) <= 5
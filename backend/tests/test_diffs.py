@@ -0,0 +1,170 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import update
+
+from app.config import get_settings
+from app.core.diffs import DiffStreamParser, PatchConflict, dry_run
+from app.models.projeto import Projeto
+from app.services import diff_service
+
+MULTI_FILE_DIFF = """diff --git a/src/a.py b/src/a.py
+index 1111111..2222222 100644
+--- a/src/a.py
++++ b/src/a.py
+@@ -1,3 +1,3 @@
+ import os
+-a = 1
++a = 2
+ print(a)
+diff --git a/src/b.py b/src/b.py
+--- a/src/b.py
++++ b/src/b.py
+@@ -1,2 +1,2 @@
+-b = 1
++b = 2
+ --- not a header
+--- /dev/null
++++ b/src/new.py
+@@ -0,0 +1,1 @@
++novo = True
+"""
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import os\na = 1\nprint(a)\n")
+    (tmp_path / "src" / "b.py").write_text("b = 1\n--- not a header\n")
+    return tmp_path
+
+
+@pytest.fixture
+async def projeto_id(client, auth_headers, db_session, repo):
+    # Set the path directly: creating with it would queue an index warm-up
+    response = await client.post("/projetos/", json={"nome": "Diffs"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    await db_session.execute(
+        update(Projeto).where(Projeto.id == projeto_id).values(caminho_repositorio=str(repo))
+    )
+    await db_session.commit()
+    return projeto_id
+
+
+class FakeCore:
+    def __init__(self, reject=()):
+        self.applied = []
+        self.reject = set(reject)
+
+    async def apply_diff(self, diff, base_path="."):
+        path = diff.split("+++ ", 1)[1].split("\n", 1)[0].removeprefix("b/")
+        self.applied.append(path)
+        return path not in self.reject
+
+
+def test_parser_splits_files_and_keeps_hunk_lines():
+    parser = DiffStreamParser()
+    patches = []
+    for line in MULTI_FILE_DIFF.splitlines(keepends=True):
+        patches.extend(parser.feed(line))
+    patches.extend(parser.close())
+
+    assert [p.path for p in patches] == ["src/a.py", "src/b.py", "src/new.py"]
+    assert patches[0].text.startswith("diff --git a/src/a.py")
+    assert patches[1].hunks[0].before == ["b = 1", "--- not a header"]
+    assert patches[2].creates
+
+
+RENAME_DIFF = """diff --git a/src/old.py b/src/renamed.py
+similarity index 100%
+rename from src/old.py
+rename to src/renamed.py
+diff --git a/docs/logo.png b/docs/logo.png
+index 3333333..4444444 100644
+Binary files a/docs/logo.png and b/docs/logo.png differ
+"""
+
+
+def test_parser_reports_sections_without_file_headers():
+    parser = DiffStreamParser()
+    patches = []
+    for line in (RENAME_DIFF + MULTI_FILE_DIFF + RENAME_DIFF).splitlines(keepends=True):
+        patches.extend(parser.feed(line))
+    patches.extend(parser.close())
+
+    assert [(p.path, p.unsupported) for p in patches] == [
+        ("src/renamed.py", True), ("docs/logo.png", True),
+        ("src/a.py", False), ("src/b.py", False), ("src/new.py", False),
+        ("src/renamed.py", True), ("docs/logo.png", True),
+    ]
+    assert patches[0].old_path == "src/old.py"
+    assert patches[0].text.startswith("diff --git a/src/old.py b/src/renamed.py\nsimilarity")
+
+
+def test_dry_run_follows_drift_and_rejects_mismatch(repo):
+    (repo / "src" / "a.py").write_text("# header\n\nimport os\na = 1\nprint(a)\n")
+    parser = DiffStreamParser()
+    patches = [p for line in MULTI_FILE_DIFF.splitlines(keepends=True) for p in parser.feed(line)]
+    assert dry_run(str(repo), patches[:1]) == 1
+
+    (repo / "src" / "a.py").write_text("import os\na = 5\nprint(a)\n")
+    with pytest.raises(PatchConflict):
+        dry_run(str(repo), patches[:1])
+
+
+@pytest.mark.asyncio
+async def test_upload_reports_per_file_results(client, auth_headers, projeto_id, repo):
+    (repo / "src" / "a.py").write_text("import os\na = 99\nprint(a)\n")  # conflicts now
+
+    async def chunks():
+        data = MULTI_FILE_DIFF.encode()
+        for start in range(0, len(data), 7):  # boundaries fall mid-line
+            yield data[start:start + 7]
+
+    core = FakeCore(reject={"src/new.py"})
+    with patch.object(diff_service, "get_orchestrator", lambda: core):
+        response = await client.post(
+            f"/projetos/{projeto_id}/diffs", content=chunks(), headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    results = {r["arquivo"]: r["status"] for r in body["arquivos"]}
+    assert results == {"src/a.py": "conflict", "src/b.py": "applied", "src/new.py": "failed"}
+    assert (body["aplicados"], body["conflitos"], body["falhas"]) == (1, 1, 1)
+    assert sorted(core.applied) == ["src/b.py", "src/new.py"]  # the conflict never reached the Core
+
+
+@pytest.mark.asyncio
+async def test_dry_run_and_invalid_upload(client, auth_headers, projeto_id):
+
+    core = FakeCore()
+    with patch.object(diff_service, "get_orchestrator", lambda: core):
+        response = await client.post(
+            f"/projetos/{projeto_id}/diffs?dry_run=true", content=MULTI_FILE_DIFF, headers=auth_headers
+        )
+        assert {r["status"] for r in response.json()["arquivos"]} == {"valid"}
+        assert core.applied == []
+
+        response = await client.post(
+            f"/projetos/{projeto_id}/diffs", content=RENAME_DIFF + MULTI_FILE_DIFF, headers=auth_headers
+        )
+        results = {r["arquivo"]: r["status"] for r in response.json()["arquivos"]}
+        assert results == {
+            "src/renamed.py": "failed", "docs/logo.png": "failed",
+            "src/a.py": "applied", "src/b.py": "applied", "src/new.py": "applied",
+        }
+        assert "src/renamed.py" not in core.applied
+
+        truncated = MULTI_FILE_DIFF.split("+a = 2")[0]
+        response = await client.post(f"/projetos/{projeto_id}/diffs", content=truncated, headers=auth_headers)
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_checkout_outside_repository_root_is_refused(client, auth_headers, projeto_id, tmp_path):
+    core = FakeCore()
+    with patch.object(diff_service, "get_orchestrator", lambda: core), \
+         patch.object(get_settings(), "repository_root", str(tmp_path / "outra-raiz")):
+        response = await client.post(f"/projetos/{projeto_id}/diffs", content=MULTI_FILE_DIFF, headers=auth_headers)
+    assert response.status_code == 400
+    assert core.applied == []
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import select
+
+from app.core.duration_model import DurationModel, duration_model
+from app.core.http_cache import response_cache
+from app.models.arquivo_indexado import ArquivoIndexado
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.usuario import Usuario
+from app.services.execucao_service import ExecucaoService
+
+
+@pytest.fixture(autouse=True)
+def clear_duration_model():
+    duration_model.clear()
+    yield
+    duration_model.clear()
+
+
+def test_estimates_fall_back_to_coarser_keys():
+    model = DurationModel(alpha=0.2, min_samples=3, default_seconds=120.0)
+    assert model.estimate(1, "review", 10).p50 == 120.0
+
+    for seconds in (50, 60, 70, 60, 55, 65, 60):
+        model.observe(1, "review", 10, seconds)
+    estimate = model.estimate(1, "review", 12)  # same size bucket
+    assert estimate.amostras == 7
+    assert 50 <= estimate.p50 <= 70
+    assert estimate.p90 >= estimate.p50
+
+    # Unknown project: per-mode statistics
+    assert model.estimate(2, "review", 10).amostras == 7
+    # Bigger target of a known project: project-level statistics
+    assert model.estimate(1, "review", 5000).amostras == 7
+    # Too few samples for the mode: all runs
+    model.observe(3, "fix", None, 400)
+    assert model.estimate(3, "fix", None).amostras == 8
+
+
+def test_quantiles_track_a_shifted_distribution():
+    model = DurationModel(alpha=0.2, min_samples=1)
+    for _ in range(30):
+        model.observe(1, "review", None, 30)
+    for _ in range(60):
+        model.observe(1, "review", None, 300)
+    assert model.estimate(1, "review", None).p50 > 200
+
+
+@pytest.mark.asyncio
+async def test_running_execution_gets_an_eta(client, auth_headers, db_session):
+    response = await client.post("/projetos/", json={"nome": "ETA"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    db_session.add_all(
+        ArquivoIndexado(projeto_id=projeto_id, caminho=caminho, tamanho=1, modificado_ns=0, hash="0" * 64)
+        for caminho in ("src/a.py", "src/b.py", "docs/c.md")
+    )
+    now = datetime.utcnow()
+    db_session.add_all(
+        Execucao(
+            projeto_id=projeto_id, usuario_id=user.id, status=StatusExecucao.SUCCESS.value,
+            iniciado_em=now - timedelta(hours=1), finalizado_em=now - timedelta(hours=1) + timedelta(seconds=100),
+            espera_fila_segundos=10.0, parametros_entrada={"mode": "review"}
+        )
+        for _ in range(3)
+    )
+    running = Execucao(
+        projeto_id=projeto_id, usuario_id=user.id, status=StatusExecucao.RUNNING.value,
+        iniciado_em=now - timedelta(seconds=30), espera_fila_segundos=0.0, parametros_entrada={"mode": "review"}
+    )
+    db_session.add(running)
+    await db_session.commit()
+
+    assert await ExecucaoService.target_size(db_session, projeto_id, "./src/") == 2
+    assert await ExecucaoService.target_size(db_session, projeto_id, ".") == 3
+    assert await ExecucaoService.warm_duration_model(db_session) == 3
+    # Rebuilt, not added to: reloading the same history keeps three samples
+    assert await ExecucaoService.warm_duration_model(db_session) == 3
+    assert duration_model.estimate(projeto_id, "review", None).amostras == 3
+
+    response = await client.get(f"/execucoes/{running.id}", headers=auth_headers)
+    body = response.json()
+    assert body["duracao_estimada_segundos"] == pytest.approx(90.0)
+    eta = datetime.fromisoformat(body["conclusao_estimada_em"])
+    assert eta == pytest.approx(running.iniciado_em + timedelta(seconds=90), abs=timedelta(seconds=1))
+    assert body["espera_estimada_segundos"] is None
+    assert "tamanho_alvo" not in body
+
+
+@pytest.mark.asyncio
+async def test_running_execution_etag_follows_estimates(client, auth_headers, db_session):
+    response = await client.post("/projetos/", json={"nome": "ETag"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    running = Execucao(
+        projeto_id=projeto_id, usuario_id=user.id, status=StatusExecucao.RUNNING.value,
+        iniciado_em=datetime.utcnow(), parametros_entrada={"mode": "review"}
+    )
+    db_session.add(running)
+    await db_session.commit()
+
+    first = await client.get(f"/execucoes/{running.id}", headers=auth_headers)
+    assert "last-modified" not in first.headers
+    assert len(response_cache) == 0  # running rows are never stored
+    headers = {**auth_headers, "If-None-Match": first.headers["etag"]}
+    assert (await client.get(f"/execucoes/{running.id}", headers=headers)).status_code == 304
+
+    duration_model.observe(projeto_id, "review", None, 600.0)
+    response = await client.get(f"/execucoes/{running.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["duracao_estimada_segundos"] == pytest.approx(600.0)
+
+
+@pytest.mark.asyncio
+async def test_pending_execution_revalidates_while_the_wait_ticks_down(client, auth_headers, db_session):
+    response = await client.post("/projetos/", json={"nome": "Fila"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    pending = Execucao(
+        projeto_id=projeto_id, usuario_id=user.id, status=StatusExecucao.PENDING.value,
+        iniciado_em=datetime.utcnow(), parametros_entrada={"mode": "review"}
+    )
+    db_session.add(pending)
+    await db_session.commit()
+
+    with patch("app.services.execucao_service.scheduler") as local:
+        local.position.return_value = 2
+        local.estimate_wait.side_effect = [30.0, 27.5, 25.0]
+        first = await client.get(f"/execucoes/{pending.id}", headers=auth_headers)
+        headers = {**auth_headers, "If-None-Match": first.headers["etag"]}
+        assert (await client.get(f"/execucoes/{pending.id}", headers=headers)).status_code == 304
+
+        # Moving up the queue is a new representation
+        local.position.return_value = 1
+        response = await client.get(f"/execucoes/{pending.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["posicao_fila"] == 1
+
+
+@pytest.mark.asyncio
+async def test_model_is_refreshed_periodically():
+    model = DurationModel()
+    refreshed = asyncio.Event()
+
+    async def refresh():
+        model.load([(1, "review", None, 42.0)])
+        refreshed.set()
+
+    model.start(refresh, 0.01)
+    await asyncio.wait_for(refreshed.wait(), 1)
+    await model.stop()
+    assert model.estimate(1, "review", None).p50 == 42.0
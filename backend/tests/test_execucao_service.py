@@ -0,0 +1,349 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.usuario import Usuario
+from app.models.projeto import Projeto
+from app.models.execucao import Execucao, StatusExecucao
+from app.services import execucao_service
+from app.services.execucao_service import ExecucaoService, run_pipeline_task
+from app.tasks.scheduler import ExecutionScheduler, ScheduledJob
+from app.core.log_sink import LogEvent, LogStream
+from app.database import Base
+from tests.conftest import TestingSessionLocal
+
+
+class FakeOrchestrator:
+    async def execute(self, config, sink=None, **kwargs):
+        for i in range(5):
+            await sink.publish(LogEvent.log([f"linha {i}"]))
+            await asyncio.sleep(0)
+        return {
+            "success": True,
+            "data": {"result": "ok"},
+            "elapsed_seconds": 0.1,
+            "timings": {"submit": 0.01, "first_log": 0.02, "core_run": 0.05},
+        }
+
+
+@pytest.fixture
+async def execucao(db_session):
+    user = Usuario(email="svc@devflow.com", nome="Svc", senha_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    projeto = Projeto(usuario_id=user.id, nome="Proj")
+    db_session.add(projeto)
+    await db_session.flush()
+    execucao = Execucao(projeto_id=projeto.id, usuario_id=user.id, parametros_entrada={})
+    db_session.add(execucao)
+    await db_session.commit()
+    return execucao
+
+
+@pytest.fixture
+async def isolated_db(tmp_path):
+    """
+    File-backed database for tests where the pipeline task and the test use
+    the database concurrently; the shared in-memory connection cannot be used
+    from two sessions at once.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'execucoes.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        user = Usuario(email="svc@devflow.com", nome="Svc", senha_hash="x")
+        db.add(user)
+        await db.flush()
+        projeto = Projeto(usuario_id=user.id, nome="Proj")
+        db.add(projeto)
+        await db.flush()
+        execucao = Execucao(projeto_id=projeto.id, usuario_id=user.id, parametros_entrada={})
+        db.add(execucao)
+        await db.commit()
+    yield factory, execucao
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_task_records_timing_breakdown(db_session, execucao):
+    with patch.object(execucao_service, "async_session", TestingSessionLocal), \
+         patch.object(execucao_service, "get_orchestrator", FakeOrchestrator):
+        await run_pipeline_task(execucao.id, {"mode": "review"})
+
+    await db_session.refresh(execucao)
+    assert execucao.status == StatusExecucao.SUCCESS.value
+    assert "linha 4" in execucao.logs
+    assert execucao.espera_fila_segundos >= 0
+    assert execucao.latencia_submissao_segundos == 0.01
+    assert execucao.tempo_primeiro_log_segundos == 0.02
+    assert execucao.tempo_core_segundos == 0.05
+    assert execucao.tempo_persistencia_logs_segundos >= 0
+    assert execucao.tempo_finalizacao_segundos >= 0
+
+    summary = await ExecucaoService.timing_summary(db_session, execucao.projeto_id, execucao.usuario_id)
+    assert summary.total_execucoes == 1
+    assert summary.tempo_core.media == pytest.approx(0.05)
+
+
+class MixedEventsOrchestrator:
+    """Interleaves log batches and status changes, faster than the DB writer commits."""
+
+    async def execute(self, config, sink=None, **kwargs):
+        for i in range(20):
+            await sink.publish(LogEvent.log([f"linha {i}"], "core-1", i + 1))
+            await sink.publish(LogEvent.state("running"))
+        return {"success": True, "data": {}, "timings": {}}
+
+
+@pytest.mark.asyncio
+async def test_db_writer_keeps_every_line_under_coalesce(db_session, execucao):
+    with patch.object(execucao_service, "async_session", TestingSessionLocal), \
+         patch.object(execucao_service, "get_orchestrator", MixedEventsOrchestrator), \
+         patch.object(execucao_service.settings, "log_queue_size", 2), \
+         patch.object(execucao_service.settings, "log_overflow_policy", "coalesce"):
+        await run_pipeline_task(execucao.id, {"mode": "review"})
+
+    await db_session.refresh(execucao)
+    assert execucao.status == StatusExecucao.SUCCESS.value
+    for i in range(20):
+        assert f"linha {i}" in execucao.logs
+    assert execucao.core_log_cursor == 20
+
+
+class CheckpointingOrchestrator:
+    """Reports a Core job id and cursor, then blocks until cancelled or released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = []
+        self.resume = None
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def execute(self, config, resume=None, sink=None, **kwargs):
+        self.calls += 1
+        self.resume = resume
+        cursor = resume["log_cursor"] if resume else 0
+        await sink.publish(LogEvent.log([], "core-42", cursor, "http://core-b"))
+        await sink.publish(
+            LogEvent.log([f"log {cursor + i}" for i in range(3)], "core-42", cursor + 3, "http://core-b")
+        )
+        self.started.set()
+        await self.release.wait()
+        await sink.publish(LogEvent.state("succeeded"))
+        return {"success": True, "data": {"result": "ok"}, "timings": {}}
+
+    async def cancel(self, execution_id, endpoint=None):
+        self.cancelled.append((execution_id, endpoint))
+        return True
+
+
+async def load(factory, execucao_id):
+    async with factory() as db:
+        return await db.get(Execucao, execucao_id)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_keeps_checkpoint_and_reattaches(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = CheckpointingOrchestrator()
+    with patch.object(execucao_service, "async_session", factory), \
+         patch.object(execucao_service, "get_orchestrator", lambda: orchestrator):
+        task = asyncio.create_task(run_pipeline_task(execucao.id, {"mode": "review"}))
+        await orchestrator.started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        row = await load(factory, execucao.id)
+        assert row.status == StatusExecucao.RUNNING.value
+        assert row.core_execution_id == "core-42"
+        assert row.core_log_cursor == 3
+        assert "log 2" in row.logs
+
+        # A fresh start is refused for a running row; reattach resumes the cursor
+        await run_pipeline_task(execucao.id, {"mode": "review"})
+        assert orchestrator.calls == 1
+        orchestrator.release.set()
+        await run_pipeline_task(execucao.id, {"mode": "review"}, reattach=True)
+
+    assert orchestrator.resume == {"execution_id": "core-42", "log_cursor": 3, "endpoint": "http://core-b"}
+    row = await load(factory, execucao.id)
+    assert row.status == StatusExecucao.SUCCESS.value
+    assert row.core_log_cursor == 6
+    assert "log 5" in row.logs
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_running_task_and_aborts_core_job(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = CheckpointingOrchestrator()
+    local_scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=0, max_per_project=0)
+    with patch.object(execucao_service, "async_session", factory), \
+         patch.object(execucao_service, "get_orchestrator", lambda: orchestrator), \
+         patch.object(execucao_service, "scheduler", local_scheduler):
+        local_scheduler.submit(ScheduledJob(
+            execucao_id=execucao.id, usuario_id=execucao.usuario_id,
+            projeto_id=execucao.projeto_id, config={"mode": "review"}
+        ))
+        await orchestrator.started.wait()
+        _, task = local_scheduler._running[execucao.id]
+
+        async with factory() as db:
+            await ExecucaoService.cancel(db, execucao.id, execucao.usuario_id)
+        assert local_scheduler.running == 0  # slot freed before cleanup finishes
+        await task
+
+    assert orchestrator.cancelled == [("core-42", "http://core-b")]
+    row = await load(factory, execucao.id)
+    assert row.status == StatusExecucao.CANCELLED.value
+    assert "cancelada pelo usuário" in row.logs
+    assert "abortada no Core" in row.logs
+
+
+@pytest.mark.asyncio
+async def test_result_does_not_overwrite_a_cancel(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = CheckpointingOrchestrator()
+    with patch.object(execucao_service, "async_session", factory), \
+         patch.object(execucao_service, "get_orchestrator", lambda: orchestrator):
+        # Cancelled elsewhere (another process): this task is not stopped and finishes
+        task = asyncio.create_task(run_pipeline_task(execucao.id, {"mode": "review"}))
+        await orchestrator.started.wait()
+        async with factory() as db:
+            await ExecucaoService.cancel(db, execucao.id, execucao.usuario_id)
+        orchestrator.release.set()
+        await task
+
+        async with factory() as db:
+            with pytest.raises(HTTPException):
+                await ExecucaoService.cancel(db, execucao.id, execucao.usuario_id)
+
+    row = await load(factory, execucao.id)
+    assert row.status == StatusExecucao.CANCELLED.value
+    assert row.resultado is None
+    assert "concluído" not in row.logs
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_stops_runs_cancelled_by_another_process(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = CheckpointingOrchestrator()
+    local_scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=0, max_per_project=0)
+    with patch.object(execucao_service, "async_session", factory), \
+         patch.object(execucao_service, "get_orchestrator", lambda: orchestrator), \
+         patch.object(execucao_service, "scheduler", local_scheduler):
+        local_scheduler.submit(ScheduledJob(
+            execucao_id=execucao.id, usuario_id=execucao.usuario_id,
+            projeto_id=execucao.projeto_id, config={"mode": "review"}
+        ))
+        await orchestrator.started.wait()
+        _, task = local_scheduler._running[execucao.id]
+
+        # Served by another API process: only the row changes
+        async with factory() as db:
+            row = await db.get(Execucao, execucao.id)
+            row.status = StatusExecucao.CANCELLED.value
+            await db.commit()
+        async with factory() as db:
+            assert await ExecucaoService.stop_cancelled(db) == 1
+        await task
+
+    assert orchestrator.cancelled == [("core-42", "http://core-b")]
+    assert local_scheduler.owned() == []
+
+
+@pytest.mark.asyncio
+async def test_cancel_aborts_a_core_job_whose_checkpoint_was_not_written(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = CheckpointingOrchestrator()
+    stream = LogStream()
+    feed = stream.subscribe(name="db")
+    await stream.publish(LogEvent.log(["log 0"], "core-7", 1, "http://core-c"))
+
+    async def wait_flush(discard: bool = False):
+        feed.close(discard=discard)  # the writer never got to the checkpoint
+
+    with patch.object(execucao_service, "get_orchestrator", lambda: orchestrator):
+        async with factory() as db:
+            row = await db.get(Execucao, execucao.id)
+            row.status = StatusExecucao.CANCELLED.value
+            await db.commit()
+            await execucao_service._abort_core_job(db, row, wait_flush, stream.checkpoint)
+
+    assert len(feed) == 0
+    assert orchestrator.cancelled == [("core-7", "http://core-c")]
+    row = await load(factory, execucao.id)
+    assert "Execução core-7 abortada no Core" in row.logs
+
+
+class LateLogOrchestrator(CheckpointingOrchestrator):
+    """Publishes one more batch once ``more`` is set, as a job still running after a cancel does."""
+
+    def __init__(self):
+        super().__init__()
+        self.more = asyncio.Event()
+
+    async def execute(self, config, resume=None, sink=None, **kwargs):
+        await sink.publish(LogEvent.log(["log 0"], "core-42", 1, "http://core-b"))
+        self.started.set()
+        await self.more.wait()
+        await sink.publish(LogEvent.log(["log 1"], "core-42", 2, "http://core-b"))
+        await self.release.wait()
+        return {"success": True, "data": {"result": "ok"}, "timings": {}}
+
+
+@pytest.mark.asyncio
+async def test_cancel_log_line_survives_late_log_writes(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = LateLogOrchestrator()
+    with patch.object(execucao_service, "async_session", factory), \
+         patch.object(execucao_service, "get_orchestrator", lambda: orchestrator):
+        # Not run by this process's scheduler: the task is only stopped later (worker mode)
+        task = asyncio.create_task(run_pipeline_task(execucao.id, {"mode": "review"}))
+        await orchestrator.started.wait()
+        async with factory() as db:
+            await ExecucaoService.cancel(db, execucao.id, execucao.usuario_id)
+
+        orchestrator.more.set()
+        for _ in range(100):
+            row = await load(factory, execucao.id)
+            if "log 1" in row.logs:
+                break
+            await asyncio.sleep(0.01)
+        # The writer committed its own copy of the logs over the cancel line
+        assert "cancelada pelo usuário" not in row.logs
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert orchestrator.cancelled == [("core-42", "http://core-b")]
+    row = await load(factory, execucao.id)
+    assert row.status == StatusExecucao.CANCELLED.value
+    assert "log 1" in row.logs
+    assert row.logs.count("cancelada pelo usuário") == 1
+
+
+@pytest.mark.asyncio
+async def test_live_viewer_follows_running_execution(isolated_db):
+    factory, execucao = isolated_db
+    orchestrator = CheckpointingOrchestrator()
+    with patch.object(execucao_service, "async_session", factory), \
+         patch.object(execucao_service, "get_orchestrator", lambda: orchestrator):
+        task = asyncio.create_task(run_pipeline_task(execucao.id, {"mode": "review"}))
+        await orchestrator.started.wait()
+
+        events = ExecucaoService.stream_logs(execucao.id)
+        snapshot = await events.__anext__()
+        orchestrator.release.set()
+        rest = [chunk async for chunk in events]
+        await task
+
+    assert snapshot.startswith("event: snapshot")
+    assert rest[0] == 'event: status\ndata: {"status": "succeeded"}\n\n'
+    assert rest[-1] == 'event: end\ndata: {"status": "success"}\n\n'
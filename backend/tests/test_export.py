@@ -0,0 +1,67 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from unittest.mock import patch
+from sqlalchemy import select
+
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.usuario import Usuario
+from app.services import export_service
+from tests.conftest import TestingSessionLocal
+
+
+async def _execucoes(client, auth_headers, db_session) -> int:
+    response = await client.post("/projetos/", json={"nome": "Export"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    db_session.add_all(
+        Execucao(
+            projeto_id=projeto_id, usuario_id=user.id, logs=f"log {i}\n",
+            status=StatusExecucao.FAILED.value if i % 2 else StatusExecucao.SUCCESS.value,
+            parametros_entrada={"mode": "review"}
+        )
+        for i in range(7)
+    )
+    await db_session.commit()
+    return projeto_id
+
+
+@pytest.fixture(autouse=True)
+def small_batches():
+    with patch.object(export_service, "async_session", TestingSessionLocal), \
+            patch.object(export_service.settings, "export_batch_size", 3):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_streams_filtered_rows(client, auth_headers, db_session):
+    projeto_id = await _execucoes(client, auth_headers, db_session)
+
+    response = await client.get(
+        "/execucoes/exportar", params={"projeto_id": projeto_id, "status": "failed", "incluir_logs": True},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert all(row["status"] == "failed" and row["logs"].startswith("log") for row in rows)
+    assert rows[0]["parametros_entrada"] == {"mode": "review"}
+    assert rows[0]["resultado_externo"] is False
+
+
+@pytest.mark.asyncio
+async def test_gzip_csv_export(client, auth_headers, db_session):
+    await _execucoes(client, auth_headers, db_session)
+
+    response = await client.get(
+        "/execucoes/exportar", params={"formato": "csv", "compactar": True}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert 'filename="execucoes.csv.gz"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert len(rows) == 7
+    assert "logs" not in rows[0]
+    assert json.loads(rows[0]["parametros_entrada"]) == {"mode": "review"}
@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from sqlalchemy import update
+
+from app.core.akita_wrapper import PipelineOrchestrator
+from app.core.fanout import TargetError, expand_targets, parse_targets
+from app.core.log_sink import LogEvent, LogStream
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.projeto import Projeto
+from app.services import execucao_service
+from app.services.execucao_service import ExecucaoService
+from tests.conftest import TestingSessionLocal
+
+
+def test_targets_are_validated_and_globs_expanded(tmp_path):
+    for path in ("services/api", "services/web", "lib"):
+        (tmp_path / path).mkdir(parents=True)
+
+    assert parse_targets({}) == ["."]
+    assert parse_targets({"target": ["lib", "services/*"]}) == ["lib", "services/*"]
+    with pytest.raises(TargetError):
+        parse_targets({"targets": ["../outro"]})
+    with pytest.raises(TargetError):
+        parse_targets({"targets": []})
+
+    targets = expand_targets(["services/*", "lib", "services/api", "docs/*"], str(tmp_path))
+    assert targets == ["services/api", "services/web", "lib", "docs/*"]
+    assert expand_targets(["services/*"], None) == ["services/*"]
+
+
+class FakeCore:
+    """Stands in for PipelineOrchestrator.execute: one Core job per target."""
+
+    def __init__(self, fail: set[str] = frozenset(), block: bool = False):
+        self.fail = fail
+        self.block = block
+        self.running = 0
+        self.peak = 0
+        self.cancelled: list[tuple[str, str | None]] = []
+
+    async def execute(self, config, sink=None, **kwargs):
+        target = config["target"]
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await sink.publish(LogEvent.log(["started"], f"core-{target}", 1, "http://core-a"))
+            await asyncio.sleep(0.01)
+            if self.block:
+                await asyncio.Event().wait()
+            if target in self.fail:
+                return {"success": False, "error": "boom", "timings": {"core_run": 1.0}}
+            return {"success": True, "data": {"result": f"ok {target}"}, "timings": {"core_run": 2.0}}
+        finally:
+            self.running -= 1
+
+    async def cancel(self, execution_id, endpoint=None):
+        self.cancelled.append((execution_id, endpoint))
+        return True
+
+
+@pytest.mark.asyncio
+async def test_fan_out_merges_logs_and_results_with_partial_failure():
+    orchestrator = PipelineOrchestrator()
+    core = FakeCore(fail={"b"})
+    stream = LogStream()
+    feed = stream.subscribe(256)
+
+    with patch.object(orchestrator, "execute", core.execute):
+        result = await orchestrator.execute_many({"mode": "review"}, ["a", "b", "c"], sink=stream, max_concurrency=2)
+    stream.close()
+
+    assert core.peak == 2
+    assert result["success"] is False and result["partial"] is True
+    assert result["data"]["alvos"]["a"] == {"result": "ok a"}
+    assert result["data"]["alvos"]["b"] == {"error": "boom"}
+    assert result["data"]["resumo"] == {"total": 3, "sucesso": 2, "falha": 1}
+    assert result["timings"]["core_run"] == 2.0
+
+    events = [event async for event in feed]
+    lines = [line for event in events for line in event.lines]
+    assert {"[a] started", "[b] started", "[c] started"} <= set(lines)
+    # Sub-job checkpoints are not the run's checkpoint
+    assert all(event.log_cursor is None for event in events)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fan_out_aborts_core_sub_jobs():
+    orchestrator = PipelineOrchestrator()
+    core = FakeCore(block=True)
+
+    with patch.object(orchestrator, "execute", core.execute), patch.object(orchestrator, "cancel", core.cancel):
+        task = asyncio.create_task(
+            orchestrator.execute_many({"mode": "review"}, ["a", "b", "c"], sink=LogStream(), max_concurrency=2)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert sorted(core.cancelled) == [("core-a", "http://core-a"), ("core-b", "http://core-a")]
+
+
+@pytest.mark.asyncio
+async def test_invalid_targets_are_rejected(client, auth_headers):
+    response = await client.post("/projetos/", json={"nome": "Mono"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+
+    response = await client.post(
+        f"/projetos/{projeto_id}/execucoes",
+        json={"parametros_entrada": {"targets": ["../fora"]}}, headers=auth_headers
+    )
+    assert response.status_code == 400
+    with patch("app.services.execucao_service.settings.fanout_max_targets", 2):
+        response = await client.post(
+            f"/projetos/{projeto_id}/execucoes",
+            json={"parametros_entrada": {"targets": ["a", "b", "c"]}}, headers=auth_headers
+        )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_globs_are_expanded_once_at_creation(client, auth_headers, db_session, tmp_path):
+    for path in ("services/api", "services/web"):
+        (tmp_path / path).mkdir(parents=True)
+    response = await client.post("/projetos/", json={"nome": "Mono"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    # Set the path directly: creating with it would queue an index warm-up
+    await db_session.execute(
+        update(Projeto).where(Projeto.id == projeto_id).values(caminho_repositorio=str(tmp_path))
+    )
+    await db_session.commit()
+
+    with patch.object(ExecucaoService, "schedule"):
+        response = await client.post(
+            f"/projetos/{projeto_id}/execucoes",
+            json={"parametros_entrada": {"targets": ["services/*"]}}, headers=auth_headers
+        )
+    assert response.status_code == 202
+    assert response.json()["alvos"] == ["services/api", "services/web"]
+
+    # What runs is the stored list, not a new glob of the checkout
+    (tmp_path / "services" / "jobs").mkdir()
+    execucao = await db_session.get(Execucao, response.json()["id"])
+    projeto = await db_session.get(Projeto, projeto_id)
+    config = ExecucaoService.build_pipeline_config(projeto, execucao)
+    assert config["targets"] == ["services/api", "services/web"]
+
+    # A cap lowered after creation still bounds the run
+    with patch.object(execucao_service, "async_session", TestingSessionLocal), \
+         patch.object(execucao_service.settings, "fanout_max_targets", 1), \
+         patch.object(execucao_service, "get_orchestrator") as orchestrator:
+        await execucao_service.run_pipeline_task(execucao.id, config)
+    orchestrator.return_value.execute_many.assert_not_called()
+    await db_session.refresh(execucao)
+    assert execucao.status == StatusExecucao.FAILED.value
+    assert "excedem o limite" in execucao.resultado["error"]
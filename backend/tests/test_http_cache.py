@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from sqlalchemy import text
+
+from app.core.http_cache import ResponseCache, compute_etag, is_not_modified, response_cache
+from app.database import after_commit
+
+
+def test_response_cache_lru_and_prefix_invalidation():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("projetos:1:list", b"[]", compute_etag(1))
+    cache.set("projetos:1:7", b"{}", compute_etag(2))
+    cache.set("projetos:2:list", b"[]", compute_etag(3))
+
+    assert cache.get("projetos:1:list") is None  # evicted (LRU)
+    assert cache.get("projetos:1:7") is not None
+
+    cache.invalidate("projetos:1:")
+    assert cache.get("projetos:1:7") is None
+    assert cache.get("projetos:2:list") is not None
+
+
+def test_response_cache_ttl_expiry():
+    cache = ResponseCache(ttl_seconds=-1)
+    cache.set("k", b"{}", compute_etag("k"))
+    assert cache.get("k") is None
+
+
+def test_is_not_modified_prefers_etag():
+    etag = compute_etag(1, "2026-01-01")
+    request = MagicMock(headers={
+        "if-none-match": f'"other", {etag}',
+        "if-modified-since": "Thu, 01 Jan 1970 00:00:00 GMT"
+    })
+    assert is_not_modified(request, etag, datetime(2026, 1, 1))
+
+    request = MagicMock(headers={"if-modified-since": "Thu, 01 Jan 2026 00:00:00 GMT"})
+    assert is_not_modified(request, etag, datetime(2025, 12, 31))
+    assert not is_not_modified(request, etag, datetime(2026, 1, 2))
+
+
+@pytest.mark.asyncio
+async def test_projeto_conditional_get_and_invalidation(client, auth_headers):
+    created = await client.post("/projetos/", json={"nome": "Demo"}, headers=auth_headers)
+    projeto_id = created.json()["id"]
+
+    first = await client.get(f"/projetos/{projeto_id}", headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = await client.get(
+        f"/projetos/{projeto_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+
+    await client.put(f"/projetos/{projeto_id}", json={"nome": "Renomeado"}, headers=auth_headers)
+    updated = await client.get(
+        f"/projetos/{projeto_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert updated.status_code == 200
+    assert updated.json()["nome"] == "Renomeado"
+
+    listing = await client.get("/projetos/", headers=auth_headers)
+    assert listing.status_code == 200
+    assert [p["nome"] for p in listing.json()] == ["Renomeado"]
+
+
+@pytest.mark.asyncio
+async def test_invalidation_waits_for_commit(db_session):
+    response_cache.set("projetos:9:list", b"[]", compute_etag(1))
+    await db_session.execute(text("SELECT 1"))
+    after_commit(db_session, lambda: response_cache.invalidate("projetos:9:"))
+    await db_session.rollback()
+    await db_session.commit()
+    assert response_cache.get("projetos:9:list") is not None  # dropped with the rollback
+
+    after_commit(db_session, lambda: response_cache.invalidate("projetos:9:"))
+    assert response_cache.get("projetos:9:list") is not None
+    await db_session.commit()
+    assert response_cache.get("projetos:9:list") is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_only_revalidates(client, auth_headers):
+    created = await client.post("/projetos/", json={"nome": "Demo"}, headers=auth_headers)
+    projeto_id = created.json()["id"]
+
+    with patch.object(response_cache, "enabled", False):
+        first = await client.get(f"/projetos/{projeto_id}", headers=auth_headers)
+        assert len(response_cache) == 0
+        cached = await client.get(
+            f"/projetos/{projeto_id}", headers={**auth_headers, "If-None-Match": first.headers["etag"]}
+        )
+    assert cached.status_code == 304
@@ -0,0 +1,251 @@
+import asyncio
+import os
+
+import pytest
+from unittest.mock import patch
+
+from app.config import get_settings
+from app.core.manifest import diff_manifest, scan_tree
+from app.models.usuario import Usuario
+from app.models.projeto import Projeto
+from app.services import indice_service
+from app.services.indice_service import IndexacaoJob, IndiceService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "README.md").write_text("readme")
+    (tmp_path / "src" / "a.py").write_text("a = 1\n")
+    (tmp_path / "src" / "b.py").write_text("b = 2\n")
+    (tmp_path / "node_modules" / "dep.js").write_text("ignored")
+    return tmp_path
+
+
+class FakeCore:
+    def __init__(self):
+        self.full = []
+        self.deltas = []
+
+    async def index_project(self, path):
+        self.full.append(path)
+        return True
+
+    async def index_delta(self, path, changed, deleted):
+        self.deltas.append(({c["path"] for c in changed}, set(deleted)))
+        return True
+
+
+@pytest.mark.asyncio
+async def test_diff_hashes_only_moved_files(repo):
+    scanned = scan_tree(str(repo), frozenset({"node_modules"}))
+    assert set(scanned) == {"README.md", "src/a.py", "src/b.py"}
+
+    first = await diff_manifest(str(repo), scanned, {})
+    assert set(first.added) == set(scanned)
+
+    manifest = dict(first.added)
+    (repo / "src" / "a.py").write_text("a = 10\n")
+    stat = os.stat(repo / "src" / "b.py")
+    os.utime(repo / "src" / "b.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    (repo / "README.md").unlink()
+    (repo / "src" / "c.py").write_text("c = 3\n")
+
+    hashed = []
+    second = await diff_manifest(
+        str(repo), scan_tree(str(repo), frozenset({"node_modules"})), manifest,
+        on_hashed=lambda done, total: hashed.append((done, total))
+    )
+    assert set(second.changed) == {"src/a.py"}
+    assert set(second.added) == {"src/c.py"}
+    assert second.deleted == ["README.md"]
+    assert set(second.touched) == {"src/b.py"}
+    assert hashed[-1] == (3, 3)
+
+
+@pytest.mark.asyncio
+async def test_reindex_sends_only_delta(db_session, repo):
+    user = Usuario(email="idx@devflow.com", nome="Idx", senha_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    projeto = Projeto(usuario_id=user.id, nome="Repo", caminho_repositorio=str(repo))
+    db_session.add(projeto)
+    await db_session.commit()
+
+    core = FakeCore()
+    with patch.object(indice_service, "get_orchestrator", lambda: core):
+        first = IndexacaoJob(projeto_id=projeto.id, caminho=str(repo))
+        await IndiceService.run(first, TestingSessionLocal)
+        assert first.status == "succeeded" and first.completa
+        assert core.full == [str(repo)] and core.deltas == []
+
+        (repo / "src" / "a.py").write_text("a = 42\n")
+        second = IndexacaoJob(projeto_id=projeto.id, caminho=str(repo))
+        await IndiceService.run(second, TestingSessionLocal)
+
+        third = IndexacaoJob(projeto_id=projeto.id, caminho=str(repo))
+        await IndiceService.run(third, TestingSessionLocal)
+
+    assert second.status == "succeeded" and not second.completa
+    assert (second.a_verificar, second.alterados, second.enviados) == (1, 1, 1)
+    assert core.deltas == [({"src/a.py"}, set())]
+    assert (third.a_verificar, third.total_envio) == (0, 0)
+
+
+class FullOnlyCore(FakeCore):
+    """A Core without /v1/index/delta."""
+
+    async def index_delta(self, path, changed, deleted):
+        self.deltas.append(({c["path"] for c in changed}, set(deleted)))
+        return None
+
+
+@pytest.mark.asyncio
+async def test_reindex_falls_back_to_full_without_delta_endpoint(db_session, repo):
+    user = Usuario(email="full@devflow.com", nome="Full", senha_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    projeto = Projeto(usuario_id=user.id, nome="Repo", caminho_repositorio=str(repo))
+    db_session.add(projeto)
+    await db_session.commit()
+
+    core = FullOnlyCore()
+    with patch.object(indice_service, "get_orchestrator", lambda: core):
+        await IndiceService.run(IndexacaoJob(projeto_id=projeto.id, caminho=str(repo)), TestingSessionLocal)
+
+        (repo / "src" / "a.py").write_text("a = 42\n")
+        (repo / "README.md").unlink()
+        second = IndexacaoJob(projeto_id=projeto.id, caminho=str(repo))
+        await IndiceService.run(second, TestingSessionLocal)
+
+        third = IndexacaoJob(projeto_id=projeto.id, caminho=str(repo))
+        await IndiceService.run(third, TestingSessionLocal)
+
+    assert second.status == "succeeded" and second.completa
+    assert core.full == [str(repo), str(repo)]
+    assert (second.total_envio, second.enviados) == (2, 2)
+    # The rebuilt manifest matches the tree: nothing left to send
+    assert third.status == "succeeded" and not third.completa
+    assert (third.a_verificar, third.total_envio) == (0, 0)
+    manifest = await indice_service._load_manifest(db_session, projeto.id)
+    assert set(manifest) == {"src/a.py", "src/b.py"}
+
+
+@pytest.mark.asyncio
+async def test_index_endpoint_requires_repository_path(client, auth_headers):
+    response = await client.post("/projetos/", json={"nome": "Sem caminho"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+
+    response = await client.post(f"/projetos/{projeto_id}/indice", headers=auth_headers)
+    assert response.status_code == 400
+    response = await client.get(f"/projetos/{projeto_id}/indice", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_repository_path_is_confined_to_root(client, auth_headers, repository_root, tmp_path):
+    (tmp_path / "fora").symlink_to("/")
+    for caminho in ["/", "../..", str(tmp_path / "fora")]:
+        response = await client.post(
+            "/projetos/", json={"nome": "Fora", "caminho_repositorio": caminho}, headers=auth_headers
+        )
+        assert response.status_code == 400, caminho
+
+    # Relative paths are taken under the root (the checkout may not exist yet)
+    response = await client.post(
+        "/projetos/", json={"nome": "Dentro", "caminho_repositorio": "ainda-nao-clonado"}, headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert response.json()["caminho_repositorio"] == str((repository_root / "ainda-nao-clonado").resolve())
+    projeto_id = response.json()["id"]
+
+    response = await client.put(
+        f"/projetos/{projeto_id}", json={"caminho_repositorio": "/etc"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    # Rows saved before the root existed are checked again before indexing
+    await client.put(f"/projetos/{projeto_id}", json={"caminho_repositorio": "x"}, headers=auth_headers)
+    with patch.object(get_settings(), "repository_root", str(tmp_path / "outra-raiz")):
+        response = await client.post(f"/projetos/{projeto_id}/indice", headers=auth_headers)
+    assert response.status_code == 400
+    assert "fora da raiz" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_warmups_are_deduplicated_and_rate_limited(db_session, repo):
+    user = Usuario(email="warm@devflow.com", nome="Warm", senha_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    projetos = [Projeto(usuario_id=user.id, nome=f"P{i}", caminho_repositorio=str(repo)) for i in range(2)]
+    db_session.add_all(projetos)
+    await db_session.commit()
+
+    core = FakeCore()
+    with patch.object(indice_service, "get_orchestrator", lambda: core), \
+         patch.object(indice_service, "async_session", TestingSessionLocal), \
+         patch.object(indice_service.settings, "index_warmup_max_concurrent", 1), \
+         patch.object(indice_service.settings, "index_warmup_interval_seconds", 0):
+        IndiceService.schedule_warmup(projetos[0])
+        IndiceService.schedule_warmup(projetos[0], full=True)
+        IndiceService.schedule_warmup(projetos[1])
+        await indice_service._warmup_task
+        for projeto in projetos:
+            await IndiceService.wait(projeto.id)
+
+    assert core.full == [str(repo), str(repo)]  # one job per project
+    assert IndiceService.get_job(projetos[0].id).completa
+    for projeto in projetos:
+        await db_session.refresh(projeto)
+        assert projeto.estado_indice == "warm"
+
+
+@pytest.mark.asyncio
+async def test_skipped_or_interrupted_warmups_do_not_leave_projects_warming(client, auth_headers, db_session):
+    # The checkout does not exist yet: the warm-up is skipped
+    response = await client.post(
+        "/projetos/", json={"nome": "Sem clone", "caminho_repositorio": "ainda-nao-clonado"}, headers=auth_headers
+    )
+    assert response.json()["estado_indice"] != "warming"
+    await indice_service._warmup_task
+    projeto = await db_session.get(Projeto, response.json()["id"])
+    await db_session.refresh(projeto)
+    assert projeto.estado_indice != "warming"
+
+    # Left warming by a process that died mid-run
+    projeto.estado_indice = "warming"
+    await db_session.commit()
+    assert await IndiceService.reset_stale(db_session) == 1
+    await db_session.refresh(projeto)
+    assert projeto.estado_indice == "cold"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_marks_project_cold(db_session, repo):
+    user = Usuario(email="stop@devflow.com", nome="Stop", senha_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    projeto = Projeto(usuario_id=user.id, nome="P", caminho_repositorio=str(repo))
+    db_session.add(projeto)
+    await db_session.commit()
+
+    started = asyncio.Event()
+
+    class StuckCore(FakeCore):
+        async def index_project(self, path):
+            started.set()
+            await asyncio.Event().wait()
+
+    with patch.object(indice_service, "get_orchestrator", StuckCore), \
+         patch.object(indice_service, "async_session", TestingSessionLocal):
+        IndiceService.start(projeto)
+        await started.wait()
+        await db_session.refresh(projeto)
+        assert projeto.estado_indice == "warming"
+        indice_service._tasks[projeto.id].cancel()
+        await IndiceService.wait(projeto.id)
+
+    await db_session.refresh(projeto)
+    assert projeto.estado_indice == "cold"
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.core.log_sink import COALESCE, DROP_OLDEST, BLOCK, LogEvent, LogStream, Subscription
+
+
+@pytest.mark.asyncio
+async def test_block_policy_applies_backpressure():
+    subscription = Subscription(maxsize=2, policy=BLOCK)
+    await subscription.put(LogEvent.log(["a"]))
+    await subscription.put(LogEvent.log(["b"]))
+
+    blocked = asyncio.create_task(subscription.put(LogEvent.log(["c"])))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    assert (await subscription.get()).lines == ["a"]
+    await asyncio.wait_for(blocked, timeout=1)
+    batch = await subscription.get_batch()
+    assert [event.lines for event in batch] == [["b"], ["c"]]
+    assert subscription.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_without_tasks():
+    subscription = Subscription(maxsize=4, policy=COALESCE)
+    tasks_before = len(asyncio.all_tasks())
+    for i in range(10_000):
+        await subscription.put(LogEvent.log([f"line {i}"], "core-1", i + 1))
+
+    assert len(asyncio.all_tasks()) == tasks_before
+    assert len(subscription) == 4
+    batch = await subscription.get_batch()
+    lines = [line for event in batch for line in event.lines]
+    assert lines == [f"line {i}" for i in range(10_000)]
+    assert batch[-1].log_cursor == 10_000
+    assert subscription.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesce_waits_instead_of_dropping_mixed_kinds():
+    subscription = Subscription(maxsize=1, policy=COALESCE)
+    await subscription.put(LogEvent.log(["a"]))
+
+    blocked = asyncio.create_task(subscription.put(LogEvent.state("running")))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    assert (await subscription.get()).lines == ["a"]
+    await asyncio.wait_for(blocked, timeout=1)
+    assert (await subscription.get()).status == "running"
+    assert subscription.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_counts_drops():
+    subscription = Subscription(maxsize=3, policy=DROP_OLDEST)
+    for i in range(10):
+        await subscription.put(LogEvent.log([str(i)]))
+
+    assert subscription.dropped == 7
+    assert [event.lines for event in await subscription.get_batch()] == [["7"], ["8"], ["9"]]
+
+
+@pytest.mark.asyncio
+async def test_stream_fans_out_and_slow_viewer_does_not_block_writer():
+    stream = LogStream()
+    writer = stream.subscribe(maxsize=100, policy=BLOCK, name="db")
+    viewer = stream.subscribe(maxsize=1, policy=DROP_OLDEST)
+
+    for i in range(5):
+        await stream.publish(LogEvent.log([str(i)]))
+    await stream.publish(LogEvent.state("succeeded"))
+    stream.close()
+
+    assert len(await writer.get_batch()) == 6
+    assert await writer.get_batch() == []
+    assert [event.status async for event in viewer] == ["succeeded"]
+    assert viewer.dropped == 5
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        Subscription(policy="spill")
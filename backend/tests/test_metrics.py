@@ -0,0 +1,92 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import security
+from app.core.metrics import (
+    EventLoopMonitor, MetricsMiddleware, MetricsRegistry, db_queries_per_request, db_time_per_request,
+    event_loop_slow_callbacks, instrument_engine
+)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests", ("route",))
+    latency = registry.histogram("demo_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    running = registry.gauge("demo_running", "Running")
+
+    requests.labels("/projetos/").inc()
+    requests.labels("/projetos/").inc(2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    running.inc()
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{route="/projetos/"} 3' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "demo_latency_seconds_count 2" in text
+    assert "demo_running 1" in text
+
+
+def test_registry_rejects_duplicate_names():
+    registry = MetricsRegistry()
+    registry.counter("dup", "first")
+    with pytest.raises(ValueError):
+        registry.gauge("dup", "second")
+
+
+@pytest.mark.asyncio
+async def test_event_loop_monitor_flags_blocking_callbacks():
+    before = event_loop_slow_callbacks.labels().value
+    monitor = EventLoopMonitor(interval=0.01, slow_threshold=0.02)
+    monitor.start()
+    await asyncio.sleep(0.02)
+
+    time.sleep(0.1)  # block the loop
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    assert event_loop_slow_callbacks.labels().value > before
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_records_route_templates(client, auth_headers):
+    await client.get("/projetos/", headers=auth_headers)
+    with patch.object(security.settings, "admin_token", "segredo"):
+        assert (await client.get("/metrics")).status_code == 403
+        response = await client.get("/metrics", headers={"X-Admin-Token": "segredo"})
+    assert response.status_code == 200
+    assert 'devflow_http_request_duration_seconds_count{method="GET",route="/projetos/",status="200"}' in response.text
+    assert "devflow_db_queries_per_request" in response.text
+
+
+@pytest.mark.asyncio
+async def test_middleware_counts_queries_per_request(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/{item_id}")
+    async def three_queries(item_id: int):
+        async with engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/metrics-test/1")).status_code == 200
+            assert (await client.get("/metrics-test/2")).status_code == 200
+    finally:
+        await engine.dispose()
+
+    stats = db_queries_per_request.labels("/metrics-test/{item_id}")
+    assert (stats.count, stats.sum) == (2, 6)
+    assert db_time_per_request.labels("/metrics-test/{item_id}").sum > 0
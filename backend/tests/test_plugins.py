@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.services import plugin_service
+from app.services.plugin_service import template_cache
+
+SPEC = {"name": "Linter", "description": "Checks code", "tools": [{"name": "lint", "description": "run"}]}
+
+
+class SlowCore:
+    def __init__(self, template="class Linter: ..."):
+        self.calls = 0
+        self.template = template
+        self.release = asyncio.Event()
+
+    async def generate_plugin_template(self, name, description, tools=None):
+        self.calls += 1
+        await self.release.wait()
+        return self.template
+
+
+@pytest.fixture
+def core():
+    template_cache.clear()
+    core = SlowCore()
+    with patch.object(plugin_service, "get_orchestrator", lambda: core):
+        yield core
+    template_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_generate_requires_authentication(client, core):
+    response = await client.post("/plugins/generate", json=SPEC)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_identical_specs_share_one_core_call(client, auth_headers, core):
+    near_identical = {**SPEC, "description": "  Checks   code "}
+    requests = [
+        asyncio.create_task(client.post("/plugins/generate", json=spec, headers=auth_headers))
+        for spec in (SPEC, SPEC, near_identical)
+    ]
+    await asyncio.sleep(0.05)
+    core.release.set()
+    responses = await asyncio.gather(*requests)
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert {r.json()["template"] for r in responses} == {"class Linter: ..."}
+    assert core.calls == 1
+
+    response = await client.post("/plugins/generate", json=SPEC, headers=auth_headers)
+    assert response.status_code == 200
+    assert core.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_async_job_reports_status(client, auth_headers, core):
+    response = await client.post("/plugins/generate?async_mode=true", json=SPEC, headers=auth_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in ("pending", "running")
+
+    core.release.set()
+    await asyncio.gather(*plugin_service._job_tasks)
+    response = await client.get(job["status_url"], headers=auth_headers)
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["template"] == "class Linter: ..."
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_is_not_cached(client, auth_headers, core):
+    core.template = None
+    core.release.set()
+    response = await client.post("/plugins/generate", json=SPEC, headers=auth_headers)
+    assert response.status_code == 500
+    assert len(template_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_capped_per_user(client, auth_headers, core):
+    plugin_service._jobs.clear()
+    with patch.object(plugin_service.settings, "plugin_max_jobs_per_user", 2):
+        first = await client.post("/plugins/generate?async_mode=true", json=SPEC, headers=auth_headers)
+        other = {**SPEC, "name": "Formatter"}
+        await client.post("/plugins/generate?async_mode=true", json=other, headers=auth_headers)
+        response = await client.post(
+            "/plugins/generate?async_mode=true", json={**SPEC, "name": "Third"}, headers=auth_headers
+        )
+        assert response.status_code == 429
+
+        # Finished jobs make room, oldest first
+        core.release.set()
+        await asyncio.gather(*plugin_service._job_tasks)
+        response = await client.post("/plugins/generate?async_mode=true", json=SPEC, headers=auth_headers)
+        assert response.status_code == 202
+    assert len(plugin_service._jobs) == 2
+    response = await client.get(first.json()["status_url"], headers=auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core import profiling
+from app.core.profiling import ProfilingMiddleware, StackSampler, task_stack
+
+
+async def _inner_wait(event):
+    await event.wait()
+
+
+async def _outer_wait(event):
+    await _inner_wait(event)
+
+
+@pytest.mark.asyncio
+async def test_task_stack_follows_await_chain():
+    event = asyncio.Event()
+    task = asyncio.create_task(_outer_wait(event))
+    await asyncio.sleep(0)
+    stack = task_stack(task)
+    event.set()
+    await task
+
+    names = [frame.partition(":")[2] for frame in stack]
+    assert names[:2] == ["_outer_wait", "_inner_wait"]
+    assert stack[-1].startswith("<await")
+
+
+@pytest.mark.asyncio
+async def test_stack_sampler_collects_samples():
+    event = asyncio.Event()
+    task = asyncio.create_task(_outer_wait(event))
+    sampler = StackSampler(interval=0.001)
+    sampler.add_task(task)
+    sampler.start()
+    await asyncio.sleep(0.05)
+    sampler.stop()
+    event.set()
+    await task
+
+    stacks = sampler.drain()
+    assert sum(stacks.values()) > 0
+    assert any("_inner_wait" in stack for stack in stacks)
+
+
+@pytest.mark.asyncio
+async def test_profiling_middleware_writes_folded_profile(tmp_path):
+    async def slow(request):
+        await asyncio.sleep(0.03)
+        return JSONResponse({"ok": True})
+
+    app = ProfilingMiddleware(Starlette(routes=[Route("/slow", slow)]), sample_interval=0.001)
+    with patch.object(profiling.settings, "admin_token", "segredo"), \
+         patch.object(profiling.settings, "profile_dir", str(tmp_path)):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            plain = await ac.get("/slow")
+            unauthorized = await ac.get("/slow", headers={"X-Profile": "sample"})
+            profiled = await ac.get("/slow", headers={"X-Profile": "sample", "X-Admin-Token": "segredo"})
+
+    assert "x-profile-file" not in plain.headers
+    assert "x-profile-file" not in unauthorized.headers
+    content = (tmp_path / profiled.headers["x-profile-file"]).read_text()
+    assert "slow" in content
+
+
+@pytest.mark.asyncio
+async def test_overlapping_cprofile_requests_are_rejected(tmp_path):
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    app = ProfilingMiddleware(Starlette(routes=[Route("/slow", slow)]))
+    headers = {"X-Profile": "cprofile", "X-Admin-Token": "segredo"}
+    with patch.object(profiling.settings, "admin_token", "segredo"), \
+         patch.object(profiling.settings, "profile_dir", str(tmp_path)):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = asyncio.create_task(ac.get("/slow", headers=headers))
+            await asyncio.sleep(0.02)
+            second = await ac.get("/slow", headers=headers)
+            release.set()
+            first = await first
+
+    assert second.status_code == 409
+    assert first.status_code == 200
+    assert (tmp_path / first.headers["x-profile-file"]).is_file()
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_require_admin(client):
+    response = await client.get("/diagnostics/profiles")
+    assert response.status_code == 403
+    # Debug mode does not open them
+    with patch.object(profiling.settings, "debug", True):
+        response = await client.get("/diagnostics/profiles")
+    assert response.status_code == 403
@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import select
+
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.resultado_blob import ResultadoBlob
+from app.models.usuario import Usuario
+from app.services import resultado_service
+from app.services.resultado_service import ResultadoService, document_cache
+
+LARGE = {"review": ["linha de revisão muito repetida"] * 2000, "score": 7}
+
+
+async def _execucoes(client, auth_headers, db_session, count: int) -> list[Execucao]:
+    response = await client.post("/projetos/", json={"nome": "Resultados"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    execucoes = [
+        Execucao(projeto_id=projeto_id, usuario_id=user.id, status=StatusExecucao.SUCCESS.value)
+        for _ in range(count)
+    ]
+    db_session.add_all(execucoes)
+    await db_session.commit()
+    return execucoes
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+    yield
+    document_cache.clear()
+
+
+async def _blob(db_session) -> ResultadoBlob | None:
+    result = await db_session.execute(select(ResultadoBlob).execution_options(populate_existing=True))
+    return result.scalar_one_or_none()
+
+
+@pytest.mark.asyncio
+async def test_small_results_stay_inline(client, auth_headers, db_session):
+    [execucao] = await _execucoes(client, auth_headers, db_session, 1)
+    await ResultadoService.store(db_session, execucao, {"ok": True})
+    await db_session.commit()
+
+    assert execucao.resultado == {"ok": True} and not execucao.resultado_externo
+    assert await _blob(db_session) is None
+
+
+@pytest.mark.asyncio
+async def test_large_results_are_deduplicated_and_loaded_lazily(client, auth_headers, db_session):
+    first, second = await _execucoes(client, auth_headers, db_session, 2)
+    await ResultadoService.store(db_session, first, LARGE)
+    await ResultadoService.store(db_session, second, dict(reversed(LARGE.items())))  # same content
+    await db_session.commit()
+
+    blob = await _blob(db_session)
+    assert blob.referencias == 2
+    assert len(blob.conteudo) < blob.tamanho // 10
+    assert first.resultado_hash == second.resultado_hash == blob.hash
+
+    response = await client.get(f"/execucoes/{first.id}", headers=auth_headers)
+    body = response.json()
+    assert body["resultado"] is None
+    assert body["resultado_externo"] and body["resultado_tamanho"] == blob.tamanho
+
+    response = await client.get(f"/execucoes/{first.id}/resultado", headers=auth_headers)
+    assert response.json()["resultado"] == LARGE
+
+
+@pytest.mark.asyncio
+async def test_archiving_releases_blob_references(client, auth_headers, db_session):
+    first, second = await _execucoes(client, auth_headers, db_session, 2)
+    for execucao in (first, second):
+        await ResultadoService.store(db_session, execucao, LARGE)
+    await db_session.commit()
+
+    response = await client.post(f"/execucoes/{first.id}/arquivar", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["arquivado_em"] is not None
+    assert (await _blob(db_session)).referencias == 1
+
+    response = await client.get(f"/execucoes/{first.id}/resultado", headers=auth_headers)
+    assert response.status_code == 410
+
+    await client.post(f"/execucoes/{second.id}/arquivar", headers=auth_headers)
+    await client.post(f"/execucoes/{second.id}/arquivar", headers=auth_headers)  # idempotent
+    assert await _blob(db_session) is None
+
+
+@pytest.mark.asyncio
+async def test_running_execution_cannot_be_archived(client, auth_headers, db_session):
+    [execucao] = await _execucoes(client, auth_headers, db_session, 1)
+    execucao.status = StatusExecucao.RUNNING.value
+    await db_session.commit()
+
+    response = await client.post(f"/execucoes/{execucao.id}/arquivar", headers=auth_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_partial_result_by_pointer_with_pages(client, auth_headers, db_session):
+    [execucao] = await _execucoes(client, auth_headers, db_session, 1)
+    findings = [{"titulo": f"F{i}", "severidade": "alta", "detalhe": "x" * 200} for i in range(120)]
+    await ResultadoService.store(db_session, execucao, {"resumo": {"total": 120}, "findings": findings})
+    await db_session.commit()
+    url = f"/execucoes/{execucao.id}/resultado"
+
+    with patch.object(resultado_service, "_unpack", wraps=resultado_service._unpack) as unpack:
+        response = await client.get(url, params={"pointer": "/resumo/total"}, headers=auth_headers)
+        assert response.json()["resultado"] == 120
+
+        page = (await client.get(
+            url, params={"pointer": "/findings", "limite": 50, "campos": "titulo"}, headers=auth_headers
+        )).json()
+        assert page["total"] == 120
+        assert page["resultado"][0] == {"titulo": "F0"}
+        seen = [item["titulo"] for item in page["resultado"]]
+        while page["proximo_cursor"]:
+            page = (await client.get(
+                url, params={"pointer": "/findings", "cursor": page["proximo_cursor"], "limite": 50},
+                headers=auth_headers
+            )).json()
+            seen.extend(item["titulo"] for item in page["resultado"])
+        assert seen == [f["titulo"] for f in findings]
+    assert unpack.call_count == 1  # parsed once, then served from the document cache
+
+    for params, expected in (
+        ({"pointer": "/nada"}, 404),
+        ({"pointer": "findings"}, 400),
+        ({"pointer": "/resumo", "limite": 5}, 400),
+        ({"pointer": "/findings", "cursor": "???"}, 400),
+    ):
+        response = await client.get(url, params=params, headers=auth_headers)
+        assert response.status_code == expected, params
@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from unittest.mock import patch
+
+from app.models.execucao import Execucao
+from app.schemas.execucao import ExecucaoResponse
+from app.services.execucao_service import ExecucaoService
+from app.tasks.scheduler import BATCH, INTERACTIVE, ExecutionScheduler, ScheduledJob
+
+
+class Recorder:
+    """Runner that records start order and blocks until released."""
+
+    def __init__(self):
+        self.started: list[int] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, execucao_id: int, config: dict, reattach: bool = False) -> None:
+        self.started.append(execucao_id)
+        await self.release.wait()
+
+
+def job(execucao_id, usuario_id=1, projeto_id=None, prioridade=INTERACTIVE):
+    return ScheduledJob(
+        execucao_id=execucao_id,
+        usuario_id=usuario_id,
+        projeto_id=projeto_id if projeto_id is not None else usuario_id * 100,
+        config={},
+        prioridade=prioridade,
+    )
+
+
+@pytest.mark.asyncio
+async def test_global_and_per_user_caps():
+    runner = Recorder()
+    scheduler = ExecutionScheduler(max_concurrent=3, max_per_user=2, max_per_project=0, runner=runner)
+    for i in range(1, 6):
+        scheduler.submit(job(i, usuario_id=1))
+    scheduler.submit(job(10, usuario_id=2))
+    await asyncio.sleep(0)
+
+    # User 1 is capped at 2, so user 2 gets the third slot
+    assert sorted(runner.started) == [1, 2, 10]
+    assert scheduler.running == 3
+    assert scheduler.position(3) == 1
+    assert scheduler.position(1) is None
+
+    runner.release.set()
+    await scheduler.wait_idle()
+    assert sorted(runner.started) == [1, 2, 3, 4, 5, 10]
+
+
+@pytest.mark.asyncio
+async def test_fair_share_between_users():
+    runner = Recorder()
+    scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=0, max_per_project=0, runner=runner)
+    scheduler.submit(job(1, usuario_id=1))  # starts immediately
+    for i in range(2, 12):
+        scheduler.submit(job(i, usuario_id=1))  # heavy user queues 10 more
+    scheduler.submit(job(100, usuario_id=2))
+
+    # The light user goes ahead of the heavy user's backlog
+    assert scheduler.position(100) == 1
+    assert scheduler.position(2) == 2
+
+    runner.release.set()
+    await scheduler.wait_idle()
+    assert runner.started[:2] == [1, 100]
+
+
+@pytest.mark.asyncio
+async def test_priority_classes_are_weighted():
+    runner = Recorder()
+    scheduler = ExecutionScheduler(
+        max_concurrent=1, max_per_user=0, max_per_project=0,
+        class_weights={INTERACTIVE: 3.0, BATCH: 1.0}, runner=runner
+    )
+    scheduler.submit(job(1))
+    for i in range(10, 18):
+        scheduler.submit(job(i, usuario_id=2, prioridade=BATCH))
+    for i in range(20, 28):
+        scheduler.submit(job(i, usuario_id=3, prioridade=INTERACTIVE))
+
+    first_eight = [scheduler._dispatch_order()[i].prioridade for i in range(8)]
+    assert first_eight.count(INTERACTIVE) == 6
+    assert first_eight.count(BATCH) == 2
+
+    runner.release.set()
+    await scheduler.wait_idle()
+
+
+@pytest.mark.asyncio
+async def test_per_project_cap_and_cancel():
+    runner = Recorder()
+    scheduler = ExecutionScheduler(max_concurrent=5, max_per_user=0, max_per_project=1, runner=runner)
+    scheduler.submit(job(1, projeto_id=7))
+    scheduler.submit(job(2, projeto_id=7))
+    scheduler.submit(job(3, projeto_id=8))
+    await asyncio.sleep(0)
+
+    assert sorted(runner.started) == [1, 3]
+    assert scheduler.cancel(2) is True
+    assert scheduler.cancel(2) is False
+    assert scheduler.queued == 0
+
+    runner.release.set()
+    await scheduler.wait_idle()
+    assert 2 not in runner.started
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_frees_slot_immediately():
+    runner = Recorder()
+    scheduler = ExecutionScheduler(max_concurrent=1, max_per_user=0, max_per_project=0, runner=runner)
+    scheduler.submit(job(1))
+    scheduler.submit(job(2))
+    await asyncio.sleep(0)
+    assert runner.started == [1]
+
+    assert scheduler.cancel_running(1) is True
+    assert scheduler.is_running(2)
+    await asyncio.sleep(0)
+    assert runner.started == [1, 2]
+    assert scheduler.cancel_running(1) is False
+
+    runner.release.set()
+    await scheduler.wait_idle()
+
+
+@pytest.mark.asyncio
+async def test_shortest_job_first_and_wait_estimates():
+    runner = Recorder()
+    scheduler = ExecutionScheduler(
+        max_concurrent=1, max_per_user=0, max_per_project=0, runner=runner, shortest_job_first=True
+    )
+    first = job(1)
+    first.duracao_estimada = 60.0
+    scheduler.submit(first)
+    for execucao_id, duracao in ((2, 300.0), (3, 10.0), (4, 20.0)):
+        queued = job(execucao_id)
+        queued.duracao_estimada = duracao
+        scheduler.submit(queued)
+
+    assert [scheduler.position(i) for i in (3, 4, 2)] == [1, 2, 3]
+    assert scheduler.estimate_wait(3) == pytest.approx(60.0, abs=1)
+    assert scheduler.estimate_wait(4) == pytest.approx(70.0, abs=1)
+    assert scheduler.estimate_wait(2) == pytest.approx(90.0, abs=1)
+    assert scheduler.estimate_wait(1) is None
+
+    runner.release.set()
+    await scheduler.wait_idle()
+    assert runner.started == [1, 3, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_created_execution_is_scheduled_once_committed(client, auth_headers, db_session):
+    response = await client.post("/projetos/", json={"nome": "Fila"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    scheduled = []
+
+    with patch.object(ExecucaoService, "schedule", lambda execucao, projeto: scheduled.append(execucao.id)):
+        with patch.object(db_session, "commit", side_effect=RuntimeError("commit falhou")):
+            with pytest.raises(RuntimeError):
+                await client.post(
+                    f"/projetos/{projeto_id}/execucoes", json={"parametros_entrada": {}}, headers=auth_headers
+                )
+        await db_session.rollback()
+        assert scheduled == []
+
+        response = await client.post(
+            f"/projetos/{projeto_id}/execucoes", json={"parametros_entrada": {}}, headers=auth_headers
+        )
+    assert response.status_code == 202
+    assert scheduled == [response.json()["id"]]
+
+
+def test_queue_position_comes_from_the_scheduler():
+    execucao = Execucao(
+        id=7, projeto_id=1, usuario_id=1, status="pending", prioridade="interactive", parametros_entrada={},
+        iniciado_em=datetime(2026, 1, 1)
+    )
+    with patch("app.services.execucao_service.scheduler") as local:
+        local.position.return_value = 3
+        local.estimate_wait.return_value = 30.0
+        response = ExecucaoService.to_response(execucao)
+    assert response.posicao_fila == 3
+    assert response.espera_estimada_segundos == 30.0
+    assert response.conclusao_estimada_em is not None
+    local.position.assert_called_once_with(7)
+
+    # The schema itself is plain data
+    assert ExecucaoResponse.model_validate(execucao).posicao_fila is None
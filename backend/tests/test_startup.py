@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import SchemaError, alembic_heads, check_schema, schema_fingerprint
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_alembic_heads_single_head():
+    assert len(alembic_heads()) == 1
+
+
+def test_schema_fingerprint_is_stable():
+    assert schema_fingerprint() == schema_fingerprint()
+
+
+def test_importing_main_does_not_load_heavy_modules():
+    # Fresh interpreter: this test process has imported them already
+    script = "import sys, app.main; print(sorted({'passlib', 'jose'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+@pytest.mark.asyncio
+async def test_check_schema_verifies_live_database_then_uses_fingerprint(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+    try:
+        assert await check_schema(engine) == "create_all"
+        assert await check_schema(engine) == "fingerprint"
+
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM schema_fingerprint"))
+        assert await check_schema(engine) == "reflection"
+
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            await conn.execute(
+                text("INSERT INTO alembic_version VALUES (:rev)"), {"rev": next(iter(alembic_heads()))}
+            )
+        assert await check_schema(engine) == "alembic"
+
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE alembic_version SET version_num = 'antiga'"))
+        with pytest.raises(SchemaError, match="alembic upgrade head"):
+            await check_schema(engine)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_check_schema_fails_on_missing_columns(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'stale.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE execucoes (id INTEGER PRIMARY KEY)"))
+        with pytest.raises(SchemaError, match="execucoes.status"):
+            await check_schema(engine)
+        # Nothing was recorded as verified: the next start fails the same way
+        with pytest.raises(SchemaError):
+            await check_schema(engine)
+    finally:
+        await engine.dispose()
@@ -0,0 +1,75 @@
+import base64
+import pytest
+from sqlalchemy import select
+
+from app.models.execucao import Execucao, StatusExecucao
+from app.models.usuario import Usuario
+from app.services import sync_service
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(monkeypatch):
+    monkeypatch.setattr(sync_service.settings, "sync_settle_seconds", -1.0)
+
+
+async def _sync(client, auth_headers, token=None):
+    params = {"token": token} if token else {}
+    response = await client.get("/sync/", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_returns_only_changes(client, auth_headers, db_session):
+    snapshot = await _sync(client, auth_headers)
+    assert snapshot["completo"] is True
+
+    response = await client.post("/projetos/", json={"nome": "Sync"}, headers=auth_headers)
+    projeto_id = response.json()["id"]
+    delta = await _sync(client, auth_headers, snapshot["token"])
+    assert [p["id"] for p in delta["projetos"]] == [projeto_id]
+    assert delta["execucoes"] == []
+
+    # Nothing changed: near-empty response
+    idle = await _sync(client, auth_headers, delta["token"])
+    assert idle["projetos"] == idle["execucoes"] == idle["projetos_removidos"] == []
+
+    user = (await db_session.execute(select(Usuario).where(Usuario.email == "teste@devflow.com"))).scalar_one()
+    execucao = Execucao(projeto_id=projeto_id, usuario_id=user.id)
+    db_session.add(execucao)
+    await db_session.commit()
+    delta = await _sync(client, auth_headers, idle["token"])
+    assert [e["id"] for e in delta["execucoes"]] == [execucao.id]
+
+    # Log progress is not a change clients see; a status change is
+    execucao.append_log("progresso")
+    await db_session.commit()
+    assert (await _sync(client, auth_headers, delta["token"]))["execucoes"] == []
+    execucao.status = StatusExecucao.RUNNING.value
+    await db_session.commit()
+    delta = await _sync(client, auth_headers, delta["token"])
+    assert [e["status"] for e in delta["execucoes"]] == ["running"]
+
+    await client.delete(f"/projetos/{projeto_id}", headers=auth_headers)
+    delta = await _sync(client, auth_headers, delta["token"])
+    assert delta["projetos"] == []
+    assert delta["projetos_removidos"] == [projeto_id]
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_and_rejects_bad_tokens(client, auth_headers, monkeypatch):
+    token = (await _sync(client, auth_headers))["token"]
+    for i in range(3):
+        await client.post("/projetos/", json={"nome": f"P{i}"}, headers=auth_headers)
+
+    monkeypatch.setattr(sync_service.settings, "sync_page_size", 2)
+    first = await _sync(client, auth_headers, token)
+    assert len(first["projetos"]) == 2 and first["mais"] is True
+    rest = await _sync(client, auth_headers, first["token"])
+    assert len(rest["projetos"]) == 1 and rest["mais"] is False
+
+    response = await client.get("/sync/", params={"token": "lixo"}, headers=auth_headers)
+    assert response.status_code == 400
+    expired = base64.urlsafe_b64encode(b"s:1:1000").decode().rstrip("=")
+    response = await client.get("/sync/", params={"token": expired}, headers=auth_headers)
+    assert response.status_code == 410
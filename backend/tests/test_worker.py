@@ -0,0 +1,189 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import patch
+from sqlalchemy import func, select, update
+
+from app.models.alteracao import EXECUCAO, Alteracao
+from app.models.usuario import Usuario
+from app.models.projeto import Projeto
+from app.models.execucao import Execucao, StatusExecucao
+from app.services import execucao_service
+from app.services.execucao_service import ExecucaoService
+from app.tasks.scheduler import ExecutionScheduler
+from app.tasks.worker import InlineLeases, Worker
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+async def pending(db_session):
+    user = Usuario(email="worker@devflow.com", nome="Worker", senha_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    projeto = Projeto(usuario_id=user.id, nome="Proj")
+    db_session.add(projeto)
+    await db_session.flush()
+    execucoes = [
+        Execucao(projeto_id=projeto.id, usuario_id=user.id, parametros_entrada={"mode": "review"})
+        for _ in range(3)
+    ]
+    db_session.add_all(execucoes)
+    await db_session.commit()
+    return [e.id for e in execucoes]
+
+
+def make_worker(worker_id, **kwargs):
+    return Worker(worker_id=worker_id, session_factory=TestingSessionLocal, **kwargs)
+
+
+async def get_row(execucao_id):
+    async with TestingSessionLocal() as db:
+        return await db.get(Execucao, execucao_id)
+
+
+async def execucao_changes(execucao_id):
+    async with TestingSessionLocal() as db:
+        return await db.scalar(
+            select(func.count())
+            .select_from(Alteracao)
+            .where(Alteracao.entidade == EXECUCAO, Alteracao.entidade_id == execucao_id)
+        )
+
+
+@pytest.mark.asyncio
+async def test_claims_are_exclusive(pending):
+    w1, w2 = make_worker("w1"), make_worker("w2")
+    first = await w1.claim(2)
+    second = await w2.claim(5)
+
+    assert len(first) == 2
+    assert second == [id for id in pending if id not in first]
+    assert await w1.claim(1) == []
+    assert (await get_row(first[0])).lease_owner == "w1"
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(pending):
+    w1, w2 = make_worker("w1"), make_worker("w2")
+    await w1.claim(3)
+    async with TestingSessionLocal() as db:
+        await db.execute(
+            update(Execucao)
+            .where(Execucao.id == pending[0])
+            .values(status=StatusExecucao.RUNNING.value, lease_expira_em=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+    changes_before = await execucao_changes(pending[0])
+
+    assert await w2.claim(3) == [pending[0]]
+    row = await get_row(pending[0])
+    assert row.lease_owner == "w2"
+    assert row.status == StatusExecucao.PENDING.value
+    # Back to pending is a change for /sync, though written with a bulk UPDATE
+    assert await execucao_changes(pending[0]) == changes_before + 1
+    assert await w1.renew(pending[0]) is False
+    assert await w2.renew(pending[0]) is True
+
+
+@pytest.mark.asyncio
+async def test_execute_runs_and_releases(pending):
+    seen = []
+
+    async def runner(execucao_id, config, reattach=False):
+        seen.append((execucao_id, config["mode"]))
+
+    worker = make_worker("w1", runner=runner)
+    [execucao_id] = await worker.claim(1)
+    await worker.execute(execucao_id)
+
+    assert seen == [(execucao_id, "review")]
+    row = await get_row(execucao_id)
+    assert row.lease_owner is None
+    assert row.lease_expira_em is None
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_cancels_run(pending):
+    cancelled = asyncio.Event()
+
+    async def runner(execucao_id, config, reattach=False):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    worker = make_worker("w1", runner=runner, heartbeat_seconds=0.01)
+    [execucao_id] = await worker.claim(1)
+    async with TestingSessionLocal() as db:
+        await db.execute(update(Execucao).where(Execucao.id == execucao_id).values(lease_owner="other"))
+        await db.commit()
+
+    await asyncio.wait_for(worker.execute(execucao_id), timeout=2)
+    assert cancelled.is_set()
+    assert (await get_row(execucao_id)).lease_owner == "other"
+
+
+@pytest.mark.asyncio
+async def test_checkpointed_run_is_reattached(pending):
+    seen = []
+
+    async def runner(execucao_id, config, reattach=False):
+        seen.append(reattach)
+
+    async with TestingSessionLocal() as db:
+        await db.execute(
+            update(Execucao)
+            .where(Execucao.id == pending[0])
+            .values(status=StatusExecucao.RUNNING.value, core_execution_id="core-9",
+                    lease_owner="dead", lease_expira_em=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+
+    worker = make_worker("w2", runner=runner)
+    claimed = await worker.claim(3)
+    assert pending[0] in claimed
+    assert (await get_row(pending[0])).status == StatusExecucao.RUNNING.value
+
+    await worker.execute(pending[0])
+    assert seen == [True]
+
+
+@pytest.mark.asyncio
+async def test_inline_recovery_leaves_live_processes_alone(pending, db_session):
+    live = datetime.utcnow() + timedelta(seconds=30)
+    expired = datetime.utcnow() - timedelta(seconds=1)
+    running_elsewhere, orphan, queued_elsewhere = pending
+    async with TestingSessionLocal() as db:
+        for execucao_id, values in (
+            (running_elsewhere, dict(status=StatusExecucao.RUNNING.value, core_execution_id="core-1",
+                                     lease_owner="api-2", lease_expira_em=live)),
+            (orphan, dict(status=StatusExecucao.RUNNING.value, core_execution_id="core-2",
+                          lease_owner="api-dead", lease_expira_em=expired)),
+            (queued_elsewhere, dict(lease_owner="api-2", lease_expira_em=live)),
+        ):
+            await db.execute(update(Execucao).where(Execucao.id == execucao_id).values(**values))
+        await db.commit()
+
+    started = []
+
+    async def runner(execucao_id, config, reattach=False):
+        started.append((execucao_id, reattach))
+
+    leases = InlineLeases(owner="api-1", session_factory=TestingSessionLocal)
+    local_scheduler = ExecutionScheduler(max_concurrent=0, runner=runner)
+    with patch.object(execucao_service, "inline_leases", leases), \
+         patch.object(execucao_service, "scheduler", local_scheduler):
+        assert await ExecucaoService.recover(db_session) == (1, 0)
+        await local_scheduler.wait_idle()
+        assert started == [(orphan, True)]
+        # Ours now, with a live lease: the next heartbeat does not take it again
+        assert await ExecucaoService.recover(db_session) == (0, 0)
+
+    assert (await get_row(orphan)).lease_owner == "api-1"
+    assert (await get_row(running_elsewhere)).lease_owner == "api-2"
+    assert (await get_row(queued_elsewhere)).lease_owner == "api-2"
+
+    await leases.release()
+    assert (await get_row(orphan)).lease_owner is None
@@ -1,6 +1,6 @@
 import { Routes, Route, Navigate } from 'react-router-dom';
 import { useState, useEffect, createContext, useContext } from 'react';
-import { authAPI } from './services/api';
+import { authAPI, syncAPI } from './services/api';
 
 import Login from './pages/Login';
 import Dashboard from './pages/Dashboard';
@@ -65,6 +65,7 @@ function App() {
 
     const logout = () => {
         localStorage.removeItem('token');
+        syncAPI.reset();
         setUser(null);
     };
 
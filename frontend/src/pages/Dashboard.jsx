@@ -1,32 +1,29 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { projetosAPI, execucoesAPI } from '../services/api';
+import { dashboardAPI } from '../services/api';
 import { useAuth } from '../App';
 
 function Dashboard() {
     const { user } = useAuth();
-    const [projetos, setProjetos] = useState([]);
-    const [execucoes, setExecucoes] = useState([]);
+    const [dashboard, setDashboard] = useState({ projetos: [], executando: 0, na_fila: 0, falhas_recentes: [] });
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
-        Promise.all([
-            projetosAPI.list(),
-            execucoesAPI.list()
-        ])
-            .then(([projetosData, execucoesData]) => {
-                setProjetos(projetosData);
-                setExecucoes(execucoesData.slice(0, 5)); // Last 5 executions
-            })
+        dashboardAPI.get()
+            .then(setDashboard)
             .finally(() => setLoading(false));
     }, []);
 
+    const projetos = dashboard.projetos;
+    const execucoes = projetos
+        .flatMap(p => p.ultimas_execucoes)
+        .sort((a, b) => new Date(b.iniciado_em) - new Date(a.iniciado_em))
+        .slice(0, 5); // Last 5 executions
+
     const stats = {
         totalProjetos: projetos.length,
         totalExecucoes: execucoes.length,
-        execucoesAtivas: execucoes.filter(e =>
-            e.status === 'pending' || e.status === 'running'
-        ).length,
+        execucoesAtivas: dashboard.executando + dashboard.na_fila,
         sucessos: execucoes.filter(e => e.status === 'success').length,
     };
 
@@ -101,7 +98,7 @@ function Dashboard() {
                             <div key={projeto.id} className="card">
                                 <h4>{projeto.nome}</h4>
                                 <p className="text-muted text-small">
-                                    {projeto.descricao || 'Sem descrição'}
+                                    {projeto.executando} em execução · {projeto.na_fila} na fila
                                 </p>
                             </div>
                         ))}
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { execucoesAPI } from '../services/api';
+import { execucoesAPI, syncAPI } from '../services/api';
 
 function Execucoes() {
     const [execucoes, setExecucoes] = useState([]);
@@ -10,8 +10,8 @@ function Execucoes() {
 
     const loadExecucoes = async () => {
         try {
-            const data = await execucoesAPI.list();
-            setExecucoes(data);
+            const { execucoes } = await syncAPI.refresh();
+            setExecucoes(execucoes);
         } catch (err) {
             console.error('Erro ao carregar execuções:', err);
         } finally {
@@ -39,6 +39,16 @@ function Execucoes() {
         } finally {
             setLoadingLogs(false);
         }
+
+        // Large results are not embedded in the execution, only fetched on demand
+        if (execucao.resultado_externo) {
+            try {
+                const data = await execucoesAPI.getResultado(execucao.id);
+                setSelectedExecucao(prev => prev?.id === execucao.id ? { ...prev, resultado: data.resultado } : prev);
+            } catch (err) {
+                console.error('Erro ao carregar resultado:', err);
+            }
+        }
     };
 
     const handleCancel = async (id) => {
@@ -53,6 +63,20 @@ function Execucoes() {
         }
     };
 
+    const handleExport = async () => {
+        try {
+            const blob = await execucoesAPI.exportar({ formato: 'csv' });
+            const url = URL.createObjectURL(blob);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = 'execucoes.csv';
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch (err) {
+            alert('Erro ao exportar: ' + err.message);
+        }
+    };
+
     const closeModal = () => {
         setSelectedExecucao(null);
         setLogs('');
@@ -93,9 +117,14 @@ function Execucoes() {
         <div>
             <div className="flex-between mb-lg">
                 <h1>Execuções</h1>
-                <button className="btn btn-secondary" onClick={loadExecucoes}>
-                    ↻ Atualizar
-                </button>
+                <div className="flex gap-sm">
+                    <button className="btn btn-secondary" onClick={handleExport}>
+                        ⤓ Exportar CSV
+                    </button>
+                    <button className="btn btn-secondary" onClick={loadExecucoes}>
+                        ↻ Atualizar
+                    </button>
+                </div>
             </div>
 
             {execucoes.length === 0 ? (
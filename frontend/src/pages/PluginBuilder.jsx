@@ -1,4 +1,5 @@
 import { useState } from 'react';
+import { pluginsAPI } from '../services/api';
 
 function PluginBuilder() {
     const [pluginInfo, setPluginInfo] = useState({
@@ -59,27 +60,22 @@ function PluginBuilder() {
     const handleGenerate = async () => {
         setIsGenerating(true);
         try {
-            const response = await fetch('http://localhost:8000/plugins/generate', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    name: pluginInfo.name,
-                    description: pluginInfo.description,
-                    tools: tools.map(t => ({
-                        name: t.name,
-                        description: t.description,
-                        parameters: {
-                            type: 'object',
-                            properties: t.params.reduce((acc, p) => {
-                                acc[p.name] = { type: p.type, description: p.description };
-                                return acc;
-                            }, {}),
-                            required: t.params.map(p => p.name)
-                        }
-                    }))
-                })
+            const data = await pluginsAPI.generate({
+                name: pluginInfo.name,
+                description: pluginInfo.description,
+                tools: tools.map(t => ({
+                    name: t.name,
+                    description: t.description,
+                    parameters: {
+                        type: 'object',
+                        properties: t.params.reduce((acc, p) => {
+                            acc[p.name] = { type: p.type, description: p.description };
+                            return acc;
+                        }, {}),
+                        required: t.params.map(p => p.name)
+                    }
+                }))
             });
-            const data = await response.json();
             setGeneratedCode(data.template);
         } catch (error) {
             console.error('Error generating plugin:', error);
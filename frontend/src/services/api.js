@@ -113,10 +113,81 @@ export const execucoesAPI = {
         return response.data;
     },
 
+    getResultado: async (id) => {
+        const response = await api.get(`/execucoes/${id}/resultado`);
+        return response.data;
+    },
+
     cancel: async (id) => {
         const response = await api.post(`/execucoes/${id}/cancelar`);
         return response.data;
     },
+
+    // { formato: 'csv' | 'ndjson', compactar, incluir_logs, projeto_id, status, desde, ate }
+    exportar: async (params = {}) => {
+        const response = await api.get('/execucoes/exportar', { params, responseType: 'blob' });
+        return response.data;
+    },
+};
+
+// Dashboard API (projects, latest executions and counts in one request)
+export const dashboardAPI = {
+    get: async () => {
+        const response = await api.get('/dashboard/');
+        return response.data;
+    },
+};
+
+// Sync API: only what changed since the last call (full snapshot the first time)
+const syncState = { token: null, projetos: new Map(), execucoes: new Map() };
+
+const applyChanges = (data) => {
+    if (data.completo) {
+        syncState.projetos.clear();
+        syncState.execucoes.clear();
+    }
+    data.projetos.forEach(p => syncState.projetos.set(p.id, p));
+    data.execucoes.forEach(e => syncState.execucoes.set(e.id, e));
+    data.projetos_removidos.forEach(id => syncState.projetos.delete(id));
+    data.execucoes_removidas.forEach(id => syncState.execucoes.delete(id));
+    syncState.token = data.token;
+};
+
+export const syncAPI = {
+    refresh: async () => {
+        let data;
+        do {
+            try {
+                const params = syncState.token ? { token: syncState.token } : {};
+                data = (await api.get('/sync/', { params })).data;
+            } catch (err) {
+                if (err.response?.status !== 410 || !syncState.token) throw err;
+                syncState.token = null;  // token expired: start over with a snapshot
+                data = { mais: true, projetos: [], execucoes: [], projetos_removidos: [], execucoes_removidas: [] };
+                continue;
+            }
+            applyChanges(data);
+        } while (data.mais);
+        return {
+            projetos: [...syncState.projetos.values()].sort((a, b) => a.id - b.id),
+            execucoes: [...syncState.execucoes.values()]
+                .sort((a, b) => new Date(b.iniciado_em) - new Date(a.iniciado_em)),
+        };
+    },
+
+    reset: () => {
+        syncState.token = null;
+        syncState.projetos.clear();
+        syncState.execucoes.clear();
+    },
+};
+
+// Plugins API
+export const pluginsAPI = {
+    generate: async (spec) => {
+        const response = await api.post('/plugins/generate', spec);
+        return response.data;
+    },
 };
 
 export default api;
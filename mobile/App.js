@@ -9,6 +9,7 @@ import LoginScreen from './src/screens/LoginScreen';
 import DashboardScreen from './src/screens/DashboardScreen';
 import ExecutionDetailsScreen from './src/screens/ExecutionDetailsScreen';
 import ProjectsScreen from './src/screens/ProjectsScreen';
+import { resetSync } from './src/services/api';
 
 const Stack = createNativeStackNavigator();
 const Tab = createBottomTabNavigator();
@@ -26,6 +27,7 @@ function MainTabs() {
                     style={{ marginRight: 15 }}
                     onPress={async () => {
                         await AsyncStorage.removeItem('token');
+                        resetSync();
                         navigation.replace('Login');
                     }}
                 >
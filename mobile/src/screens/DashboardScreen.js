@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { StyleSheet, View, Text, FlatList, TouchableOpacity, RefreshControl } from 'react-native';
-import { getExecucoes } from '../services/api';
+import { syncChanges } from '../services/api';
 
 export default function DashboardScreen({ navigation }) {
     const [execucoes, setExecucoes] = useState([]);
@@ -9,8 +9,8 @@ export default function DashboardScreen({ navigation }) {
     const loadData = async () => {
         setRefreshing(true);
         try {
-            const data = await getExecucoes();
-            setExecucoes(data);
+            const { execucoes } = await syncChanges();
+            setExecucoes(execucoes);
         } catch (error) {
             console.error(error);
         } finally {
@@ -26,6 +26,7 @@ export default function DashboardScreen({ navigation }) {
         switch (status) {
             case 'success': return '#4caf50';
             case 'failed': return '#f44336';
+            case 'partial': return '#f59e0b';
             case 'running': return '#2196f3';
             default: return '#999';
         }
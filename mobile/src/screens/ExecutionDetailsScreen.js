@@ -1,11 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { StyleSheet, View, Text, ScrollView, ActivityIndicator, Platform } from 'react-native';
-import { getExecucaoLogs } from '../services/api';
+import { getExecucaoLogs, getExecucaoResultado } from '../services/api';
 
 export default function ExecutionDetailsScreen({ route }) {
     const { executionId } = route.params;
     const [details, setDetails] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [resultado, setResultado] = useState(null);
 
     useEffect(() => {
         let interval;
@@ -36,10 +37,32 @@ export default function ExecutionDetailsScreen({ route }) {
         return () => clearInterval(interval);
     }, [executionId]);
 
+    const finished = details && details.status !== 'running' && details.status !== 'pending';
+
+    // Only the top findings, not the whole (possibly huge) result document
+    useEffect(() => {
+        if (!finished) return;
+        const fetchResultado = async () => {
+            try {
+                const data = await getExecucaoResultado(executionId, { pointer: '/findings', limite: 10 });
+                setResultado({ ...data, top: true });
+            } catch (error) {
+                if (![400, 404].includes(error.response?.status)) return;
+                try {
+                    setResultado(await getExecucaoResultado(executionId));
+                } catch (err) {
+                    console.error(err);
+                }
+            }
+        };
+        fetchResultado();
+    }, [executionId, finished]);
+
     const getStatusColor = (status) => {
         switch (status) {
             case 'success': return '#4caf50';
             case 'failed': return '#f44336';
+            case 'partial': return '#f59e0b';
             case 'running': return '#2196f3';
             default: return '#999';
         }
@@ -80,14 +103,18 @@ export default function ExecutionDetailsScreen({ route }) {
                 </ScrollView>
             </View>
 
-            {details.resultado && (
+            {resultado?.resultado && (
                 <View style={styles.section}>
-                    <Text style={styles.sectionTitle}>Resultado Final</Text>
+                    <Text style={styles.sectionTitle}>
+                        {resultado.top
+                            ? `Principais findings (${resultado.resultado.length} de ${resultado.total})`
+                            : 'Resultado Final'}
+                    </Text>
                     <View style={styles.resultContainer}>
                         <Text style={styles.codeText}>
-                            {typeof details.resultado === 'string'
-                                ? details.resultado
-                                : JSON.stringify(details.resultado, null, 2)}
+                            {typeof resultado.resultado === 'string'
+                                ? resultado.resultado
+                                : JSON.stringify(resultado.resultado, null, 2)}
                         </Text>
                     </View>
                 </View>
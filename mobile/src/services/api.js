@@ -57,6 +57,44 @@ export const login = async (email, password) => {
     return response.data;
 };
 
+// Sincronização incremental: só o que mudou desde a última chamada
+const syncState = { token: null, projetos: new Map(), execucoes: new Map() };
+
+export const resetSync = () => {
+    syncState.token = null;
+    syncState.projetos.clear();
+    syncState.execucoes.clear();
+};
+
+export const syncChanges = async () => {
+    let data;
+    do {
+        try {
+            const params = syncState.token ? { token: syncState.token } : {};
+            data = (await api.get('/sync/', { params })).data;
+        } catch (error) {
+            if (error.response?.status !== 410 || !syncState.token) throw error;
+            resetSync();  // token expirado: recomeça com um snapshot
+            data = { mais: true };
+            continue;
+        }
+        if (data.completo) {
+            syncState.projetos.clear();
+            syncState.execucoes.clear();
+        }
+        data.projetos.forEach(p => syncState.projetos.set(p.id, p));
+        data.execucoes.forEach(e => syncState.execucoes.set(e.id, e));
+        data.projetos_removidos.forEach(id => syncState.projetos.delete(id));
+        data.execucoes_removidas.forEach(id => syncState.execucoes.delete(id));
+        syncState.token = data.token;
+    } while (data.mais);
+    return {
+        projetos: [...syncState.projetos.values()].sort((a, b) => a.id - b.id),
+        execucoes: [...syncState.execucoes.values()]
+            .sort((a, b) => new Date(b.iniciado_em) - new Date(a.iniciado_em)),
+    };
+};
+
 export const getExecucoes = async () => {
     const response = await api.get('/execucoes');
     return response.data;
@@ -68,6 +106,12 @@ export const getExecucaoLogs = async (id) => {
 };
 
 // Projetos
+// Part of a result: { pointer: '/findings', limite: 10, campos: 'titulo,severidade', cursor }
+export const getExecucaoResultado = async (id, params = {}) => {
+    const response = await api.get(`/execucoes/${id}/resultado`, { params });
+    return response.data;
+};
+
 export const getProjetos = async () => {
     const response = await api.get('/projetos');
     return response.data;